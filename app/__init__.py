@@ -27,6 +27,56 @@ def create_app(config_name=None):
     # Injection mongo dans l'app
     app.mongo = mongo
 
+    # Client HTTP partagé par les providers de scraping
+    from app.utils.http_client import HttpClient
+    HttpClient.init_app(app)
+
+    # Pool borné partagé par les providers de scraping
+    from app.services.provider_executor import ProviderExecutor
+    ProviderExecutor.init_app(app)
+
+    # Disjoncteurs des providers et cache négatif
+    from app.services.circuit_breaker import ProviderBreakers
+    ProviderBreakers.init_app(app)
+
+    # Hedging des providers (délais appris sur les latences observées)
+    from app.services.hedging import HedgePolicy
+    HedgePolicy.init_app(app)
+
+    # Ordonnanceur des providers (bandit)
+    from app.services.provider_scheduler import ProviderScheduler
+    ProviderScheduler.init_app(app)
+
+    # Index local des résumés Wikipédia (requêtes de définition sans réseau)
+    from app.services.wikipedia_local import WikipediaLocal
+    WikipediaLocal.init_app(app)
+
+    # Corpus local BM25 des résultats déjà récupérés
+    from app.services.local_corpus import LocalCorpus
+    LocalCorpus.init_app(app)
+
+    # Backend de parsing des pages de résultats
+    from app.utils.html_parsers import ResultPageParser
+    ResultPageParser.init_app(app)
+
+    # Cache des résultats de scraping (mémoire + Mongo)
+    from app.services.cache_service import ScrapeCache, SemanticCache, EnrichmentStore
+    ScrapeCache.init_app(app)
+
+    # Cache sémantique des recherches enrichies (requêtes proches par embedding)
+    SemanticCache.init_app(app)
+
+    # Aiguillage des résumés selon la longueur (tel quel, extractif, abstractif)
+    from app.services.summary_router import SummaryRouter
+    SummaryRouter.init_app(app)
+
+    # Regroupement des quasi-doublons avant enrichissement
+    from app.services.dedup_service import DedupService
+    DedupService.init_app(app)
+
+    # Mémo des enrichissements IA (résumé, topics, embedding) par URL canonique
+    EnrichmentStore.init_app(app)
+
     # Swagger UI config
     SWAGGER_URL = '/api/docs'
     API_URL = '/static/swagger.json'
@@ -51,6 +101,18 @@ def create_app(config_name=None):
     app.register_blueprint(dashboard_bp, url_prefix='/api/v1/dashboard')
     app.register_blueprint(search_bp, url_prefix='/api/v1/search')
 
+    # Threads torch et précision d'inférence, avant tout chargement de modèle
+    from app.utils.torch_runtime import TorchRuntime
+    TorchRuntime.init_app(app)
+
+    # Registre des modèles (chargement paresseux, préchargement configurable)
+    from app.services.model_registry import ModelRegistry
+    ModelRegistry.init_app(app)
+
+    # Client du serveur d'inférence (actif seulement si INFERENCE_MODE == 'server')
+    from app.services.inference_server import InferenceServerClient
+    InferenceServerClient.init_app(app)
+
     # Initialisation des services dépendants du contexte Flask
     with app.app_context():
         from app.services.ai_service import AIService
@@ -16,6 +16,150 @@ class Config:
     SCRAPE_TIMEOUT = int(os.environ.get('SCRAPE_TIMEOUT', 10))
     MAX_SCRAPE_RESULTS = int(os.environ.get('MAX_SCRAPE_RESULTS', 20))
     RATE_LIMIT_DEFAULT = os.environ.get('RATE_LIMIT_DEFAULT', '100 per day;10 per hour')
+    SCRAPE_PARSER = os.environ.get('SCRAPE_PARSER', 'lxml')  # 'lxml', 'bs4-lxml' (SoupStrainer) ou 'html.parser'
+
+    # 🧵 Pool partagé des providers de scraping (borné) et deadline d'une recherche
+    PROVIDER_MAX_WORKERS = int(os.environ.get('PROVIDER_MAX_WORKERS', 16))
+    PROVIDER_MAX_PENDING = int(os.environ.get('PROVIDER_MAX_PENDING', 64))  # appels en file + en cours au-delà desquels on refuse
+    SEARCH_DEADLINE = float(os.environ.get('SEARCH_DEADLINE', 6))  # secondes
+
+    # 🔀 Mode fusion : tous les providers jusqu'à la deadline, dédoublonnage par URL canonique, reciprocal rank fusion
+    SCRAPE_MERGE_MODE = os.environ.get('SCRAPE_MERGE_MODE', 'false').lower() in ['true', 'on', '1']
+    SCRAPE_MERGE_DEADLINE = float(os.environ.get('SCRAPE_MERGE_DEADLINE', 3))  # secondes
+    SCRAPE_MERGE_RRF_K = int(os.environ.get('SCRAPE_MERGE_RRF_K', 60))
+
+    # 🔌 Disjoncteur par provider (fenêtre glissante des derniers appels) et cache négatif des requêtes vides
+    BREAKER_WINDOW = int(os.environ.get('BREAKER_WINDOW', 20))
+    BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', 5))
+    BREAKER_FAILURE_RATE = float(os.environ.get('BREAKER_FAILURE_RATE', 0.5))
+    BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('BREAKER_SLOW_CALL_SECONDS', 5))
+    BREAKER_SLOW_CALL_RATE = float(os.environ.get('BREAKER_SLOW_CALL_RATE', 0.8))
+    BREAKER_OPEN_SECONDS = int(os.environ.get('BREAKER_OPEN_SECONDS', 30))  # avant la sonde half-open
+    NEGATIVE_CACHE_TTL = int(os.environ.get('NEGATIVE_CACHE_TTL', 120))  # secondes, 0 = désactivé
+    NEGATIVE_CACHE_MAX_ENTRIES = int(os.environ.get('NEGATIVE_CACHE_MAX_ENTRIES', 1024))
+
+    # 🛡️ Hedging : seuls les premiers providers partent, les autres couvrent après le pXX de la latence observée
+    HEDGE_ENABLED = os.environ.get('HEDGE_ENABLED', 'false').lower() in ['true', 'on', '1']
+    HEDGE_PRIMARY_PROVIDERS = int(os.environ.get('HEDGE_PRIMARY_PROVIDERS', 1))
+    HEDGE_PERCENTILE = float(os.environ.get('HEDGE_PERCENTILE', 90))
+    HEDGE_DEFAULT_DELAY = float(os.environ.get('HEDGE_DEFAULT_DELAY', 1.0))  # secondes, tant que les observations manquent
+    HEDGE_MIN_DELAY = float(os.environ.get('HEDGE_MIN_DELAY', 0.1))
+    HEDGE_MIN_SAMPLES = int(os.environ.get('HEDGE_MIN_SAMPLES', 20))
+    HEDGE_MAX_EXTRA_LOAD = float(os.environ.get('HEDGE_MAX_EXTRA_LOAD', 0.25))  # couvertures / requêtes primaires
+    HEDGE_MAX_PER_SEARCH = int(os.environ.get('HEDGE_MAX_PER_SEARCH', 1))
+
+    # 🎰 Ordonnanceur des providers (bandit) : ordre et nombre de providers lancés par type de requête et langue
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    SCHEDULER_DETERMINISTIC = os.environ.get('SCHEDULER_DETERMINISTIC', 'false').lower() in ['true', 'on', '1']  # UCB1 sans aléa
+    SCHEDULER_SEED = int(os.environ['SCHEDULER_SEED']) if os.environ.get('SCHEDULER_SEED') else None
+    SCHEDULER_MAX_PROVIDERS = int(os.environ.get('SCHEDULER_MAX_PROVIDERS', 2))
+    SCHEDULER_EXPLORATION = float(os.environ.get('SCHEDULER_EXPLORATION', 0.5))
+    SCHEDULER_DECAY = float(os.environ.get('SCHEDULER_DECAY', 0.99))
+    SCHEDULER_LATENCY_SCALE = float(os.environ.get('SCHEDULER_LATENCY_SCALE', 2.0))  # secondes
+    SCHEDULER_CONFIDENT_RATE = float(os.environ.get('SCHEDULER_CONFIDENT_RATE', 0.9))  # un seul provider au-delà
+    SCHEDULER_MIN_SAMPLES = int(os.environ.get('SCHEDULER_MIN_SAMPLES', 10))
+
+    # 📚 Résumés Wikipédia hors ligne (index mappé construit par python -m app.services.wikipedia_local build)
+    WIKI_LOCAL_ENABLED = os.environ.get('WIKI_LOCAL_ENABLED', 'true').lower() in ['true', 'on', '1']
+    WIKI_LOCAL_INDEX_DIR = os.environ.get('WIKI_LOCAL_INDEX_DIR', 'data/wikipedia')  # un fichier <lang>.idx par langue
+    WIKI_LOCAL_CHECK_INTERVAL = float(os.environ.get('WIKI_LOCAL_CHECK_INTERVAL', 60))  # secondes entre deux vérifications du fichier
+
+    # 🗂️ Corpus local BM25 des résultats déjà récupérés (premier lot instantané, repli hors ligne)
+    LOCAL_CORPUS_ENABLED = os.environ.get('LOCAL_CORPUS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    LOCAL_CORPUS_DIR = os.environ.get('LOCAL_CORPUS_DIR', 'data/corpus')
+    LOCAL_CORPUS_SEGMENT_DOCS = int(os.environ.get('LOCAL_CORPUS_SEGMENT_DOCS', 1000))  # documents par segment écrit
+    LOCAL_CORPUS_FLUSH_INTERVAL = float(os.environ.get('LOCAL_CORPUS_FLUSH_INTERVAL', 300))  # secondes
+    LOCAL_CORPUS_MAX_SEGMENTS = int(os.environ.get('LOCAL_CORPUS_MAX_SEGMENTS', 8))  # fusion en arrière-plan au-delà
+    LOCAL_CORPUS_MERGE_FACTOR = int(os.environ.get('LOCAL_CORPUS_MERGE_FACTOR', 4))  # segments fusionnés à la fois
+    LOCAL_CORPUS_K1 = float(os.environ.get('LOCAL_CORPUS_K1', 1.2))
+    LOCAL_CORPUS_B = float(os.environ.get('LOCAL_CORPUS_B', 0.75))
+    LOCAL_CORPUS_MIN_MATCH = float(os.environ.get('LOCAL_CORPUS_MIN_MATCH', 0.6))  # part des termes de la requête
+    LOCAL_CORPUS_FIRST_RESULTS = int(os.environ.get('LOCAL_CORPUS_FIRST_RESULTS', 3))  # premier lot en streaming
+    LOCAL_CORPUS_REFRESH_INTERVAL = float(os.environ.get('LOCAL_CORPUS_REFRESH_INTERVAL', 30))  # relecture du dossier
+    LOCAL_CORPUS_MAX_DOCS = int(os.environ.get('LOCAL_CORPUS_MAX_DOCS', 500000))  # les plus anciens segments sont supprimés au-delà
+    LOCAL_CORPUS_MAX_AGE = float(os.environ.get('LOCAL_CORPUS_MAX_AGE', 30 * 86400))  # secondes
+    LOCAL_CORPUS_MERGE_MAX_DOCS = int(os.environ.get('LOCAL_CORPUS_MERGE_MAX_DOCS', 100000))  # taille max d'un segment fusionné
+
+    # 🌐 Client HTTP partagé (pools keep-alive par hôte)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))  # nombre d'hôtes gardés en pool
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 20))  # connexions max par hôte
+    HTTP_POOL_BLOCK = os.environ.get('HTTP_POOL_BLOCK', 'false').lower() in ['true', 'on', '1']
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_MAX_RESPONSE_BYTES = int(os.environ.get('HTTP_MAX_RESPONSE_BYTES', 2 * 1024 * 1024))  # lecture coupée au-delà
+    HTTP_STREAM_CHUNK_SIZE = int(os.environ.get('HTTP_STREAM_CHUNK_SIZE', 16 * 1024))
+
+    # 💾 Cache HTTP sur disque (RFC 9111 : max-age, revalidation ETag / Last-Modified) des API JSON des providers
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', 'cache/http')
+    HTTP_CACHE_HOSTS = os.environ.get('HTTP_CACHE_HOSTS', 'wikipedia.org,api.duckduckgo.com')  # suffixes d'hôtes
+    HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    HTTP_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('HTTP_CACHE_MAX_ENTRY_BYTES', 1024 * 1024))
+    HTTP_CACHE_HEURISTIC_MAX_AGE = int(os.environ.get('HTTP_CACHE_HEURISTIC_MAX_AGE', 86400))  # sans max-age ni Expires
+
+    # 🎞️ Enregistrement / rejeu des échanges HTTP des providers (benchmarks et tests hors ligne)
+    HTTP_TRANSPORT = os.environ.get('HTTP_TRANSPORT', 'live')  # 'live', 'record' ou 'replay'
+    HTTP_FIXTURES_DIR = os.environ.get('HTTP_FIXTURES_DIR', 'fixtures/http')
+    HTTP_REPLAY_LATENCY = float(os.environ.get('HTTP_REPLAY_LATENCY', 0.0))  # secondes ajoutées à chaque réponse
+    HTTP_REPLAY_JITTER = float(os.environ.get('HTTP_REPLAY_JITTER', 0.0))
+    HTTP_REPLAY_FAILURE_RATE = float(os.environ.get('HTTP_REPLAY_FAILURE_RATE', 0.0))
+    HTTP_REPLAY_FAILURE_STATUS = int(os.environ.get('HTTP_REPLAY_FAILURE_STATUS', 0))  # 0 : erreur de connexion
+    HTTP_REPLAY_SEED = int(os.environ['HTTP_REPLAY_SEED']) if os.environ.get('HTTP_REPLAY_SEED') else None
+
+    # 🗃️ Cache des résultats de scraping (LRU mémoire + collection Mongo TTL partagée)
+    SCRAPE_CACHE_ENABLED = os.environ.get('SCRAPE_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SCRAPE_CACHE_MONGO = os.environ.get('SCRAPE_CACHE_MONGO', 'true').lower() in ['true', 'on', '1']
+    SCRAPE_CACHE_MAX_ENTRIES = int(os.environ.get('SCRAPE_CACHE_MAX_ENTRIES', 512))
+    SCRAPE_CACHE_TTL_DEFAULT = int(os.environ.get('SCRAPE_CACHE_TTL_DEFAULT', 1800))  # secondes
+    SCRAPE_CACHE_TTL_NEWS = int(os.environ.get('SCRAPE_CACHE_TTL_NEWS', 300))
+    SCRAPE_CACHE_TTL_DEFINITION = int(os.environ.get('SCRAPE_CACHE_TTL_DEFINITION', 86400))
+
+    # 🧭 Cache sémantique des recherches enrichies (requêtes reformulées : plus proche voisin des embeddings)
+    SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.92))  # similarité cosinus minimale
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get('SEMANTIC_CACHE_MAX_ENTRIES', 1024))
+    SEMANTIC_CACHE_TTL = int(os.environ.get('SEMANTIC_CACHE_TTL', 1800))  # secondes
+
+    # 👯 Quasi-doublons (MinHash + LSH) regroupés avant l'enrichissement
+    DEDUP_ENABLED = os.environ.get('DEDUP_ENABLED', 'true').lower() in ['true', 'on', '1']
+    DEDUP_NUM_PERM = int(os.environ.get('DEDUP_NUM_PERM', 64))  # taille des signatures MinHash
+    DEDUP_BANDS = int(os.environ.get('DEDUP_BANDS', 16))  # bandes LSH (DEDUP_NUM_PERM / DEDUP_BANDS lignes chacune)
+    DEDUP_SHINGLE_SIZE = int(os.environ.get('DEDUP_SHINGLE_SIZE', 3))  # mots par shingle
+    DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.6))  # similarité de Jaccard estimée
+    DEDUP_EMBEDDING_CHECK = os.environ.get('DEDUP_EMBEDDING_CHECK', 'false').lower() in ['true', 'on', '1']
+    DEDUP_EMBEDDING_THRESHOLD = float(os.environ.get('DEDUP_EMBEDDING_THRESHOLD', 0.9))  # cosinus des paires candidates
+
+    # 🤖 Enrichissement IA
+    ENRICH_BATCH_SIZE = int(os.environ.get('ENRICH_BATCH_SIZE', 8))
+    SUMMARY_ROUTING_ENABLED = os.environ.get('SUMMARY_ROUTING_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SUMMARY_PASSTHROUGH_TOKENS = int(os.environ.get('SUMMARY_PASSTHROUGH_TOKENS', 60))  # texte rendu tel quel en deçà
+    SUMMARY_ABSTRACTIVE_TOKENS = int(os.environ.get('SUMMARY_ABSTRACTIVE_TOKENS', 200))  # extractif jusque-là, modèle au-delà
+    SUMMARY_TOKENIZER_PATH = os.environ.get('SUMMARY_TOKENIZER_PATH', '')  # tokenizer.json (défaut : app/bert-base-uncased)
+    ENRICH_SUMMARY_TOP_K = int(os.environ.get('ENRICH_SUMMARY_TOP_K', 5))  # résumés d'office par recherche (0 : tous), les autres à la demande
+    SUMMARIZER_BY_LANGUAGE = os.environ.get('SUMMARIZER_BY_LANGUAGE', 'fr:bert2bert,en:distilbart')  # un résumeur par langue
+    SUMMARIZER_DEFAULT = os.environ.get('SUMMARIZER_DEFAULT', 'distilbart')
+    ENRICH_STORE_ENABLED = os.environ.get('ENRICH_STORE_ENABLED', 'true').lower() in ['true', 'on', '1']  # mémo Mongo par URL + snippet
+    ENRICH_STORE_TTL = int(os.environ.get('ENRICH_STORE_TTL', 7 * 86400))  # secondes
+    ENRICH_STORE_FLUSH_SIZE = int(os.environ.get('ENRICH_STORE_FLUSH_SIZE', 32))
+    ENRICH_STORE_FLUSH_INTERVAL = int(os.environ.get('ENRICH_STORE_FLUSH_INTERVAL', 5))  # secondes
+
+    # 🗂️ Registre des modèles : seuls ceux listés sont chargés au démarrage, les autres à la première utilisation
+    MODEL_PRELOAD = os.environ.get('MODEL_PRELOAD', 'similarity,summarizer,bert2bert')
+    MODEL_PRELOAD_ASYNC = os.environ.get('MODEL_PRELOAD_ASYNC', 'false').lower() in ['true', 'on', '1']
+    MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'true').lower() in ['true', 'on', '1']
+    MODEL_MEMORY_BUDGET_MB = int(os.environ.get('MODEL_MEMORY_BUDGET_MB', 0))  # 0 = pas de limite
+
+    # ⚙️ Inférence CPU : 'int8' = quantification dynamique des couches Linear ; threads torch par worker (0 = défaut torch)
+    INFERENCE_PRECISION = os.environ.get('INFERENCE_PRECISION', 'fp32')
+    TORCH_INTRA_OP_THREADS = int(os.environ.get('TORCH_INTRA_OP_THREADS', 0))
+    TORCH_INTER_OP_THREADS = int(os.environ.get('TORCH_INTER_OP_THREADS', 0))
+
+    # 🧠 Serveur d'inférence local (micro-batching) : 'local' = modèles dans chaque worker, 'server' = client
+    INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'local')
+    INFERENCE_SERVER_ADDRESS = os.environ.get('INFERENCE_SERVER_ADDRESS', '/tmp/intellisearch-inference.sock')
+    INFERENCE_SERVER_AUTHKEY = os.environ.get('INFERENCE_SERVER_AUTHKEY', 'intellisearch-inference')
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 16))
+    INFERENCE_MAX_WAIT_MS = int(os.environ.get('INFERENCE_MAX_WAIT_MS', 10))
+    INFERENCE_TIMEOUT = int(os.environ.get('INFERENCE_TIMEOUT', 30))  # secondes
 
     # 📧 Mail
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.googlemail.com')
@@ -40,6 +184,11 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     MAIL_SUPPRESS_SEND = True
+    SCRAPE_CACHE_MONGO = False
+    ENRICH_STORE_ENABLED = False
+    HTTP_CACHE_ENABLED = False
+    LOCAL_CORPUS_ENABLED = False
+    SCHEDULER_DETERMINISTIC = True
 
 
 class ProductionConfig(Config):
@@ -1,13 +1,17 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson.objectid import ObjectId
 from functools import wraps
+import json
 import traceback
 
 from app.services.search_service import SearchService
 from app.services.scraping_service import ScrapingService
 from app.services.ai_service import AIService
+from app.services.cache_service import SemanticCache
+from app.services.dedup_service import DedupService
+from app.utils.helpers import canonicalize_url
 from app.utils.decorators import validate_json  # si utilisé dans ton projet
 
 bp = Blueprint('search', __name__, url_prefix='/api/v1/search')
@@ -26,6 +30,54 @@ def handle_options(f):
     return decorated_function
 
 
+FILTERS_SCHEMA = {
+    'date': {'type': 'string', 'allowed': ['any', 'day', 'week', 'month', 'year'], 'default': 'any'},
+    'type': {'type': 'string', 'allowed': ['all', 'article', 'video', 'image', 'document'], 'default': 'all'},
+    'domain': {'type': 'string', 'nullable': True, 'default': ''},
+    'language': {'type': 'string', 'allowed': ['fr', 'en', 'es', 'de', 'it'], 'default': 'fr'},
+    'category': {'type': 'string', 'nullable': True, 'default': ''}
+}
+DEFAULT_FILTERS = {
+    'date': 'any',
+    'type': 'all',
+    'domain': '',
+    'language': 'fr',
+    'category': ''
+}
+
+# Réponses de repli (providers en panne) : jamais servies à une autre requête par le cache sémantique
+FALLBACK_SOURCES = {'ia-local', 'local_corpus'}
+
+
+def _dedup_embedder():
+    # Vérification par embeddings des quasi-doublons (DEDUP_EMBEDDING_CHECK) : seulement si le modèle est prêt
+    return AIService.embed if AIService.is_ready() else None
+
+
+def _search_text(query, limit, filters, use_cache=True, merge=None):
+    """Scraping -> filtres -> enrichissement ; une requête proche d'une recherche récente (même contexte)
+    est servie par le cache sémantique, sans scraping ni modèles."""
+    lang = filters.get('language', 'fr')
+    query_embedding = None
+    context = None
+    if use_cache and SemanticCache.enabled() and AIService.is_ready():
+        query_embedding = AIService.encode_query(query)
+        context = SemanticCache.context(lang, ScrapingService.detect_query_type(query), limit, filters, merge)
+        cached = SemanticCache.get(query_embedding, context)
+        if cached is not None:
+            results, similarity = cached
+            current_app.logger.info(f"🧭 Cache sémantique : '{query}' servi (similarité {similarity:.3f})")
+            return results
+
+    scraped_results = ScrapingService.scrape_web(query, limit, lang=lang, use_cache=use_cache, merge=merge)
+    filtered_results = DedupService.collapse(SearchService.apply_filters(scraped_results, filters), _dedup_embedder())
+    enriched_results = AIService.enrich_search_results(query, filtered_results, query_embedding=query_embedding)
+
+    if context is not None and enriched_results and not any(r.get('source') in FALLBACK_SOURCES for r in enriched_results):
+        SemanticCache.set(query, query_embedding, context, enriched_results)
+    return enriched_results
+
+
 @bp.route('', methods=['POST', 'OPTIONS'])  # PAS de slash final
 @jwt_required()
 @handle_options
@@ -33,23 +85,9 @@ def handle_options(f):
     'query': {'type': 'string', 'required': True, 'minlength': 3},
     'type': {'type': 'string', 'allowed': ['text', 'image', 'news'], 'default': 'text'},
     'limit': {'type': 'integer', 'min': 1, 'max': 50, 'default': 10},
-    'filters': {
-        'type': 'dict',
-        'schema': {
-            'date': {'type': 'string', 'allowed': ['any', 'day', 'week', 'month', 'year'], 'default': 'any'},
-            'type': {'type': 'string', 'allowed': ['all', 'article', 'video', 'image', 'document'], 'default': 'all'},
-            'domain': {'type': 'string', 'nullable': True, 'default': ''},
-            'language': {'type': 'string', 'allowed': ['fr', 'en', 'es', 'de', 'it'], 'default': 'fr'},
-            'category': {'type': 'string', 'nullable': True, 'default': ''}
-        },
-        'default': {
-            'date': 'any',
-            'type': 'all',
-            'domain': '',
-            'language': 'fr',
-            'category': ''
-        }
-    }
+    'no_cache': {'type': 'boolean', 'default': False},
+    'merge': {'type': 'boolean', 'nullable': True},
+    'filters': {'type': 'dict', 'schema': FILTERS_SCHEMA, 'default': DEFAULT_FILTERS}
 })
 def search_post():
     try:
@@ -68,6 +106,8 @@ def search_post():
         query = data.get('query')
         search_type = data.get('type', 'text')
         limit = data.get('limit', 10)
+        use_cache = not data.get('no_cache', False)
+        merge = data.get('merge')
         filters = data.get('filters', {
             'date': 'any',
             'type': 'all',
@@ -90,9 +130,7 @@ def search_post():
         inserted = mongo_db.search_history.insert_one(search_history_doc)
 
         if search_type == 'text':
-            scraped_results = ScrapingService.scrape_web(query, limit, lang=filters.get('language', 'fr'))
-            filtered_results = SearchService.apply_filters(scraped_results, filters)
-            enriched_results = AIService.enrich_search_results(query, filtered_results)
+            enriched_results = _search_text(query, limit, filters, use_cache, merge)
 
             mongo_db.search_history.update_one(
                 {"_id": inserted.inserted_id},
@@ -127,7 +165,10 @@ def search_post():
 
         elif search_type == 'news':
             news = ScrapingService.scrape_news(query, limit)
-            filtered_news = SearchService.apply_filters(news, filters)
+            filtered_news = DedupService.collapse(SearchService.apply_filters(news, filters), _dedup_embedder())
+            if AIService.is_ready():
+                # Les providers renvoient des résultats bruts : l'ordre chronologique de GNews est conservé
+                filtered_news = AIService.enrich_search_results(query, filtered_news, rank=False)
 
             mongo_db.search_history.update_one(
                 {"_id": inserted.inserted_id},
@@ -179,6 +220,9 @@ def search_get():
 
         search_type = request.args.get('type', 'text')
         limit = request.args.get('limit', 10, type=int)
+        use_cache = request.args.get('no_cache', 'false').lower() not in ['true', 'on', '1']
+        merge = request.args.get('merge')
+        merge = merge.lower() in ['true', 'on', '1'] if merge is not None else None
 
         filters = {
             'date': request.args.get('date', 'any'),
@@ -202,9 +246,7 @@ def search_get():
         inserted = mongo_db.search_history.insert_one(search_history_doc)
 
         if search_type == 'text':
-            scraped_results = ScrapingService.scrape_web(query, limit, lang=filters.get('language', 'fr'))
-            filtered_results = SearchService.apply_filters(scraped_results, filters)
-            enriched_results = AIService.enrich_search_results(query, filtered_results)
+            enriched_results = _search_text(query, limit, filters, use_cache, merge)
 
             mongo_db.search_history.update_one(
                 {"_id": inserted.inserted_id},
@@ -239,7 +281,10 @@ def search_get():
 
         elif search_type == 'news':
             news = ScrapingService.scrape_news(query, limit)
-            filtered_news = SearchService.apply_filters(news, filters)
+            filtered_news = DedupService.collapse(SearchService.apply_filters(news, filters), _dedup_embedder())
+            if AIService.is_ready():
+                # Les providers renvoient des résultats bruts : l'ordre chronologique de GNews est conservé
+                filtered_news = AIService.enrich_search_results(query, filtered_news, rank=False)
 
             mongo_db.search_history.update_one(
                 {"_id": inserted.inserted_id},
@@ -268,6 +313,189 @@ def search_get():
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
 
+def _stream_event(payload, sse=False):
+    data = json.dumps(payload, default=str, ensure_ascii=False)
+    if sse:
+        return f"event: {payload['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def _strict_integer(field, value, error):
+    # Cerberus accepte les booléens comme entiers (bool hérite d'int) : true ne doit pas devenir limit=1
+    if isinstance(value, bool):
+        error(field, 'must be of integer type')
+
+
+STREAM_SCHEMA = {
+    'query': {'type': 'string', 'required': True, 'minlength': 3},
+    'limit': {'type': 'integer', 'min': 1, 'max': 50, 'check_with': _strict_integer},
+    'no_cache': {'type': 'boolean'},
+    'filters': {'type': 'dict', 'schema': FILTERS_SCHEMA},
+}
+
+
+def _search_stream(query, limit, filters, use_cache):
+    """Recherche texte en streaming (NDJSON ou SSE) : résultats bruts par provider, puis versions enrichies."""
+    user_id = get_jwt_identity()
+    current_app.logger.info(f"STREAM search by user_id: {user_id}")
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Invalid or missing user identity'}), 401
+
+    try:
+        user_obj_id = ObjectId(user_id)
+    except Exception as e:
+        current_app.logger.error(f"Invalid user ID format: {user_id} - {str(e)}")
+        return jsonify({'success': False, 'error': 'Invalid user ID format'}), 400
+
+    query = query.strip()
+    if len(query) < 3:
+        return jsonify({'success': False, 'error': 'Query too short'}), 400
+    if not 1 <= limit <= 50:
+        return jsonify({'success': False, 'error': 'Invalid limit'}), 400
+
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    mongo_db = current_app.mongo.db
+    inserted = mongo_db.search_history.insert_one({
+        "user_id": user_obj_id,
+        "query": query,
+        "search_type": 'text',
+        "source": "api-stream",
+        "timestamp": datetime.utcnow(),
+        "results_count": 0,
+        "filters": filters
+    })
+
+    def generate():
+        emitted = []
+        seen = set()
+        # Les résultats provisoires (corpus local) s'ajoutent à la limite : les providers réseau sont toujours attendus
+        counted = 0
+        provider_batches = ScrapingService.iter_web_results(query, limit, lang=filters.get('language', 'fr'), use_cache=use_cache)
+        try:
+            yield _stream_event({'event': 'meta', 'query': query, 'filters': filters}, sse)
+            query_embedding = None
+            # Cascade : un budget de résumés abstractifs pour tous les lots, le reste via /summaries
+            summary_budget = AIService.summary_budget()
+
+            for source, batch in provider_batches:
+                provisional = source in ScrapingService.PROVISIONAL_PROVIDERS
+                fresh = []
+                # Quasi-doublons du lot regroupés, puis URL canoniques déjà envoyées écartées (copies comprises)
+                for result in DedupService.collapse(SearchService.apply_filters(batch, filters), _dedup_embedder()):
+                    key = canonicalize_url(result.get('url')) or result.get('title')
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    seen.update(canonicalize_url(alternate.get('url')) for alternate in result.get('alternates', []) if alternate.get('url'))
+                    fresh.append(result)
+                    if not provisional and counted + len(fresh) >= limit:
+                        break
+                if not fresh:
+                    continue
+
+                offset = len(emitted)
+                emitted.extend(fresh)
+                if not provisional:
+                    counted += len(fresh)
+                yield _stream_event({'event': 'results', 'provider': source, 'offset': offset, 'results': fresh}, sse)
+
+                if AIService.is_ready():
+                    if query_embedding is None:
+                        query_embedding = AIService.encode_query(query)
+                    # Un seul passage par lot de provider : mémo, embeddings et résumés en batch
+                    enriched, spent = AIService.enrich_batch(query, fresh, query_embedding, summary_budget)
+                    if summary_budget is not None:
+                        summary_budget -= spent
+                    for index, result in enumerate(enriched, offset):
+                        yield _stream_event({'event': 'enriched', 'index': index, 'result': result}, sse)
+
+                if counted >= limit:
+                    break
+
+            mongo_db.search_history.update_one(
+                {"_id": inserted.inserted_id},
+                {"$set": {"results_count": len(emitted)}}
+            )
+            yield _stream_event({'event': 'done', 'count': len(emitted)}, sse)
+
+        except Exception as e:
+            current_app.logger.error(f"Exception in /search/stream: {str(e)}")
+            current_app.logger.error(traceback.format_exc())
+            yield _stream_event({'event': 'error', 'error': 'Internal server error'}, sse)
+        finally:
+            provider_batches.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/stream', methods=['GET', 'OPTIONS'])
+@jwt_required()
+@handle_options
+def search_stream_get():
+    filters = {
+        'date': request.args.get('date', 'any'),
+        'type': request.args.get('type_filter', 'all'),
+        'domain': request.args.get('domain', ''),
+        'language': request.args.get('language', 'fr'),
+        'category': request.args.get('category', '')
+    }
+    return _search_stream(
+        request.args.get('query', ''),
+        request.args.get('limit', 10, type=int),
+        filters,
+        request.args.get('no_cache', 'false').lower() not in ['true', 'on', '1']
+    )
+
+
+@bp.route('/stream', methods=['POST', 'OPTIONS'])
+@jwt_required()
+@handle_options
+@validate_json(STREAM_SCHEMA)
+def search_stream_post():
+    data = request.get_json()
+    return _search_stream(
+        data['query'],
+        data.get('limit', 10),
+        {**DEFAULT_FILTERS, **data.get('filters', {})},
+        not data.get('no_cache', False)
+    )
+
+
+@bp.route('/summaries', methods=['POST', 'OPTIONS'])
+@jwt_required()
+@handle_options
+@validate_json({
+    'results': {
+        'type': 'list',
+        'required': True,
+        'minlength': 1,
+        'maxlength': 20,
+        'schema': {
+            'type': 'dict',
+            'allow_unknown': True,
+            'schema': {
+                'url': {'type': 'string', 'nullable': True},
+                'snippet': {'type': 'string', 'required': True},
+                'language': {'type': 'string', 'nullable': True}
+            }
+        }
+    }
+})
+def summarize_pending():
+    """Résumés à la demande des résultats marqués 'summary_pending' par la recherche."""
+    try:
+        results = AIService.summarize_results(request.get_json()['results'])
+        return jsonify({'success': True, 'results': results, 'count': len(results)}), 200
+    except Exception as e:
+        current_app.logger.error(f"Exception in POST /search/summaries: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+
 @bp.route('/filters', methods=['GET'])
 def get_available_filters():
     return jsonify({
@@ -2,7 +2,9 @@
 import os
 import re
 import time
+import numpy as np
 import torch
+from collections import Counter
 from flask import current_app
 from transformers import pipeline
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -13,60 +15,36 @@ from deep_translator import GoogleTranslator
 # sentence-transformers pour pertinence rapide
 from sentence_transformers import SentenceTransformer, util
 
+from app.services.scraping_service import ScrapingService
+from app.services.cache_service import EnrichmentStore
+from app.services.inference_server import InferenceServerClient
+from app.services.model_registry import ModelRegistry
+from app.services.summary_router import SummaryRouter
+
 
 class AIService:
-    summarizer = None
-    similarity_model = None
+    DEFAULT_BATCH_SIZE = 8
+    TOPIC_STOPWORDS = {"le", "la", "les", "the", "and", "de"}
+    UNAVAILABLE_SUMMARIES = {"Résumé indisponible", "Résumé indisponible."}
+    # Modèles exécutés par le serveur d'inférence quand INFERENCE_MODE == 'server'
+    SERVED_MODELS = ('summarizer', 'similarity', 'bert2bert', 'image_captioning')
+
     hf_client = None
-    image_captioning = None
-    intent_model = None
-    intent_tokenizer = None
+    _summarizers = {}
 
     @staticmethod
     def initialize():
-        """Initialisation des modèles IA et du client Hugging Face."""
-        try:
-            device = 0 if torch.cuda.is_available() else -1
-
-            # Résumé ultra-rapide
-            AIService.summarizer = pipeline(
-                "summarization",
-                model="sshleifer/distilbart-cnn-12-6",
-                device=device
-            )
-            current_app.logger.info("✅ Modèle summarization chargé.")
-
-            # Pertinence avec sentence-transformers
-            AIService.similarity_model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
-            current_app.logger.info("✅ Modèle similarité chargé.")
-
-            # Captioning image (inchangé)
-            try:
-                AIService.image_captioning = pipeline(
-                    "image-to-text",
-                    model="Salesforce/blip-image-captioning-base",
-                    device=device,
-                    model_kwargs={"resume_download": True}
-                )
-                current_app.logger.info("✅ Modèle image-to-text chargé.")
-            except Exception as e:
-                current_app.logger.warning(f"⚠️ Image-to-text distant échoué : {e}")
-                try:
-                    AIService.image_captioning = pipeline("image-to-text", model="./models/blip-base", device=device)
-                    current_app.logger.info("✅ Modèle local image-to-text chargé.")
-                except Exception as ex:
-                    current_app.logger.error(f"❌ Échec total image-to-text : {ex}")
-                    AIService.image_captioning = None
-
-            # Intent model (inchangé)
-            if os.path.exists("./intent_model"):
-                from transformers import CamembertForSequenceClassification, CamembertTokenizerFast
-                AIService.intent_tokenizer = CamembertTokenizerFast.from_pretrained("./intent_model")
-                AIService.intent_model = CamembertForSequenceClassification.from_pretrained("./intent_model")
-                current_app.logger.info("✅ Modèle d’intention chargé.")
-
-        except Exception as e:
-            current_app.logger.error(f"❌ Erreur init modèles : {e}")
+        """Préchargement des modèles listés dans MODEL_PRELOAD (les autres se chargent à la demande) et client Hugging Face."""
+        preload = current_app.config.get('MODEL_PRELOAD', '')
+        if isinstance(preload, str):
+            preload = [name.strip() for name in preload.split(',') if name.strip()]
+        if InferenceServerClient.enabled():
+            # Résumé, similarité et captioning sont servis (en micro-batchs) par le serveur d'inférence
+            current_app.logger.info("🔌 Mode client : modèles servis par le serveur d'inférence.")
+            preload = [name for name in preload if name not in AIService.SERVED_MODELS]
+        ModelRegistry.preload(preload)
+
+        AIService.configure_summarizers()
 
         # Client HF
         hf_token = os.getenv("HF_API_TOKEN")
@@ -116,9 +94,12 @@ class AIService:
     def describe_image(image_path):
         """Renvoie une description d’image via IA."""
         try:
-            if not AIService.image_captioning:
-                return "🟥 Captioning non disponible"
-            description = AIService.image_captioning(image_path)
+            if InferenceServerClient.enabled():
+                return InferenceServerClient.caption([image_path])[0]
+            with ModelRegistry.use('image_captioning') as image_captioning:
+                if not image_captioning:
+                    return "🟥 Captioning non disponible"
+                description = image_captioning(image_path)
             if isinstance(description, list) and 'generated_text' in description[0]:
                 return description[0]['generated_text']
             return "Description indisponible"
@@ -127,43 +108,260 @@ class AIService:
             return "Description indisponible"
 
     @staticmethod
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=4))
-    def enrich_search_results(query, results):
-        """Ajoute résumé IA, score de pertinence et topics aux résultats."""
-        if not results or not AIService.summarizer or not AIService.similarity_model:
-            return []
+    def _summarize_distilbart(texts, lang=None):
+        with ModelRegistry.use('summarizer') as summarizer:
+            if not summarizer:
+                return [None] * len(texts)
+            outputs = summarizer(texts, max_length=50, min_length=10, do_sample=False, batch_size=AIService._batch_size())
+        return [o['summary_text'] for o in outputs]
 
-        enriched = []
-        for result in results:
-            try:
-                context = result.get('snippet', '')[:512]
-                if not context:
-                    enriched.append({**result, 'ai_summary': "Résumé indisponible", 'relevance_score': 5, 'topics': [], 'enriched': False})
-                    continue
+    @staticmethod
+    def register_summarizer(lang, func):
+        """Branche un résumeur pour une langue ('default' pour les autres) : func(textes, lang) -> résumés."""
+        AIService._summarizers[lang] = func
 
-                # Résumé ultra-rapide
-                summary = AIService.summarizer(context, max_length=50, min_length=10, do_sample=False)[0]['summary_text']
+    @staticmethod
+    def configure_summarizers():
+        """Associe un seul résumeur par langue d'après SUMMARIZER_BY_LANGUAGE (ex. "fr:bert2bert,en:distilbart")."""
+        backends = {
+            'distilbart': AIService._summarize_distilbart,
+            'bert2bert': ScrapingService.summarize_batch,
+        }
+        AIService._summarizers = {}
+        mapping = current_app.config.get('SUMMARIZER_BY_LANGUAGE', 'fr:bert2bert,en:distilbart')
+        for pair in filter(None, (p.strip() for p in mapping.split(','))):
+            lang, _, name = pair.partition(':')
+            if name.strip() not in backends:
+                current_app.logger.warning(f"⚠️ Résumeur inconnu '{name}' pour la langue '{lang}'")
+                continue
+            AIService.register_summarizer(lang.strip(), backends[name.strip()])
+        default = current_app.config.get('SUMMARIZER_DEFAULT', 'distilbart')
+        AIService.register_summarizer('default', backends.get(default, AIService._summarize_distilbart))
 
-                # Pertinence : cosine similarity query/context
-                score = util.cos_sim(
-                    AIService.similarity_model.encode(query, convert_to_tensor=True),
-                    AIService.similarity_model.encode(context, convert_to_tensor=True)
-                ).item()
-                score = round(score * 10)  # Scale to 0-10
+    @staticmethod
+    def summarize_batch(texts, lang=None):
+        summarizer = AIService._summarizers.get(lang) or AIService._summarizers.get('default')
+        if InferenceServerClient.enabled():
+            summarizer = InferenceServerClient.summarize
+        if summarizer is None:
+            return [None] * len(texts)
+        try:
+            # Texte court rendu tel quel, moyen résumé par extraction : seul le texte long va au modèle
+            return SummaryRouter.summarize(texts, lambda long_texts: summarizer(long_texts, lang))
+        except Exception as e:
+            current_app.logger.warning(f"[AIService] Résumé batch échoué ({lang}) : {e}")
+            return [None] * len(texts)
+
+    @staticmethod
+    def is_ready():
+        return InferenceServerClient.enabled() or ModelRegistry.get('similarity') is not None
 
-                words = re.findall(r'\w+', context.lower())
-                stopwords = {"le", "la", "les", "the", "and", "de"}
-                topics = sorted(set([w for w in words if w not in stopwords]), key=words.count, reverse=True)[:5]
+    @staticmethod
+    def embed(texts):
+        """Embeddings (tensor n x d) des textes, calculés localement ou par le serveur d'inférence."""
+        if InferenceServerClient.enabled():
+            return torch.from_numpy(np.stack(InferenceServerClient.embed(texts)))
+        with ModelRegistry.use('similarity') as similarity:
+            return similarity.encode(texts, convert_to_tensor=True, batch_size=AIService._batch_size())
 
-                enriched.append({**result, 'ai_summary': summary, 'relevance_score': score, 'topics': topics, 'enriched': True})
-                time.sleep(0.2)
+    @staticmethod
+    def encode_query(query):
+        return AIService.embed([query])[0]
 
-            except Exception as e:
-                current_app.logger.warning(f"[AIService] Erreur enrichissement : {e}")
-                enriched.append({**result, 'ai_summary': "Résumé indisponible", 'relevance_score': 5, 'topics': [], 'enriched': False})
+    @staticmethod
+    def extract_topics(text, limit=5):
+        """Mots les plus fréquents du texte (hors stopwords), en un seul passage."""
+        words = re.findall(r'\w+', text.lower())
+        counts = Counter(w for w in words if w not in AIService.TOPIC_STOPWORDS)
+        return [w for w, _ in counts.most_common(limit)]
+
+    @staticmethod
+    def summary_budget():
+        """Nombre de résultats résumés d'office par recherche (ENRICH_SUMMARY_TOP_K), None pour tous."""
+        return current_app.config.get('ENRICH_SUMMARY_TOP_K', 0) or None
+
+    @staticmethod
+    def _batch_size():
+        return current_app.config.get('ENRICH_BATCH_SIZE', AIService.DEFAULT_BATCH_SIZE)
+
+    @staticmethod
+    def _unavailable(result):
+        return {**result, 'ai_summary': "Résumé indisponible", 'relevance_score': 5, 'topics': [], 'enriched': False}
+
+    @staticmethod
+    def _has_summary(result):
+        return bool(result.get('ai_summary')) and result['ai_summary'] not in AIService.UNAVAILABLE_SUMMARIES
+
+    @staticmethod
+    def _enrich_batch(query, results, query_embedding=None, summary_budget=None):
+        """Étape d'enrichissement unique : ne calcule que ce qui manque (résumé, score, topics), en batch.
+
+        Les enrichissements déjà mémorisés (URL canonique + snippet) sont relus en une requête avant tout modèle.
+        summary_budget : parmi les résultats à résumer par le modèle abstractif (texte long, sans résumé mémorisé),
+        seuls les summary_budget plus pertinents le sont, les autres sont marqués 'summary_pending' (résumé à la
+        demande) ; None pour tout résumer.
+        Renvoie (résultats enrichis, nombre de résumés abstractifs pris sur le budget).
+        """
+        enriched = [None] * len(results)
+        contexts = {}
+        for i, result in enumerate(results):
+            context = (result.get('snippet') or '')[:512]
+            if context:
+                contexts[i] = context
+            else:
+                enriched[i] = AIService._unavailable(result)
+
+        memo = EnrichmentStore.lookup(results)
+
+        # Pertinence : requête encodée une fois, snippets embarqués en un seul batch (sauf embeddings mémorisés)
+        scores = {}
+        embeddings = {i: memo[i]['embedding'] for i in memo if memo[i]['embedding'] is not None}
+        to_score = [i for i in contexts if 'relevance_score' not in results[i]]
+        if to_score:
+            if query_embedding is None:
+                query_embedding = AIService.encode_query(query)
+            to_embed = [i for i in to_score if i not in embeddings]
+            if to_embed:
+                fresh = AIService.embed([contexts[i] for i in to_embed]).cpu().numpy()
+                embeddings.update(zip(to_embed, fresh))
+            matrix = torch.from_numpy(np.stack([embeddings[i] for i in to_score])).to(query_embedding.device, query_embedding.dtype)
+            similarities = util.cos_sim(query_embedding, matrix)[0].tolist()
+            scores = {i: round(score * 10) for i, score in zip(to_score, similarities)}  # Scale to 0-10
+
+        # Résumés : un seul résumeur par langue, uniquement pour les résultats qui n'en ont pas
+        summaries = {}
+        missing = []
+        for i in contexts:
+            if AIService._has_summary(results[i]):
+                continue
+            if AIService._has_summary(memo.get(i, {})):
+                summaries[i] = memo[i]['ai_summary']
+            else:
+                missing.append(i)
+
+        # Cascade : seuls les textes longs (modèle abstractif) comptent dans le budget, le score (embeddings,
+        # peu coûteux) choisit lesquels sont résumés tout de suite ; textes courts et moyens résolus d'office
+        pending, spent = set(), 0
+        if summary_budget is not None and missing:
+            routes = SummaryRouter.route([contexts[i] for i in missing])
+            costly = [i for i, route in zip(missing, routes) if route == 'abstractive']
+            ranked = sorted(costly, key=lambda i: -scores.get(i, results[i].get('relevance_score', 5)))
+            pending = set(ranked[summary_budget:])
+            spent = len(costly) - len(pending)
+
+        by_lang = {}
+        for i in missing:
+            if i not in pending:
+                by_lang.setdefault(results[i].get('language'), []).append(i)
+        for lang, indices in by_lang.items():
+            outputs = AIService.summarize_batch([contexts[i] for i in indices], lang)
+            summaries.update(zip(indices, outputs))
+
+        for i, context in contexts.items():
+            result = results[i]
+            summary = summaries.get(i, result.get('ai_summary'))
+            available = bool(summary) and summary not in AIService.UNAVAILABLE_SUMMARIES
+            if 'topics' in result:
+                topics = result['topics']
+            else:
+                topics = memo[i]['topics'] if memo.get(i, {}).get('topics') is not None else AIService.extract_topics(context)
+            enriched[i] = {
+                **result,
+                'ai_summary': summary if available else "Résumé indisponible",
+                'relevance_score': scores.get(i, result.get('relevance_score', 5)),
+                'topics': topics,
+                'enriched': available
+            }
+            if i in pending and not available:
+                enriched[i].update(ai_summary=None, summary_pending=True)
+
+            cached = memo.get(i)
+            if cached is None or (available and not AIService._has_summary(cached)) or (i in embeddings and cached['embedding'] is None):
+                EnrichmentStore.store(result, summary if available else None, topics, embeddings.get(i))
+        return enriched, spent
+
+    @staticmethod
+    def enrich_batch(query, results, query_embedding=None, summary_budget=None):
+        """Enrichit un lot dans l'ordre reçu ; renvoie (résultats, résumés abstractifs consommés sur summary_budget).
+
+        Modèles absents ou lot en erreur : résultats marqués indisponibles, budget intact.
+        """
+        if not AIService.is_ready():
+            return [AIService._unavailable(result) for result in results], 0
+        try:
+            return AIService._enrich_batch(query, results, query_embedding, summary_budget)
+        except Exception as e:
+            current_app.logger.warning(f"[AIService] Enrichissement du lot échoué : {e}")
+            return [AIService._unavailable(result) for result in results], 0
+
+    @staticmethod
+    def enrich_result(query, result, query_embedding=None, summarize=True):
+        """Enrichit un seul résultat : résumé IA (texte long laissé en attente si summarize=False), score et topics."""
+        try:
+            return AIService._enrich_batch(query, [result], query_embedding, None if summarize else 0)[0][0]
+        except Exception as e:
+            current_app.logger.warning(f"[AIService] Erreur enrichissement : {e}")
+            return AIService._unavailable(result)
+
+    @staticmethod
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=4))
+    def enrich_search_results(query, results, rank=True, query_embedding=None, summary_budget=None):
+        """Ajoute résumé IA, score de pertinence et topics aux résultats (triés par pertinence si rank).
+
+        Seuls les ENRICH_SUMMARY_TOP_K plus pertinents (ou summary_budget) sont résumés ; les autres gardent
+        'summary_pending' et se résument à la demande (summarize_results).
+        """
+        if not results or not AIService.is_ready():
+            return []
 
+        if summary_budget is None:
+            summary_budget = AIService.summary_budget()
+        try:
+            enriched, _ = AIService._enrich_batch(query, results, query_embedding, summary_budget)
+        except Exception as e:
+            # Un snippet problématique ne doit pas priver les autres de leur enrichissement
+            current_app.logger.warning(f"[AIService] Enrichissement batch échoué, repli unitaire : {e}")
+            if query_embedding is None:
+                query_embedding = AIService.encode_query(query)
+            enriched = [
+                AIService.enrich_result(query, result, query_embedding, summary_budget is None or k < summary_budget)
+                for k, result in enumerate(results)
+            ]
+
+        if not rank:
+            return enriched
         return sorted(enriched, key=lambda x: x['relevance_score'], reverse=True)
 
+    @staticmethod
+    def summarize_results(results):
+        """Résumés à la demande des résultats laissés en attente par la cascade : mémo d'abord, puis résumeur par langue."""
+        memo = EnrichmentStore.lookup(results)
+        summaries = {}
+        by_lang = {}
+        for i, result in enumerate(results):
+            if AIService._has_summary(memo.get(i, {})):
+                summaries[i] = memo[i]['ai_summary']
+            elif result.get('snippet'):
+                by_lang.setdefault(result.get('language'), []).append(i)
+        for lang, indices in by_lang.items():
+            outputs = AIService.summarize_batch([results[i]['snippet'][:512] for i in indices], lang)
+            for i, summary in zip(indices, outputs):
+                summaries[i] = summary
+                if summary and summary not in AIService.UNAVAILABLE_SUMMARIES:
+                    EnrichmentStore.store(results[i], summary)
+
+        summarized = []
+        for i, result in enumerate(results):
+            summary = summaries.get(i)
+            available = bool(summary) and summary not in AIService.UNAVAILABLE_SUMMARIES
+            summarized.append({
+                **result,
+                'ai_summary': summary if available else "Résumé indisponible",
+                'summary_pending': False,
+                'enriched': available
+            })
+        return summarized
+
     @staticmethod
     def generate_images(prompt, limit=1):
         """Génère des images IA via Hugging Face."""
@@ -208,6 +406,8 @@ class AIService:
             trainer.train()
             model.save_pretrained("./intent_model")
             tokenizer.save_pretrained("./intent_model")
+            # Le prochain predict_intent rechargera le modèle fraîchement entraîné
+            ModelRegistry.unload('intent')
 
             current_app.logger.info("✅ Modèle d’intention entraîné avec succès.")
             return True
@@ -219,10 +419,12 @@ class AIService:
     def predict_intent(text):
         """Prédit l’intention d’une requête utilisateur."""
         try:
-            if not AIService.intent_model or not AIService.intent_tokenizer:
-                return "Modèle non chargé"
-            tokens = AIService.intent_tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-            output = AIService.intent_model(**tokens)
+            with ModelRegistry.use('intent') as intent:
+                if not intent:
+                    return "Modèle non chargé"
+                intent_tokenizer, intent_model = intent
+                tokens = intent_tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+                output = intent_model(**tokens)
             pred = output.logits.argmax().item()
             return f"Intent #{pred}"
         except Exception as e:
@@ -235,3 +437,50 @@ class AIService:
         if isinstance(input_data, str) and os.path.exists(input_data) and input_data.lower().endswith(('.png', '.jpg', '.jpeg')):
             return AIService.describe_image(input_data)
         return AIService.comprehend_query(input_data)
+
+
+def _device():
+    return 0 if torch.cuda.is_available() else -1
+
+
+def _load_summarizer():
+    # Résumé ultra-rapide
+    return pipeline("summarization", model="sshleifer/distilbart-cnn-12-6", device=_device())
+
+
+def _load_similarity():
+    # Pertinence avec sentence-transformers
+    return SentenceTransformer("paraphrase-MiniLM-L6-v2")
+
+
+def _load_image_captioning():
+    try:
+        return pipeline(
+            "image-to-text",
+            model="Salesforce/blip-image-captioning-base",
+            device=_device(),
+            model_kwargs={"resume_download": True}
+        )
+    except Exception:
+        # Repli sur une copie locale du modèle
+        return pipeline("image-to-text", model="./models/blip-base", device=_device())
+
+
+def _load_intent():
+    if not os.path.exists("./intent_model"):
+        return None
+    from transformers import CamembertForSequenceClassification, CamembertTokenizerFast
+    return (
+        CamembertTokenizerFast.from_pretrained("./intent_model"),
+        CamembertForSequenceClassification.from_pretrained("./intent_model")
+    )
+
+
+ModelRegistry.register(
+    'summarizer', _load_summarizer,
+    warmup=lambda m: m("Le modèle est chargé et prêt à résumer des extraits de résultats de recherche. " * 3, max_length=20, min_length=5, do_sample=False),
+    quantize=True
+)
+ModelRegistry.register('similarity', _load_similarity, warmup=lambda m: m.encode(["warmup"], convert_to_tensor=True), quantize=True)
+ModelRegistry.register('image_captioning', _load_image_captioning)
+ModelRegistry.register('intent', _load_intent)
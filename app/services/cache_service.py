@@ -0,0 +1,502 @@
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+
+from app.utils.helpers import normalize_query, canonicalize_url
+
+
+class ScrapeCache:
+    """Cache des résultats de scraping : LRU en mémoire (TTL) + collection Mongo TTL partagée entre workers."""
+
+    COLLECTION = 'scrape_cache'
+    DEFAULT_MAX_ENTRIES = 512
+    DEFAULT_TTL = 1800
+    DEFAULT_TTLS = {
+        'news': 300,
+        'definition': 86400,
+    }
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _settings = {'enabled': True, 'max_entries': DEFAULT_MAX_ENTRIES, 'ttls': {}, 'default_ttl': DEFAULT_TTL}
+    _collection = None
+    _index_ready = False
+    _logger = None
+    _stats = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bypasses': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        ttls = dict(cls.DEFAULT_TTLS)
+        for key, value in app.config.items():
+            if key.startswith('SCRAPE_CACHE_TTL_') and key != 'SCRAPE_CACHE_TTL_DEFAULT':
+                ttls[key[len('SCRAPE_CACHE_TTL_'):].lower()] = int(value)
+
+        cls._settings = {
+            'enabled': app.config.get('SCRAPE_CACHE_ENABLED', True),
+            'max_entries': app.config.get('SCRAPE_CACHE_MAX_ENTRIES', cls.DEFAULT_MAX_ENTRIES),
+            'default_ttl': app.config.get('SCRAPE_CACHE_TTL_DEFAULT', cls.DEFAULT_TTL),
+            'ttls': ttls,
+        }
+        cls._logger = app.logger
+        cls._collection = app.mongo.db[cls.COLLECTION] if app.config.get('SCRAPE_CACHE_MONGO', True) else None
+        cls._index_ready = False
+        cls.clear()
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', True)
+
+    @classmethod
+    def ttl_for(cls, query_type):
+        return cls._settings['ttls'].get(query_type, cls._settings.get('default_ttl', cls.DEFAULT_TTL))
+
+    @staticmethod
+    def make_key(query, lang, query_type, limit, mode=None):
+        raw = f"{normalize_query(query)}|{lang}|{query_type}|{limit}"
+        if mode:
+            # Les résultats fusionnés ne sont pas interchangeables avec ceux du premier provider
+            raw += f"|{mode}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _incr(cls, counter):
+        with cls._lock:
+            cls._stats[counter] += 1
+
+    @classmethod
+    def record_bypass(cls):
+        cls._incr('bypasses')
+
+    @classmethod
+    def _warn(cls, msg):
+        if cls._logger:
+            cls._logger.warning(msg)
+        else:
+            print(msg)
+
+    @classmethod
+    def _ensure_index(cls):
+        if cls._index_ready or cls._collection is None:
+            return
+        # expireAfterSeconds=0 : Mongo supprime le document dès que expires_at est dépassé
+        cls._collection.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0)
+        cls._index_ready = True
+
+    @classmethod
+    def _memory_get(cls, key):
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at <= time.monotonic():
+                del cls._entries[key]
+                return None
+            cls._entries.move_to_end(key)
+            return results
+
+    @classmethod
+    def _memory_set(cls, key, results, ttl):
+        with cls._lock:
+            cls._entries[key] = (time.monotonic() + ttl, results)
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > cls._settings.get('max_entries', cls.DEFAULT_MAX_ENTRIES):
+                cls._entries.popitem(last=False)
+                cls._stats['evictions'] += 1
+
+    @classmethod
+    def get(cls, query, lang, query_type, limit, mode=None):
+        if not cls.enabled():
+            return None
+        key = cls.make_key(query, lang, query_type, limit, mode)
+
+        results = cls._memory_get(key)
+        if results is not None:
+            cls._incr('memory_hits')
+            return [dict(r) for r in results]
+
+        if cls._collection is not None:
+            try:
+                doc = cls._collection.find_one({'_id': key})
+                now = datetime.utcnow()
+                if doc and doc.get('expires_at') and doc['expires_at'] > now:
+                    results = doc.get('results', [])
+                    cls._memory_set(key, results, (doc['expires_at'] - now).total_seconds())
+                    cls._incr('mongo_hits')
+                    return [dict(r) for r in results]
+            except Exception as e:
+                cls._warn(f"[ScrapeCache] Lecture Mongo échouée : {e}")
+
+        cls._incr('misses')
+        return None
+
+    @classmethod
+    def set(cls, query, lang, query_type, limit, results, mode=None):
+        if not cls.enabled() or not results:
+            return
+        key = cls.make_key(query, lang, query_type, limit, mode)
+        ttl = cls.ttl_for(query_type)
+        results = [dict(r) for r in results]
+        cls._memory_set(key, results, ttl)
+        cls._incr('stores')
+
+        if cls._collection is not None:
+            try:
+                cls._ensure_index()
+                now = datetime.utcnow()
+                cls._collection.replace_one(
+                    {'_id': key},
+                    {
+                        '_id': key,
+                        'results': results,
+                        'lang': lang,
+                        'query_type': query_type,
+                        'limit': limit,
+                        'mode': mode or 'first',
+                        'created_at': now,
+                        'expires_at': now + timedelta(seconds=ttl)
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                cls._warn(f"[ScrapeCache] Écriture Mongo échouée : {e}")
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            for counter in cls._stats:
+                cls._stats[counter] = 0
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['memory_entries'] = len(cls._entries)
+        hits = stats['memory_hits'] + stats['mongo_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        stats['mongo_tier'] = cls._collection is not None
+        return stats
+
+
+class SemanticCache:
+    """Cache des recherches enrichies, interrogé par similarité : l'embedding de la requête est comparé
+    (cosinus) à ceux des requêtes récentes, rangés dans une matrice NumPy de capacité fixe.
+    « c'est quoi X » réutilise ainsi les résultats de « définition X ». Une entrée ne sert que dans son
+    contexte (langue, type de requête, limite, filtres) ; au-delà de la capacité, la moins récemment servie est évincée.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1024
+    DEFAULT_THRESHOLD = 0.92
+    DEFAULT_TTL = 1800
+
+    _lock = threading.Lock()
+    _settings = {'enabled': False, 'max_entries': DEFAULT_MAX_ENTRIES, 'threshold': DEFAULT_THRESHOLD, 'ttl': DEFAULT_TTL}
+    _matrix = None  # (capacité, dimension) float32, lignes normalisées
+    _contexts = None  # empreinte du contexte de chaque ligne
+    _expires = None
+    _used = None
+    _entries = []  # (requête, résultats) par ligne
+    _size = 0
+    _stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('SEMANTIC_CACHE_ENABLED', True),
+            'max_entries': app.config.get('SEMANTIC_CACHE_MAX_ENTRIES', cls.DEFAULT_MAX_ENTRIES),
+            'threshold': app.config.get('SEMANTIC_CACHE_THRESHOLD', cls.DEFAULT_THRESHOLD),
+            'ttl': app.config.get('SEMANTIC_CACHE_TTL', cls.DEFAULT_TTL),
+        }
+        cls.clear()
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @staticmethod
+    def context(lang, query_type, limit, filters=None, mode=None):
+        """Empreinte (entier) du contexte hors requête : deux recherches ne partagent des résultats qu'à contexte égal."""
+        raw = json.dumps([lang, query_type, limit, filters or {}, mode], sort_keys=True, default=str)
+        return int(hashlib.sha1(raw.encode('utf-8')).hexdigest()[:15], 16)
+
+    @staticmethod
+    def _vector(embedding):
+        if hasattr(embedding, 'detach'):
+            embedding = embedding.detach().cpu().numpy()
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @classmethod
+    def _allocate(cls, dim):
+        capacity = cls._settings.get('max_entries', cls.DEFAULT_MAX_ENTRIES)
+        cls._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        cls._contexts = np.zeros(capacity, dtype=np.int64)
+        cls._expires = np.zeros(capacity, dtype=np.float64)
+        cls._used = np.zeros(capacity, dtype=np.float64)
+        cls._entries = [None] * capacity
+        cls._size = 0
+
+    @classmethod
+    def _nearest(cls, vector, context, now):
+        """(ligne, similarité) de l'entrée vivante la plus proche dans ce contexte, ou (None, -1)."""
+        if cls._matrix is None or not cls._size or cls._matrix.shape[1] != vector.shape[0]:
+            return None, -1.0
+        n = cls._size
+        similarities = cls._matrix[:n] @ vector
+        similarities[(cls._contexts[:n] != context) | (cls._expires[:n] <= now)] = -1.0
+        row = int(np.argmax(similarities))
+        return row, float(similarities[row])
+
+    @classmethod
+    def get(cls, query_embedding, context):
+        """(résultats, similarité) de la requête la plus proche au-dessus du seuil, sinon None."""
+        if not cls.enabled():
+            return None
+        vector = cls._vector(query_embedding)
+        now = time.monotonic()
+        with cls._lock:
+            cls._stats['lookups'] += 1
+            row, similarity = cls._nearest(vector, context, now)
+            if row is None or similarity < cls._settings.get('threshold', cls.DEFAULT_THRESHOLD):
+                cls._stats['misses'] += 1
+                return None
+            cls._used[row] = now
+            cls._stats['hits'] += 1
+            _, results = cls._entries[row]
+        return [dict(r) for r in results], similarity
+
+    @classmethod
+    def set(cls, query, query_embedding, context, results):
+        if not cls.enabled() or not results:
+            return
+        vector = cls._vector(query_embedding)
+        now = time.monotonic()
+        with cls._lock:
+            if cls._matrix is None or cls._matrix.shape[1] != vector.shape[0]:
+                cls._allocate(vector.shape[0])
+            row, similarity = cls._nearest(vector, context, now)
+            if row is None or similarity < 0.999:
+                if cls._size < len(cls._entries):
+                    row = cls._size
+                    cls._size += 1
+                else:
+                    # Une entrée expirée d'abord, sinon la moins récemment servie
+                    expired = np.flatnonzero(cls._expires[:cls._size] <= now)
+                    row = int(expired[0]) if expired.size else int(np.argmin(cls._used[:cls._size]))
+                    cls._stats['evictions'] += 1
+            cls._matrix[row] = vector
+            cls._contexts[row] = context
+            cls._expires[row] = now + cls._settings.get('ttl', cls.DEFAULT_TTL)
+            cls._used[row] = now
+            cls._entries[row] = (query, [dict(r) for r in results])
+            cls._stats['stores'] += 1
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._matrix = None
+            cls._entries = []
+            cls._size = 0
+            for counter in cls._stats:
+                cls._stats[counter] = 0
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['entries'] = int(np.count_nonzero(cls._expires[:cls._size] > time.monotonic())) if cls._size else 0
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0.0
+        stats['enabled'] = cls.enabled()
+        stats['threshold'] = cls._settings.get('threshold', cls.DEFAULT_THRESHOLD)
+        return stats
+
+
+class EnrichmentStore:
+    """Mémo Mongo des enrichissements (résumé, topics, embedding) par URL canonique + hash du snippet.
+
+    Lecture : une seule requête $in par lot de résultats. Écriture : tampon vidé par bulk_write.
+    """
+
+    COLLECTION = 'enrichment_memo'
+    DEFAULT_TTL = 7 * 86400
+    DEFAULT_FLUSH_SIZE = 32
+    DEFAULT_FLUSH_INTERVAL = 5
+
+    _settings = {'enabled': False, 'ttl': DEFAULT_TTL, 'flush_size': DEFAULT_FLUSH_SIZE, 'flush_interval': DEFAULT_FLUSH_INTERVAL}
+    _collection = None
+    _index_ready = False
+    _pending = {}
+    _last_flush = 0.0
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _logger = None
+    _stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'writes': 0, 'flushes': 0, 'errors': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('ENRICH_STORE_ENABLED', True),
+            'ttl': app.config.get('ENRICH_STORE_TTL', cls.DEFAULT_TTL),
+            'flush_size': app.config.get('ENRICH_STORE_FLUSH_SIZE', cls.DEFAULT_FLUSH_SIZE),
+            'flush_interval': app.config.get('ENRICH_STORE_FLUSH_INTERVAL', cls.DEFAULT_FLUSH_INTERVAL),
+        }
+        cls._logger = app.logger
+        cls._collection = app.mongo.db[cls.COLLECTION] if cls._settings['enabled'] else None
+        cls._index_ready = False
+        with cls._lock:
+            cls._pending = {}
+            for counter in cls._stats:
+                cls._stats[counter] = 0
+        cls._last_flush = time.monotonic()
+
+    @classmethod
+    def enabled(cls):
+        return cls._collection is not None
+
+    @classmethod
+    def _warn(cls, msg):
+        with cls._lock:
+            cls._stats['errors'] += 1
+        if cls._logger:
+            cls._logger.warning(msg)
+        else:
+            print(msg)
+
+    @staticmethod
+    def make_key(result):
+        """Clé du mémo, ou None si le résultat n'a pas d'URL exploitable."""
+        url = canonicalize_url(result.get('url'))
+        snippet = (result.get('snippet') or '')[:512]
+        if not url or not snippet:
+            return None
+        snippet_hash = hashlib.sha1(snippet.encode('utf-8')).hexdigest()
+        return hashlib.sha1(f"{url}|{snippet_hash}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _decode(doc):
+        embedding = doc.get('embedding')
+        return {
+            'ai_summary': doc.get('ai_summary'),
+            'topics': doc.get('topics'),
+            'embedding': np.frombuffer(embedding, dtype=np.float32) if embedding else None,
+        }
+
+    @classmethod
+    def lookup(cls, results):
+        """Entrées mémorisées par index de résultat : {i: {'ai_summary', 'topics', 'embedding'}}."""
+        if not cls.enabled():
+            return {}
+        keys = {}
+        for i, result in enumerate(results):
+            key = cls.make_key(result)
+            if key:
+                keys.setdefault(key, []).append(i)
+        if not keys:
+            return {}
+
+        docs = {}
+        with cls._lock:
+            # Les entrées pas encore écrites sont déjà valables
+            for key in keys:
+                if key in cls._pending:
+                    docs[key] = cls._pending[key]
+        missing = [key for key in keys if key not in docs]
+        if missing:
+            try:
+                cursor = cls._collection.find(
+                    {'_id': {'$in': missing}, 'expires_at': {'$gt': datetime.utcnow()}},
+                    {'ai_summary': 1, 'topics': 1, 'embedding': 1}
+                )
+                docs.update((doc['_id'], doc) for doc in cursor)
+            except Exception as e:
+                cls._warn(f"[EnrichmentStore] Lecture Mongo échouée : {e}")
+
+        memo = {}
+        for key, doc in docs.items():
+            entry = cls._decode(doc)
+            for i in keys[key]:
+                memo[i] = entry
+        with cls._lock:
+            cls._stats['lookups'] += 1
+            cls._stats['hits'] += len(memo)
+            cls._stats['misses'] += sum(len(indices) for indices in keys.values()) - len(memo)
+        return memo
+
+    @classmethod
+    def store(cls, result, ai_summary=None, topics=None, embedding=None):
+        """Met en tampon l'enrichissement d'un résultat ; le tampon est écrit par lots."""
+        if not cls.enabled():
+            return
+        key = cls.make_key(result)
+        if not key:
+            return
+        now = datetime.utcnow()
+        doc = {
+            'url': canonicalize_url(result.get('url')),
+            'ai_summary': ai_summary,
+            'topics': topics,
+            'embedding': np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None,
+            'language': result.get('language'),
+            'updated_at': now,
+            'expires_at': now + timedelta(seconds=cls._settings.get('ttl', cls.DEFAULT_TTL)),
+        }
+        with cls._lock:
+            previous = cls._pending.get(key, {})
+            # Ne pas écraser par None ce qu'un autre enrichissement a déjà produit
+            cls._pending[key] = {**previous, **{k: v for k, v in doc.items() if v is not None}}
+            due = (
+                len(cls._pending) >= cls._settings.get('flush_size', cls.DEFAULT_FLUSH_SIZE)
+                or time.monotonic() - cls._last_flush >= cls._settings.get('flush_interval', cls.DEFAULT_FLUSH_INTERVAL)
+            )
+        if due:
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        if not cls.enabled():
+            return 0
+        with cls._flush_lock:
+            with cls._lock:
+                pending, cls._pending = cls._pending, {}
+                cls._last_flush = time.monotonic()
+            if not pending:
+                return 0
+            try:
+                if not cls._index_ready:
+                    cls._collection.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0)
+                    cls._index_ready = True
+                cls._collection.bulk_write(
+                    [UpdateOne({'_id': key}, {'$set': doc}, upsert=True) for key, doc in pending.items()],
+                    ordered=False
+                )
+            except Exception as e:
+                cls._warn(f"[EnrichmentStore] Écriture Mongo échouée : {e}")
+                return 0
+            with cls._lock:
+                cls._stats['writes'] += len(pending)
+                cls._stats['flushes'] += 1
+            return len(pending)
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['pending'] = len(cls._pending)
+        looked_up = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / looked_up, 3) if looked_up else 0.0
+        stats['enabled'] = cls.enabled()
+        return stats
+
+
+# Les enrichissements encore en tampon sont écrits à l'arrêt du worker
+atexit.register(EnrichmentStore.flush)
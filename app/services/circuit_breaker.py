@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un provider : closed -> open (trop d'échecs ou d'appels lents) -> half_open (une sonde) -> closed."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=20, min_calls=5, failure_rate=0.5, slow_call_seconds=5.0, slow_call_rate=0.8, open_seconds=30):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._calls = deque(maxlen=window)
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    def _probe_free(self, now):
+        if self.state == self.OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        # Une sonde qui n'a jamais rapporté (abandonnée à la deadline) n'empêche pas la suivante
+        return self.state == self.HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.open_seconds)
+
+    def available(self):
+        """Comme allow, sans prendre la sonde : pour trier les providers avant de savoir lesquels partiront."""
+        with self._lock:
+            if self.state == self.CLOSED or self._probe_free(time.monotonic()):
+                return True
+            self.rejected += 1
+            return False
+
+    def allow(self):
+        """True si un appel peut partir ; en half_open une seule sonde à la fois. À appeler juste avant l'appel."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self._probe_free(now):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Appel autorisé mais jamais parti (pool saturé) : la sonde est rendue."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_started = None
+
+    def record(self, success, elapsed):
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if success and not slow:
+                    self.state = self.CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                self._probe_started = None
+                return
+
+            self._calls.append((success, slow))
+            if self.state == self.CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+                slow_calls = sum(1 for _, is_slow in self._calls if is_slow) / len(self._calls)
+                if failures >= self.failure_rate or slow_calls >= self.slow_call_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._calls.clear()
+
+    def snapshot(self):
+        with self._lock:
+            calls = len(self._calls)
+            return {
+                'state': self.state,
+                'calls': calls,
+                'failure_rate': round(sum(1 for ok, _ in self._calls if not ok) / calls, 3) if calls else 0.0,
+                'slow_rate': round(sum(1 for _, slow in self._calls if slow) / calls, 3) if calls else 0.0,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_in': round(max(self.open_seconds - (time.monotonic() - self.opened_at), 0), 1) if self.state == self.OPEN else None,
+            }
+
+
+class ProviderBreakers:
+    """Disjoncteurs des providers de scraping et cache négatif des requêtes qui viennent de revenir vides."""
+
+    DEFAULT_NEGATIVE_TTL = 120
+    DEFAULT_NEGATIVE_MAX_ENTRIES = 1024
+
+    _settings = {}
+    _breakers = {}
+    _negative = OrderedDict()
+    _lock = threading.Lock()
+    _negative_stats = {'hits': 0, 'stores': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'breaker': {
+                'window': app.config.get('BREAKER_WINDOW', 20),
+                'min_calls': app.config.get('BREAKER_MIN_CALLS', 5),
+                'failure_rate': app.config.get('BREAKER_FAILURE_RATE', 0.5),
+                'slow_call_seconds': app.config.get('BREAKER_SLOW_CALL_SECONDS', 5.0),
+                'slow_call_rate': app.config.get('BREAKER_SLOW_CALL_RATE', 0.8),
+                'open_seconds': app.config.get('BREAKER_OPEN_SECONDS', 30),
+            },
+            'negative_ttl': app.config.get('NEGATIVE_CACHE_TTL', cls.DEFAULT_NEGATIVE_TTL),
+            'negative_max_entries': app.config.get('NEGATIVE_CACHE_MAX_ENTRIES', cls.DEFAULT_NEGATIVE_MAX_ENTRIES),
+        }
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._breakers = {}
+            cls._negative.clear()
+            cls._negative_stats = {'hits': 0, 'stores': 0}
+
+    @classmethod
+    def get(cls, name):
+        breaker = cls._breakers.get(name)
+        if breaker is None:
+            with cls._lock:
+                breaker = cls._breakers.setdefault(name, CircuitBreaker(name, **cls._settings.get('breaker', {})))
+        return breaker
+
+    @classmethod
+    def available(cls, name):
+        return cls.get(name).available()
+
+    @classmethod
+    def allow(cls, name):
+        return cls.get(name).allow()
+
+    @classmethod
+    def release(cls, name):
+        cls.get(name).release()
+
+    @classmethod
+    def record(cls, name, success, elapsed):
+        cls.get(name).record(success, elapsed)
+
+    @classmethod
+    def is_known_empty(cls, name, key):
+        with cls._lock:
+            expires_at = cls._negative.get((name, key))
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del cls._negative[(name, key)]
+                return False
+            cls._negative_stats['hits'] += 1
+            return True
+
+    @classmethod
+    def remember_empty(cls, name, key):
+        ttl = cls._settings.get('negative_ttl', cls.DEFAULT_NEGATIVE_TTL)
+        if not ttl:
+            return
+        with cls._lock:
+            cls._negative[(name, key)] = time.monotonic() + ttl
+            cls._negative.move_to_end((name, key))
+            while len(cls._negative) > cls._settings.get('negative_max_entries', cls.DEFAULT_NEGATIVE_MAX_ENTRIES):
+                cls._negative.popitem(last=False)
+            cls._negative_stats['stores'] += 1
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            breakers = dict(cls._breakers)
+            negative = {**cls._negative_stats, 'entries': len(cls._negative)}
+        return {
+            'providers': {name: breaker.snapshot() for name, breaker in breakers.items()},
+            'negative_cache': negative
+        }
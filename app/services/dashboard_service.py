@@ -1,6 +1,18 @@
 from datetime import datetime, timedelta
 from flask import current_app
 from bson.objectid import ObjectId
+from app.utils.http_client import HttpClient
+from app.utils.torch_runtime import TorchRuntime
+from app.services.cache_service import ScrapeCache, SemanticCache, EnrichmentStore
+from app.services.model_registry import ModelRegistry
+from app.services.provider_executor import ProviderExecutor
+from app.services.circuit_breaker import ProviderBreakers
+from app.services.hedging import HedgePolicy
+from app.services.provider_scheduler import ProviderScheduler
+from app.services.wikipedia_local import WikipediaLocal
+from app.services.local_corpus import LocalCorpus
+from app.services.dedup_service import DedupService
+from app.services.summary_router import SummaryRouter
 
 class DashboardService:
     @staticmethod
@@ -144,6 +156,21 @@ class DashboardService:
             "messages": mongo.db.contacts.estimated_document_count()
         }
 
+        stats['http_pools'] = HttpClient.get_stats()
+        stats['providers'] = ProviderExecutor.get_stats()
+        stats['provider_breakers'] = ProviderBreakers.get_stats()
+        stats['hedging'] = HedgePolicy.get_stats()
+        stats['provider_scheduler'] = ProviderScheduler.get_stats()
+        stats['wikipedia_local'] = WikipediaLocal.get_stats()
+        stats['local_corpus'] = LocalCorpus.get_stats()
+        stats['scrape_cache'] = ScrapeCache.get_stats()
+        stats['semantic_cache'] = SemanticCache.get_stats()
+        stats['dedup'] = DedupService.get_stats()
+        stats['summary_routing'] = SummaryRouter.get_stats()
+        stats['enrichment_store'] = EnrichmentStore.get_stats()
+        stats['models'] = ModelRegistry.get_stats()
+        stats['torch_runtime'] = TorchRuntime.get_stats()
+
         return stats
 
     @staticmethod
@@ -0,0 +1,184 @@
+import re
+import threading
+import unicodedata
+import zlib
+from itertools import combinations
+
+import numpy as np
+
+from app.utils.helpers import canonicalize_url
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+class DedupService:
+    """Regroupe les quasi-doublons (dépêches reprises par plusieurs sites) avant l'enrichissement.
+
+    Signatures MinHash des shingles de mots (titre + extrait), vectorisées avec NumPy, puis LSH par bandes :
+    seules les paires qui partagent une bande sont comparées. Une paire est un doublon si la similarité de
+    Jaccard estimée atteint DEDUP_THRESHOLD (et, si DEDUP_EMBEDDING_CHECK, si leurs embeddings sont proches).
+    Le mieux classé de chaque groupe est gardé, les autres lui sont attachés dans 'alternates'.
+    """
+
+    DEFAULT_SETTINGS = {
+        'enabled': True, 'num_perm': 64, 'bands': 16, 'shingle': 3, 'threshold': 0.6,
+        'embedding_check': False, 'embedding_threshold': 0.9, 'seed': 1,
+    }
+
+    _settings = dict(DEFAULT_SETTINGS)
+    _permutations = None
+    _lock = threading.Lock()
+    _stats = {'batches': 0, 'results': 0, 'candidate_pairs': 0, 'duplicates': 0, 'embedding_rejects': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('DEDUP_ENABLED', True),
+            'num_perm': app.config.get('DEDUP_NUM_PERM', 64),
+            'bands': app.config.get('DEDUP_BANDS', 16),
+            'shingle': app.config.get('DEDUP_SHINGLE_SIZE', 3),
+            'threshold': app.config.get('DEDUP_THRESHOLD', 0.6),
+            'embedding_check': app.config.get('DEDUP_EMBEDDING_CHECK', False),
+            'embedding_threshold': app.config.get('DEDUP_EMBEDDING_THRESHOLD', 0.9),
+            'seed': 1,
+        }
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._permutations = None
+            cls._stats = {counter: 0 for counter in cls._stats}
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def _hash_params(cls):
+        if cls._permutations is None:
+            rng = np.random.default_rng(cls._settings['seed'])
+            num_perm = cls._settings['num_perm']
+            cls._permutations = (
+                rng.integers(1, int(MERSENNE_PRIME), num_perm, dtype=np.uint64),
+                rng.integers(0, int(MERSENNE_PRIME), num_perm, dtype=np.uint64),
+            )
+        return cls._permutations
+
+    @staticmethod
+    def shingles(text, size=3):
+        """Empreintes (crc32) des suites de size mots, texte normalisé (minuscules, sans accents)."""
+        text = unicodedata.normalize('NFKD', text or '')
+        words = re.findall(r'\w+', ''.join(c for c in text if not unicodedata.combining(c)).lower())
+        if len(words) <= size:
+            return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+        return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+    @classmethod
+    def signatures(cls, texts):
+        """Matrice (n, num_perm) des signatures MinHash : min sur les shingles de (a * x + b) mod p."""
+        a, b = cls._hash_params()
+        size = cls._settings['shingle']
+        signatures = np.full((len(texts), len(a)), MAX_HASH, dtype=np.uint64)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(cls.shingles(text, size), dtype=np.uint64)
+            if hashes.size:
+                # Débordement uint64 modulo 2^64 voulu : le hachage reste universel à une constante près
+                signatures[row] = (((hashes[:, None] * a + b) % MERSENNE_PRIME) & MAX_HASH).min(axis=0)
+        return signatures
+
+    @classmethod
+    def _candidate_pairs(cls, signatures, has_text):
+        bands = cls._settings['bands']
+        rows = signatures.shape[1] // bands
+        pairs = set()
+        for band in range(bands):
+            buckets = {}
+            chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            for i in np.flatnonzero(has_text):
+                buckets.setdefault(chunk[i].tobytes(), []).append(int(i))
+            for members in buckets.values():
+                pairs.update(combinations(members, 2))
+        return pairs
+
+    @classmethod
+    def collapse(cls, results, embed=None):
+        """Résultats sans quasi-doublons, dans l'ordre d'origine ; les copies écartées vont dans 'alternates'.
+
+        embed(textes) -> embeddings : utilisé seulement avec DEDUP_EMBEDDING_CHECK, sur les paires candidates.
+        """
+        if not cls.enabled() or not results or len(results) < 2:
+            return results
+        texts = [f"{r.get('title') or ''} {r.get('snippet') or ''}" for r in results]
+        signatures = cls.signatures(texts)
+        has_text = signatures[:, 0] != MAX_HASH
+
+        parent = list(range(len(results)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            i, j = find(i), find(j)
+            if i != j:
+                # La racine reste le mieux classé : c'est le représentant du groupe
+                parent[max(i, j)] = min(i, j)
+
+        urls = {}
+        for i, result in enumerate(results):
+            url = canonicalize_url(result.get('url'))
+            if url:
+                if url in urls:
+                    union(urls[url], i)
+                urls.setdefault(url, i)
+
+        pairs = sorted(cls._candidate_pairs(signatures, has_text))
+        threshold = cls._settings['threshold']
+        duplicates = [(i, j) for i, j in pairs if (signatures[i] == signatures[j]).mean() >= threshold]
+
+        rejected = 0
+        if duplicates and embed is not None and cls._settings['embedding_check']:
+            indices = sorted({i for pair in duplicates for i in pair})
+            vectors = embed([texts[i] for i in indices])
+            vectors = vectors.cpu().numpy() if hasattr(vectors, 'cpu') else np.asarray(vectors)
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            rows = {index: vectors[k] for k, index in enumerate(indices)}
+            kept = [(i, j) for i, j in duplicates if float(rows[i] @ rows[j]) >= cls._settings['embedding_threshold']]
+            rejected = len(duplicates) - len(kept)
+            duplicates = kept
+        for i, j in duplicates:
+            union(i, j)
+
+        collapsed, positions = [], {}
+        for i, result in enumerate(results):
+            root = find(i)
+            if root == i:
+                positions[i] = len(collapsed)
+                collapsed.append(dict(result))
+                continue
+            representative = collapsed[positions[root]]
+            representative['alternates'] = representative.get('alternates', []) + [{
+                'title': result.get('title'),
+                'url': result.get('url'),
+                'source': result.get('source'),
+            }]
+
+        with cls._lock:
+            cls._stats['batches'] += 1
+            cls._stats['results'] += len(results)
+            cls._stats['candidate_pairs'] += len(pairs)
+            cls._stats['duplicates'] += len(results) - len(collapsed)
+            cls._stats['embedding_rejects'] += rejected
+        return collapsed
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+        stats['duplicate_rate'] = round(stats['duplicates'] / stats['results'], 3) if stats['results'] else 0.0
+        stats['enabled'] = cls.enabled()
+        return stats
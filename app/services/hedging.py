@@ -0,0 +1,145 @@
+import math
+import threading
+from collections import deque
+
+
+class HedgePolicy:
+    """Requêtes couvertes (hedging) : si aucun provider n'a répondu après le pXX de sa latence observée,
+    un provider de secours (ou un second appel au même) est lancé, dans la limite d'un surcoût de charge.
+    """
+
+    DEFAULT_WINDOW = 200
+
+    _settings = {'enabled': False}
+    _latencies = {}
+    _lock = threading.Lock()
+    _stats = {'primary_requests': 0, 'hedges': 0, 'refused': 0, 'primary_wins': 0, 'hedge_wins': 0}
+    _wins = {}
+    _reserved = 0
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('HEDGE_ENABLED', False),
+            'primary_providers': app.config.get('HEDGE_PRIMARY_PROVIDERS', 1),
+            'percentile': app.config.get('HEDGE_PERCENTILE', 90),
+            'default_delay': app.config.get('HEDGE_DEFAULT_DELAY', 1.0),
+            'min_delay': app.config.get('HEDGE_MIN_DELAY', 0.1),
+            'min_samples': app.config.get('HEDGE_MIN_SAMPLES', 20),
+            'max_extra_load': app.config.get('HEDGE_MAX_EXTRA_LOAD', 0.25),
+            'max_per_search': app.config.get('HEDGE_MAX_PER_SEARCH', 1),
+        }
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._latencies = {}
+            cls._wins = {}
+            cls._reserved = 0
+            for counter in cls._stats:
+                cls._stats[counter] = 0
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def primary_count(cls):
+        return max(cls._settings.get('primary_providers', 1), 1)
+
+    @classmethod
+    def max_per_search(cls):
+        return cls._settings.get('max_per_search', 1)
+
+    @classmethod
+    def observe(cls, name, elapsed):
+        with cls._lock:
+            cls._latencies.setdefault(name, deque(maxlen=cls.DEFAULT_WINDOW)).append(elapsed)
+
+    @classmethod
+    def percentile(cls, name, q=None):
+        q = cls._settings.get('percentile', 90) if q is None else q
+        with cls._lock:
+            samples = sorted(cls._latencies.get(name, ()))
+        if not samples:
+            return None
+        return samples[min(math.ceil(q / 100 * len(samples)) - 1, len(samples) - 1)] if q > 0 else samples[0]
+
+    @classmethod
+    def delay_for(cls, names):
+        """Délai avant couverture : le plus petit pXX des providers lancés (défaut tant qu'il y a trop peu d'observations)."""
+        delays = []
+        for name in names:
+            with cls._lock:
+                samples = len(cls._latencies.get(name, ()))
+            if samples >= cls._settings.get('min_samples', 20):
+                delays.append(cls.percentile(name))
+        delay = min(delays) if delays else cls._settings.get('default_delay', 1.0)
+        return max(delay, cls._settings.get('min_delay', 0.1))
+
+    @classmethod
+    def fastest(cls, names):
+        """Provider au plus petit pXX observé parmi names (le premier tant qu'aucun n'a assez d'observations)."""
+        best, best_delay = names[0], None
+        for name in names:
+            with cls._lock:
+                samples = len(cls._latencies.get(name, ()))
+            if samples >= cls._settings.get('min_samples', 20):
+                delay = cls.percentile(name)
+                if best_delay is None or delay < best_delay:
+                    best, best_delay = name, delay
+        return best
+
+    @classmethod
+    def record_primary(cls):
+        with cls._lock:
+            cls._stats['primary_requests'] += 1
+
+    @classmethod
+    def try_hedge(cls):
+        """Réserve une requête de couverture si le surcoût reste sous HEDGE_MAX_EXTRA_LOAD.
+
+        La réservation est confirmée par record_launched une fois la couverture partie, rendue par release sinon.
+        """
+        with cls._lock:
+            budget = cls._settings.get('max_extra_load', 0.25) * cls._stats['primary_requests']
+            if cls._stats['hedges'] + cls._reserved + 1 > budget:
+                cls._stats['refused'] += 1
+                return False
+            cls._reserved += 1
+            return True
+
+    @classmethod
+    def record_launched(cls):
+        with cls._lock:
+            cls._reserved = max(cls._reserved - 1, 0)
+            cls._stats['hedges'] += 1
+
+    @classmethod
+    def release(cls):
+        """Couverture réservée mais jamais lancée (pool saturé) : le budget est rendu."""
+        with cls._lock:
+            cls._reserved = max(cls._reserved - 1, 0)
+
+    @classmethod
+    def record_win(cls, name, hedged):
+        with cls._lock:
+            cls._stats['hedge_wins' if hedged else 'primary_wins'] += 1
+            wins = cls._wins.setdefault(name, {'primary': 0, 'hedge': 0})
+            wins['hedge' if hedged else 'primary'] += 1
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['wins'] = {name: dict(w) for name, w in cls._wins.items()}
+            names = list(cls._latencies)
+        stats['enabled'] = cls.enabled()
+        stats['extra_load'] = round(stats['hedges'] / stats['primary_requests'], 3) if stats['primary_requests'] else 0.0
+        stats['hedge_win_rate'] = round(stats['hedge_wins'] / stats['hedges'], 3) if stats['hedges'] else 0.0
+        stats['latency'] = {
+            name: {'p50': round(cls.percentile(name, 50), 3), 'p90': round(cls.percentile(name, 90), 3), 'p99': round(cls.percentile(name, 99), 3)}
+            for name in names
+        }
+        return stats
@@ -0,0 +1,318 @@
+"""Serveur d'inférence local : un seul processus garde les modèles et regroupe en micro-batchs
+les appels summarize / embed / caption de tous les workers gunicorn.
+
+Lancement : python -m app.services.inference_server
+"""
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+# Placé dans chaque file à l'arrêt : débloque les threads de batch en attente de requête
+_STOP = None
+
+
+class InferenceServer:
+    """Reçoit des requêtes (op, groupe, éléments) sur un socket Unix et les exécute par micro-batchs."""
+
+    def __init__(self, address, authkey, handlers, max_batch_size=16, max_wait_ms=10, logger=None, app=None):
+        self.address = address
+        self.authkey = authkey
+        self.handlers = handlers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.logger = logger
+        self.app = app
+        self.queues = {op: queue.Queue() for op in handlers}
+        self.stats = {op: {'requests': 0, 'items': 0, 'batches': 0} for op in handlers}
+        self._stats_lock = threading.Lock()
+        self._listener = None
+        self._running = False
+        self._threads = []
+
+    @classmethod
+    def from_app(cls, app):
+        from app.services.ai_service import AIService
+
+        handlers = {
+            'summarize': lambda texts, lang: AIService.summarize_batch(texts, lang),
+            'embed': lambda texts, _: AIService.embed(texts).cpu().numpy(),
+            'caption': lambda paths, _: [AIService.describe_image(path) for path in paths],
+        }
+        return cls(
+            address=app.config.get('INFERENCE_SERVER_ADDRESS'),
+            authkey=app.config.get('INFERENCE_SERVER_AUTHKEY', '').encode('utf-8'),
+            handlers=handlers,
+            max_batch_size=app.config.get('INFERENCE_MAX_BATCH_SIZE', 16),
+            max_wait_ms=app.config.get('INFERENCE_MAX_WAIT_MS', 10),
+            logger=app.logger,
+            app=app
+        )
+
+    def _log(self, msg, level='info'):
+        if self.logger:
+            getattr(self.logger, level)(msg)
+        else:
+            print(msg)
+
+    def _context(self):
+        return self.app.app_context() if self.app is not None else _NullContext()
+
+    def _reply(self, connection, reply):
+        """Envoie une réponse ; un worker parti (connexion fermée) est ignoré sans interrompre le serveur."""
+        try:
+            connection.send(reply)
+            return True
+        except (OSError, EOFError) as e:
+            self._log(f"[InferenceServer] Réponse {reply[0]} perdue, client déconnecté : {e}", 'warning')
+            return False
+
+    def _collect(self, op):
+        """Bloque jusqu'à la première requête puis attend max_wait au plus pour compléter le batch.
+
+        Liste vide à l'arrêt du serveur.
+        """
+        first = self.queues[op].get()
+        if first is _STOP:
+            return []
+        pending = [first]
+        size = len(pending[0][3])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self.queues[op].get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                break
+            pending.append(entry)
+            size += len(entry[3])
+        return pending
+
+    def _batch_loop(self, op):
+        handler = self.handlers[op]
+        with self._context():
+            while self._running:
+                pending = self._collect(op)
+                groups = {}
+                for entry in pending:
+                    groups.setdefault(entry[2], []).append(entry)
+
+                for group, entries in groups.items():
+                    items = [item for entry in entries for item in entry[3]]
+                    try:
+                        outputs = list(handler(items, group))
+                        error = None
+                    except Exception as e:
+                        self._log(f"[InferenceServer] Erreur {op} : {e}", 'error')
+                        outputs, error = None, str(e)
+
+                    with self._stats_lock:
+                        self.stats[op]['batches'] += 1
+                        self.stats[op]['items'] += len(items)
+
+                    offset = 0
+                    for connection, request_id, _, entry_items in entries:
+                        if error is None:
+                            reply = (request_id, True, outputs[offset:offset + len(entry_items)])
+                        else:
+                            reply = (request_id, False, error)
+                        offset += len(entry_items)
+                        self._reply(connection, reply)
+
+    def _serve_connection(self, conn):
+        connection = _LockedConnection(conn)
+        try:
+            while self._running:
+                request_id, op, group, items = conn.recv()
+                if op == 'stats':
+                    with self._stats_lock:
+                        stats = {k: dict(v) for k, v in self.stats.items()}
+                    if not self._reply(connection, (request_id, True, stats)):
+                        break
+                    continue
+                if op not in self.queues:
+                    if not self._reply(connection, (request_id, False, f"Opération inconnue : {op}")):
+                        break
+                    continue
+                with self._stats_lock:
+                    self.stats[op]['requests'] += 1
+                self.queues[op].put((connection, request_id, group, list(items)))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._batch_loop, args=(op,), name=f"inference-{op}", daemon=True)
+            for op in self.handlers
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        self._log(f"✅ Serveur d'inférence à l'écoute sur {self.address} (batch max {self.max_batch_size}, attente max {self.max_wait * 1000:.0f} ms)")
+        try:
+            while self._running:
+                conn = self._listener.accept()
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._running:
+            self._running = False
+            for op_queue in self.queues.values():
+                op_queue.put(_STOP)
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+
+class _LockedConnection:
+    """Plusieurs threads de batch peuvent répondre sur la même connexion."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, obj):
+        with self._lock:
+            self._conn.send(obj)
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class InferenceServerClient:
+    """Client côté worker : une connexion par processus, partagée par tous les threads de requête."""
+
+    DEFAULT_TIMEOUT = 30
+
+    _settings = {'enabled': False}
+    _conn = None
+    _pid = None
+    _lock = threading.Lock()
+    _send_lock = threading.Lock()
+    _pending = {}
+    _ids = itertools.count()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('INFERENCE_MODE', 'local') == 'server',
+            'address': app.config.get('INFERENCE_SERVER_ADDRESS'),
+            'authkey': app.config.get('INFERENCE_SERVER_AUTHKEY', '').encode('utf-8'),
+            'timeout': app.config.get('INFERENCE_TIMEOUT', cls.DEFAULT_TIMEOUT),
+        }
+        cls._close()
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def _close(cls):
+        with cls._lock:
+            if cls._conn is not None and cls._pid == os.getpid():
+                cls._conn.close()
+            cls._conn = None
+            cls._pid = None
+
+    @classmethod
+    def _connection(cls):
+        pid = os.getpid()
+        if cls._conn is None or cls._pid != pid:
+            with cls._lock:
+                if cls._conn is None or cls._pid != pid:
+                    cls._conn = Client(cls._settings['address'], family='AF_UNIX', authkey=cls._settings['authkey'])
+                    cls._pid = pid
+                    cls._pending = {}
+                    threading.Thread(target=cls._receive_loop, args=(cls._conn,), name="inference-client", daemon=True).start()
+        return cls._conn
+
+    @classmethod
+    def _receive_loop(cls, conn):
+        try:
+            while True:
+                request_id, ok, payload = conn.recv()
+                future = cls._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+        except (EOFError, OSError, TypeError) as e:
+            # Serveur arrêté (ou connexion fermée par _close pendant recv, TypeError côté multiprocessing) : on libère les appels en attente et on se reconnectera au prochain appel
+            with cls._lock:
+                if cls._conn is conn:
+                    cls._conn = None
+            for future in list(cls._pending.values()):
+                future.set_exception(ConnectionError(f"Serveur d'inférence injoignable : {e}"))
+            cls._pending.clear()
+
+    @classmethod
+    def _call(cls, op, items, group=None):
+        conn = cls._connection()
+        request_id = next(cls._ids)
+        future = Future()
+        cls._pending[request_id] = future
+        try:
+            with cls._send_lock:
+                conn.send((request_id, op, group, list(items)))
+            return future.result(timeout=cls._settings.get('timeout', cls.DEFAULT_TIMEOUT))
+        finally:
+            # Envoi échoué ou réponse jamais arrivée : l'appel ne doit pas rester en attente
+            cls._pending.pop(request_id, None)
+
+    @classmethod
+    def summarize(cls, texts, lang=None):
+        return cls._call('summarize', texts, lang)
+
+    @classmethod
+    def embed(cls, texts):
+        return cls._call('embed', texts)
+
+    @classmethod
+    def caption(cls, image_paths):
+        return cls._call('caption', image_paths)
+
+    @classmethod
+    def server_stats(cls):
+        return cls._call('stats', [])
+
+
+def main():
+    from app import create_app
+    from app.services.ai_service import AIService
+    from app.services.model_registry import ModelRegistry
+
+    app = create_app()
+    # Le serveur exécute les modèles lui-même, quel que soit le mode configuré pour les workers
+    app.config['INFERENCE_MODE'] = 'local'
+    InferenceServerClient.init_app(app)
+    with app.app_context():
+        AIService.initialize()
+        # Tous les modèles servis sont chargés (et chauffés) avant d'accepter des connexions
+        ModelRegistry.preload(list(AIService.SERVED_MODELS))
+    InferenceServer.from_app(app).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,591 @@
+"""Corpus local des résultats déjà récupérés : index inversé BM25 sur les titres et extraits.
+
+Chaque résultat non vide d'un provider réseau est indexé. Les nouveaux documents vont d'abord dans un
+segment en mémoire, cherchable tout de suite. Ce segment est écrit sur disque (LOCAL_CORPUS_DIR) tous les
+LOCAL_CORPUS_SEGMENT_DOCS documents ou toutes les LOCAL_CORPUS_FLUSH_INTERVAL secondes. Au-delà de
+LOCAL_CORPUS_MAX_SEGMENTS segments, un thread fusionne les plus petits en arrière-plan, sans dépasser
+LOCAL_CORPUS_MERGE_MAX_DOCS documents par segment fusionné. Avant chaque fusion, les segments plus vieux
+que LOCAL_CORPUS_MAX_AGE secondes sont supprimés, puis les plus anciens au-delà de LOCAL_CORPUS_MAX_DOCS documents.
+Les segments sont immuables et mappés en mémoire : les workers partagent le dossier et relisent
+la liste des segments toutes les LOCAL_CORPUS_REFRESH_INTERVAL secondes.
+
+Format d'un segment (petit-boutiste) : en-tête | colonnes (termes triés, documents) | clés des termes |
+postings (uint32 doc, tf entrelacés) | fiches (url, titre, extrait, langue, source).
+Vérification : python -m app.services.local_corpus search "moteur électrique" [--dir data/corpus]
+"""
+import argparse
+import atexit
+import math
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from flask import current_app, has_app_context
+
+from app.utils.helpers import canonicalize_url
+from app.utils.mapped_file import MappedFile, columns_size, write_columns
+
+MAGIC = b'BM25SEG1'
+HEADER = struct.Struct('<8sQQQQQQ')  # magic, nb documents, nb termes, longueur totale, offsets clés / postings / fiches
+COLUMNS = (
+    ('term_key_off', 'Q', 'terms'),
+    ('term_post_off', 'Q', 'terms'),  # en entiers uint32 depuis le début des postings
+    ('doc_rec_off', 'Q', 'docs'),
+    ('term_key_len', 'I', 'terms'),
+    ('term_df', 'I', 'terms'),
+    ('doc_rec_len', 'I', 'docs'),
+    ('doc_len', 'I', 'docs'),
+)
+FIELDS = ('url', 'title', 'snippet', 'language', 'source')
+FIELD_SEP = '\x1f'
+SEGMENT_SUFFIX = '.bm25'
+
+# Mots vides courants (français et anglais), sans accents comme les termes indexés
+STOPWORDS = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'en', 'au', 'aux', 'ce', 'ces', 'est',
+    'pour', 'par', 'sur', 'dans', 'qui', 'que', 'quoi', 'avec', 'son', 'sa', 'ses', 'il', 'elle', 'se',
+    'the', 'of', 'and', 'or', 'to', 'in', 'on', 'for', 'is', 'an', 'by', 'with', 'what', 'from', 'at', 'as',
+}
+
+
+def tokenize(text):
+    """Termes indexés : minuscules, sans accents, mots d'au moins 2 caractères hors mots vides."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return [word for word in re.findall(r'\w+', text) if len(word) > 1 and word not in STOPWORDS]
+
+
+def document_terms(doc):
+    """Fréquences des termes d'un document ; le titre compte double."""
+    terms = Counter(tokenize(doc.get('title')) * 2)
+    terms.update(tokenize(doc.get('snippet')))
+    return terms
+
+
+def segment_time(path):
+    """Horodatage (secondes) d'un segment, tiré de son nom seg-<time_ns>-..."""
+    try:
+        return int(os.path.basename(path)[4:24]) / 1e9
+    except ValueError:
+        return 0.0
+
+
+def _record(doc):
+    return FIELD_SEP.join((doc.get(field) or '').replace(FIELD_SEP, ' ') for field in FIELDS).encode('utf-8')
+
+
+def write_segment(docs, path):
+    """Écrit un segment à partir de documents {url, title, snippet, language, source} ; renvoie leur nombre."""
+    postings, records, lengths = {}, [], []
+    for doc_id, doc in enumerate(docs):
+        terms = document_terms(doc)
+        for term, tf in terms.items():
+            postings.setdefault(term.encode('utf-8'), array('I')).extend((doc_id, tf))
+        records.append(_record(doc))
+        lengths.append(sum(terms.values()))
+
+    keys = sorted(postings)
+    counts = {'terms': len(keys), 'docs': len(records)}
+    keys_off = HEADER.size + columns_size(COLUMNS, counts)
+    keys_end = keys_off + sum(map(len, keys))
+    post_off = keys_end + -keys_end % 4  # postings alignés sur 4 octets
+    rec_off = post_off + 4 * sum(len(postings[key]) for key in keys)
+
+    columns = {name: array(code) for name, code, _ in COLUMNS}
+    cursor, post_cursor = keys_off, 0
+    for key in keys:
+        columns['term_key_off'].append(cursor)
+        columns['term_key_len'].append(len(key))
+        columns['term_post_off'].append(post_cursor)
+        columns['term_df'].append(len(postings[key]) // 2)
+        cursor += len(key)
+        post_cursor += len(postings[key])
+    cursor = rec_off
+    for record, length in zip(records, lengths):
+        columns['doc_rec_off'].append(cursor)
+        columns['doc_rec_len'].append(len(record))
+        columns['doc_len'].append(length)
+        cursor += len(record)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, len(records), len(keys), sum(lengths), keys_off, post_off, rec_off))
+        write_columns(out, COLUMNS, columns)
+        for key in keys:
+            out.write(key)
+        out.write(b'\0' * (post_off - keys_end))
+        for key in keys:
+            write_columns(out, (('postings', 'I', None),), {'postings': postings[key]})
+        for record in records:
+            out.write(record)
+    # Un segment n'apparaît qu'une fois complet : les autres workers ne lisent jamais un fichier partiel
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class MemorySegment:
+    """Segment tampon en mémoire : mêmes accès que Segment, alimenté document par document."""
+
+    def __init__(self):
+        self.docs = []
+        self.doc_lens = []
+        self.total_len = 0
+        self._postings = {}
+
+    @property
+    def n_docs(self):
+        return len(self.docs)
+
+    def add(self, doc):
+        doc_id = len(self.docs)
+        terms = document_terms(doc)
+        for term, tf in terms.items():
+            self._postings.setdefault(term, []).append((doc_id, tf))
+        self.docs.append(doc)
+        self.doc_lens.append(sum(terms.values()))
+        self.total_len += self.doc_lens[-1]
+
+    def postings(self, term):
+        return self._postings.get(term, ())
+
+    def doc_len(self, doc_id):
+        return self.doc_lens[doc_id]
+
+    def document(self, doc_id):
+        return self.docs[doc_id]
+
+    def iter_documents(self):
+        return iter(self.docs)
+
+    def snapshot(self):
+        return _MemorySnapshot(self)
+
+
+class _MemorySnapshot:
+    """Vue figée du tampon : les documents ajoutés pendant une recherche sont ignorés (listes en ajout seul)."""
+
+    def __init__(self, memory):
+        self._memory = memory
+        self.n_docs = memory.n_docs
+        self.total_len = memory.total_len
+
+    def postings(self, term):
+        return [(doc_id, tf) for doc_id, tf in self._memory.postings(term) if doc_id < self.n_docs]
+
+    def doc_len(self, doc_id):
+        return self._memory.doc_len(doc_id)
+
+    def document(self, doc_id):
+        return self._memory.document(doc_id)
+
+
+class Segment(MappedFile):
+    """Segment immuable sur disque, lu en place dans le mmap."""
+
+    def __init__(self, path):
+        super().__init__(path, HEADER, MAGIC)
+        _, self.n_docs, n_terms, self.total_len, _, post_off, rec_off = self.header
+        for name, view in self.map_columns(COLUMNS, {'terms': n_terms, 'docs': self.n_docs}, HEADER.size).items():
+            setattr(self, f"_{name}", view)
+        self._postings = self.view(post_off, rec_off - post_off, 'I')
+        self.size = os.path.getsize(path)
+
+    def postings(self, term):
+        rank = self.search(self._term_key_off, self._term_key_len, term.encode('utf-8'))
+        if rank is None:
+            return ()
+        start = self._term_post_off[rank]
+        values = self._postings[start:start + 2 * self._term_df[rank]]
+        return zip(values[::2], values[1::2])
+
+    def doc_len(self, doc_id):
+        return self._doc_len[doc_id]
+
+    def document(self, doc_id):
+        values = self.bytes(self._doc_rec_off[doc_id], self._doc_rec_len[doc_id]).decode('utf-8').split(FIELD_SEP)
+        return dict(zip(FIELDS, values))
+
+    def iter_documents(self):
+        return (self.document(doc_id) for doc_id in range(self.n_docs))
+
+
+def bm25_search(segments, query, limit=10, lang=None, k1=1.2, b=0.75, min_match=0.6):
+    """[(score, document)] des meilleurs documents, statistiques (N, longueur moyenne, df) sur tous les segments.
+
+    Un document doit contenir au moins min_match des termes de la requête ; une URL n'apparaît qu'une fois.
+    """
+    terms = set(tokenize(query))
+    n_docs = sum(segment.n_docs for segment in segments)
+    if not terms or not n_docs:
+        return []
+    avgdl = sum(segment.total_len for segment in segments) / n_docs or 1.0
+
+    scores, matched = {}, Counter()
+    for term in terms:
+        lists = [(i, list(segment.postings(term))) for i, segment in enumerate(segments)]
+        df = sum(len(postings) for _, postings in lists)
+        if not df:
+            continue
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for i, postings in lists:
+            segment = segments[i]
+            for doc_id, tf in postings:
+                norm = k1 * (1 - b + b * segment.doc_len(doc_id) / avgdl)
+                key = (i, doc_id)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+                matched[key] += 1
+
+    required = max(math.ceil(min_match * len(terms)), 1)
+    hits, seen = [], set()
+    for key, score in sorted(scores.items(), key=lambda item: -item[1]):
+        if matched[key] < required:
+            continue
+        doc = segments[key[0]].document(key[1])
+        if lang and doc.get('language') and doc['language'] != lang:
+            continue
+        url = canonicalize_url(doc.get('url'))
+        if url in seen:
+            continue
+        seen.add(url)
+        hits.append((score, doc))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+class LocalCorpus:
+    """Provider hors ligne : BM25 sur les résultats déjà récupérés par les providers réseau."""
+
+    DEFAULT_SETTINGS = {
+        'enabled': False, 'directory': 'data/corpus', 'segment_docs': 1000, 'flush_interval': 300,
+        'max_segments': 8, 'merge_factor': 4, 'k1': 1.2, 'b': 0.75, 'min_match': 0.6, 'refresh_interval': 30,
+        'max_docs': 500000, 'max_age': 30 * 86400, 'merge_max_docs': 100000,
+    }
+
+    _settings = dict(DEFAULT_SETTINGS)
+    _lock = threading.RLock()
+    _merge_lock = threading.Lock()
+    _merge_thread = None
+    _logger = None
+    _memory = MemorySegment()
+    _segments = {}
+    _urls = set()
+    _last_flush = 0.0
+    _last_refresh = 0.0
+    _flush_seq = 0
+    _stats = {}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('LOCAL_CORPUS_ENABLED', True),
+            'directory': app.config.get('LOCAL_CORPUS_DIR', 'data/corpus'),
+            'segment_docs': app.config.get('LOCAL_CORPUS_SEGMENT_DOCS', 1000),
+            'flush_interval': app.config.get('LOCAL_CORPUS_FLUSH_INTERVAL', 300),
+            'max_segments': app.config.get('LOCAL_CORPUS_MAX_SEGMENTS', 8),
+            'merge_factor': app.config.get('LOCAL_CORPUS_MERGE_FACTOR', 4),
+            'k1': app.config.get('LOCAL_CORPUS_K1', 1.2),
+            'b': app.config.get('LOCAL_CORPUS_B', 0.75),
+            'min_match': app.config.get('LOCAL_CORPUS_MIN_MATCH', 0.6),
+            'refresh_interval': app.config.get('LOCAL_CORPUS_REFRESH_INTERVAL', 30),
+            'max_docs': app.config.get('LOCAL_CORPUS_MAX_DOCS', 500000),
+            'max_age': app.config.get('LOCAL_CORPUS_MAX_AGE', 30 * 86400),
+            'merge_max_docs': app.config.get('LOCAL_CORPUS_MERGE_MAX_DOCS', 100000),
+        }
+        cls._logger = app.logger
+        cls.reset()
+
+    @classmethod
+    def _log(cls, msg, level='info'):
+        # Fusion en arrière-plan et flush atexit n'ont pas de contexte Flask : logger de l'app gardé à l'init
+        logger = current_app.logger if has_app_context() else cls._logger
+        if logger:
+            getattr(logger, level)(msg)
+        else:
+            print(msg)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            for segment in cls._segments.values():
+                segment.close()
+            cls._memory = MemorySegment()
+            cls._segments = {}
+            cls._urls = set()
+            cls._last_flush = time.monotonic()
+            cls._last_refresh = 0.0
+            cls._stats = {'added': 0, 'duplicates': 0, 'searches': 0, 'hits': 0, 'flushes': 0, 'merges': 0, 'pruned': 0, 'total_time': 0.0}
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def _segment_paths(cls):
+        directory = cls._settings['directory']
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        return sorted(os.path.join(directory, name) for name in names if name.endswith(SEGMENT_SUFFIX))
+
+    @classmethod
+    def refresh(cls, force=False):
+        """Aligne les segments ouverts sur le dossier (flush et fusions des autres workers)."""
+        now = time.monotonic()
+        if not force and now - cls._last_refresh < cls._settings['refresh_interval']:
+            return
+        with cls._lock:
+            cls._last_refresh = now
+            paths = cls._segment_paths()
+            # Segments supprimés (élagage, fusion) : les URL oubliées doivent pouvoir être réindexées
+            removed = any(path not in paths for path in cls._segments)
+            segments = {}
+            for path in paths:
+                segment = cls._segments.get(path)
+                if segment is None:
+                    try:
+                        segment = Segment(path)
+                    except (OSError, ValueError):
+                        continue
+                    cls._urls.update(canonicalize_url(doc['url']) for doc in segment.iter_documents())
+                segments[path] = segment
+            # Les segments fusionnés ne sont pas fermés : une recherche en cours peut encore les lire,
+            # le mmap est libéré avec la dernière référence
+            cls._segments = segments
+            if removed:
+                cls._urls = {canonicalize_url(doc['url']) for doc in cls._memory.docs}
+                for segment in segments.values():
+                    cls._urls.update(canonicalize_url(doc['url']) for doc in segment.iter_documents())
+
+    @classmethod
+    def add(cls, results):
+        """Indexe les résultats d'un provider ; les URL déjà connues sont ignorées."""
+        if not cls.enabled():
+            return 0
+        cls.refresh()
+        added = 0
+        with cls._lock:
+            for result in results or []:
+                url = canonicalize_url(result.get('url'))
+                if not url or not (result.get('title') or result.get('snippet')):
+                    continue
+                if url in cls._urls:
+                    cls._stats['duplicates'] += 1
+                    continue
+                cls._urls.add(url)
+                cls._memory.add({field: result.get(field) or '' for field in FIELDS})
+                added += 1
+            cls._stats['added'] += added
+            due = cls._memory.n_docs and (
+                cls._memory.n_docs >= cls._settings['segment_docs']
+                or time.monotonic() - cls._last_flush >= cls._settings['flush_interval']
+            )
+        if due:
+            cls.flush()
+        return added
+
+    @classmethod
+    def flush(cls):
+        """Écrit le segment en mémoire sur disque ; renvoie le nombre de documents écrits."""
+        if not cls.enabled():
+            return 0
+        with cls._lock:
+            cls._last_flush = time.monotonic()
+            memory = cls._memory
+            if not memory.n_docs:
+                return 0
+            cls._flush_seq += 1
+            path = os.path.join(cls._settings['directory'], f"seg-{time.time_ns():020d}-{os.getpid()}-{cls._flush_seq}{SEGMENT_SUFFIX}")
+            try:
+                os.makedirs(cls._settings['directory'], exist_ok=True)
+                write_segment(memory.docs, path)
+                segment = Segment(path)
+            except OSError as e:
+                cls._log(f"[LocalCorpus] Écriture du segment échouée : {e}", 'error')
+                return 0
+            cls._segments = {**cls._segments, path: segment}
+            cls._memory = MemorySegment()
+            cls._stats['flushes'] += 1
+            should_merge = len(cls._segments) > cls._settings['max_segments'] or cls._expired(cls._segments)
+        if should_merge and not cls._merge_lock.locked():
+            cls._merge_thread = threading.Thread(target=cls.merge, name="local-corpus-merge", daemon=True)
+            cls._merge_thread.start()
+        return memory.n_docs
+
+    @classmethod
+    def _expired(cls, segments):
+        """Chemins à supprimer : segments plus vieux que max_age, puis les plus anciens au-delà de max_docs."""
+        max_age, max_docs = cls._settings['max_age'], cls._settings['max_docs']
+        now = time.time()
+        paths = sorted(segments, key=segment_time)
+        expired = [path for path in paths if max_age and now - segment_time(path) > max_age]
+        kept = [path for path in paths if path not in expired]
+        total = sum(segments[path].n_docs for path in kept)
+        while max_docs and kept and total > max_docs:
+            path = kept.pop(0)
+            total -= segments[path].n_docs
+            expired.append(path)
+        return expired
+
+    @classmethod
+    def _prune(cls, segments):
+        """Supprime les segments expirés ; renvoie les segments restants."""
+        expired = cls._expired(segments)
+        for path in expired:
+            os.remove(path)
+        if expired:
+            with cls._lock:
+                cls._stats['pruned'] += sum(segments[path].n_docs for path in expired)
+            cls._log(f"[LocalCorpus] {len(expired)} segment(s) ancien(s) supprimé(s)")
+        return {path: segment for path, segment in segments.items() if path not in expired}
+
+    @classmethod
+    def merge(cls):
+        """Élague puis fusionne les merge_factor plus petits segments du dossier en un seul (un worker à la fois).
+
+        Les segments déjà à merge_max_docs documents ne sont plus fusionnés.
+        """
+        if not cls._merge_lock.acquire(blocking=False):
+            return 0
+        lock_file = None
+        try:
+            directory = cls._settings['directory']
+            if fcntl is not None:
+                lock_file = open(os.path.join(directory, '.merge.lock'), 'w')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0
+            cls.refresh(force=True)
+            with cls._lock:
+                segments = dict(cls._segments)
+            pruned = len(segments)
+            segments = cls._prune(segments)
+            pruned -= len(segments)
+            if len(segments) <= cls._settings['max_segments']:
+                if pruned:
+                    cls.refresh(force=True)
+                return 0
+            inputs, size = [], 0
+            for path in sorted(segments, key=lambda path: segments[path].size)[:cls._settings['merge_factor']]:
+                if size + segments[path].n_docs > cls._settings['merge_max_docs']:
+                    continue
+                inputs.append(path)
+                size += segments[path].n_docs
+            if len(inputs) < 2:
+                if pruned:
+                    cls.refresh(force=True)
+                return 0
+            inputs.sort()
+            docs, seen = [], set()
+            # Du plus récent au plus ancien : une URL réindexée par un autre worker garde sa dernière version
+            for path in reversed(inputs):
+                for doc in segments[path].iter_documents():
+                    url = canonicalize_url(doc['url'])
+                    if url not in seen:
+                        seen.add(url)
+                        docs.append(doc)
+            # Horodatage du plus ancien des segments fusionnés : aucun document ne survit au-delà de max_age
+            with cls._lock:
+                cls._flush_seq += 1
+                name = f"seg-{os.path.basename(inputs[0])[4:24]}-{os.getpid()}-m{cls._flush_seq}{SEGMENT_SUFFIX}"
+            target = os.path.join(directory, name)
+            write_segment(docs, target)
+            for path in inputs:
+                os.remove(path)
+            with cls._lock:
+                cls._stats['merges'] += 1
+            cls.refresh(force=True)
+            return len(docs)
+        except OSError as e:
+            cls._log(f"[LocalCorpus] Fusion des segments échouée : {e}", 'error')
+            return 0
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+            cls._merge_lock.release()
+
+    @classmethod
+    def search(cls, query, lang=None, limit=10):
+        """Résultats au format des providers (source 'local_corpus'), du meilleur score BM25 au moins bon."""
+        if not cls.enabled():
+            return []
+        cls.refresh()
+        start = time.perf_counter()
+        with cls._lock:
+            segments = [cls._memory.snapshot(), *cls._segments.values()]
+        settings = cls._settings
+        hits = bm25_search(segments, query, limit, lang, settings['k1'], settings['b'], settings['min_match'])
+        results = [{
+            'title': doc['title'],
+            'url': doc['url'],
+            'snippet': doc['snippet'],
+            'source': 'local_corpus',
+            'origin': doc['source'] or None,
+            'bm25_score': round(score, 4),
+            'enriched': False,
+            'image': None,
+            'language': doc['language'] or lang
+        } for score, doc in hits]
+        with cls._lock:
+            cls._stats['searches'] += 1
+            cls._stats['hits'] += 1 if results else 0
+            cls._stats['total_time'] += time.perf_counter() - start
+        return results
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['memory_docs'] = cls._memory.n_docs
+            stats['segments'] = len(cls._segments)
+            stats['segment_docs'] = sum(segment.n_docs for segment in cls._segments.values())
+            stats['segment_bytes'] = sum(segment.size for segment in cls._segments.values())
+        total_time = stats.pop('total_time')
+        stats['avg_search_ms'] = round(total_time / stats['searches'] * 1000, 2) if stats['searches'] else 0.0
+        stats['enabled'] = cls.enabled()
+        return stats
+
+
+# Le tampon encore en mémoire est écrit à l'arrêt du worker
+atexit.register(LocalCorpus.flush)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corpus local BM25 des résultats déjà récupérés")
+    parser.add_argument('command', choices=['search', 'stats', 'merge'])
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('--dir', default=os.environ.get('LOCAL_CORPUS_DIR', 'data/corpus'))
+    parser.add_argument('--lang')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    LocalCorpus._settings = {**LocalCorpus.DEFAULT_SETTINGS, 'enabled': True, 'directory': args.dir, 'max_segments': 1}
+    LocalCorpus.reset()
+    if args.command == 'merge':
+        while LocalCorpus.merge():
+            pass
+    if args.command == 'search':
+        start = time.perf_counter()
+        results = LocalCorpus.search(args.query, args.lang, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(f"{result['bm25_score']:>7.3f}  {result['title']} — {result['url']}")
+        print(f"{len(results)} résultat(s) en {elapsed:.2f} ms")
+        return
+    print(LocalCorpus.get_stats())
+
+
+if __name__ == '__main__':
+    main()
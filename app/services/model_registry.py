@@ -0,0 +1,250 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from app.utils.torch_runtime import TorchRuntime
+
+
+class ModelRegistry:
+    """Registre central des modèles : chargement paresseux sous verrou, préchargement configurable, warmup et métriques.
+
+    Avec un budget mémoire (MODEL_MEMORY_BUDGET_MB), les modèles inactifs les moins récemment utilisés
+    sont déchargés dès que le total résident dépasse le budget ; ils seront rechargés à la demande.
+    """
+
+    _specs = {}
+    _models = {}
+    _locks = {}
+    _stats = {}
+    _last_used = {}
+    _in_use = {}
+    _lock = threading.Lock()
+    _settings = {'preload': [], 'preload_async': False, 'warmup': True, 'memory_budget_mb': 0}
+    _logger = None
+
+    @classmethod
+    def init_app(cls, app):
+        preload = app.config.get('MODEL_PRELOAD', '')
+        if isinstance(preload, str):
+            preload = [name.strip() for name in preload.split(',') if name.strip()]
+        cls._settings = {
+            'preload': preload,
+            'preload_async': app.config.get('MODEL_PRELOAD_ASYNC', False),
+            'warmup': app.config.get('MODEL_WARMUP', True),
+            'memory_budget_mb': app.config.get('MODEL_MEMORY_BUDGET_MB', 0),
+        }
+        cls._logger = app.logger
+
+    @classmethod
+    def _log(cls, msg, level='info'):
+        if cls._logger:
+            getattr(cls._logger, level)(msg)
+        else:
+            print(msg)
+
+    @classmethod
+    def register(cls, name, loader, warmup=None, quantize=False):
+        """Déclare un modèle : loader() -> modèle (ou None si indisponible), warmup(modèle) -> inférence de chauffe.
+
+        quantize=True : le modèle passe en int8 dynamique quand INFERENCE_PRECISION == 'int8'.
+        """
+        with cls._lock:
+            cls._specs[name] = {'loader': loader, 'warmup': warmup, 'quantize': quantize}
+            cls._locks.setdefault(name, threading.Lock())
+
+    @classmethod
+    def is_registered(cls, name):
+        return name in cls._specs
+
+    @classmethod
+    def is_loaded(cls, name):
+        return name in cls._models
+
+    @classmethod
+    def peek(cls, name):
+        """Modèle s'il est déjà chargé, sans déclencher de chargement."""
+        return cls._models.get(name)
+
+    @classmethod
+    def get(cls, name):
+        cls._last_used[name] = time.monotonic()
+        if name in cls._models:
+            return cls._models[name]
+        spec = cls._specs.get(name)
+        if spec is None:
+            return None
+        with cls._locks[name]:
+            # Un autre thread a pu charger le modèle pendant l'attente du verrou
+            if name in cls._models:
+                return cls._models[name]
+            model = cls._load(name, spec)
+            cls._models[name] = model
+        cls._enforce_budget(keep=name)
+        return model
+
+    @classmethod
+    @contextmanager
+    def use(cls, name):
+        """Modèle marqué « en cours d'utilisation » le temps du bloc : il ne peut pas être évincé."""
+        with cls._lock:
+            cls._in_use[name] = cls._in_use.get(name, 0) + 1
+        try:
+            yield cls.get(name)
+        finally:
+            with cls._lock:
+                cls._in_use[name] -= 1
+            cls._last_used[name] = time.monotonic()
+
+    @classmethod
+    def _load(cls, name, spec):
+        previous = cls._stats.get(name, {})
+        TorchRuntime.configure_threads()
+        precision = TorchRuntime.precision() if spec.get('quantize') else 'fp32'
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            model = spec['loader']()
+        except Exception as e:
+            cls._log(f"❌ Chargement du modèle '{name}' échoué : {e}", 'error')
+            model = None
+        if model is not None and precision != 'fp32':
+            try:
+                model = TorchRuntime.optimize(model, precision)
+            except Exception as e:
+                cls._log(f"⚠️ Quantification du modèle '{name}' échouée, exécution en fp32 : {e}", 'warning')
+                precision = 'fp32'
+        load_time = time.perf_counter() - start
+
+        stats = {
+            'loaded': model is not None,
+            'precision': precision,
+            'load_time': round(load_time, 3),
+            'param_mb': round(_model_bytes(model) / 2 ** 20, 1),
+            'rss_delta_mb': round(_rss_mb() - rss_before, 1),
+            'warmup_time': None,
+            'loaded_at': time.time(),
+            'loads': previous.get('loads', 0) + 1,
+            # Un rechargement = un chargement après éviction : c'est le coût payé pour le budget mémoire
+            'reloads': previous.get('reloads', 0) + (1 if previous.get('evictions', 0) else 0),
+            'evictions': previous.get('evictions', 0),
+        }
+
+        if model is not None and spec['warmup'] and cls._settings.get('warmup', True):
+            start = time.perf_counter()
+            try:
+                spec['warmup'](model)
+                stats['warmup_time'] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                cls._log(f"⚠️ Warmup du modèle '{name}' échoué : {e}", 'warning')
+
+        cls._stats[name] = stats
+        if model is not None:
+            cls._log(f"✅ Modèle '{name}' chargé en {stats['load_time']} s ({stats['param_mb']} Mo de paramètres, {precision}).")
+        return model
+
+    @classmethod
+    def _footprint_mb(cls, name):
+        stats = cls._stats.get(name, {})
+        return stats.get('param_mb') or max(stats.get('rss_delta_mb', 0), 0)
+
+    @classmethod
+    def resident_mb(cls):
+        return round(sum(cls._footprint_mb(name) for name in list(cls._models)), 1)
+
+    @classmethod
+    def _enforce_budget(cls, keep=None):
+        budget = cls._settings.get('memory_budget_mb', 0)
+        if not budget:
+            return
+        while cls.resident_mb() > budget:
+            with cls._lock:
+                idle = [
+                    name for name in cls._models
+                    if name != keep and not cls._in_use.get(name) and cls._models[name] is not None
+                    and cls._footprint_mb(name) > 0
+                ]
+            idle.sort(key=lambda name: cls._last_used.get(name, 0))
+            if not any(cls._evict(name) for name in idle):
+                cls._log(f"⚠️ Budget mémoire des modèles dépassé ({cls.resident_mb()} / {budget} Mo) : aucun modèle inactif à décharger.", 'warning')
+                return
+
+    @classmethod
+    def _evict(cls, name):
+        lock = cls._locks[name]
+        if not lock.acquire(blocking=False):
+            return False
+        try:
+            if cls._in_use.get(name) or name not in cls._models:
+                return False
+            cls._models.pop(name, None)
+            cls._stats[name]['evictions'] = cls._stats[name].get('evictions', 0) + 1
+        finally:
+            lock.release()
+        gc.collect()
+        cls._log(f"♻️ Modèle '{name}' déchargé (budget mémoire).")
+        return True
+
+    @classmethod
+    def preload(cls, names=None):
+        names = cls._settings.get('preload', []) if names is None else names
+        unknown = [name for name in names if name not in cls._specs]
+        if unknown:
+            cls._log(f"⚠️ Modèles inconnus dans MODEL_PRELOAD : {', '.join(unknown)}", 'warning')
+        names = [name for name in names if name in cls._specs]
+
+        if cls._settings.get('preload_async', False):
+            threading.Thread(target=lambda: [cls.get(name) for name in names], name="model-preload", daemon=True).start()
+        else:
+            for name in names:
+                cls.get(name)
+
+    @classmethod
+    def unload(cls, name):
+        with cls._locks.get(name, cls._lock):
+            cls._models.pop(name, None)
+            cls._stats.pop(name, None)
+
+    @classmethod
+    def get_stats(cls):
+        now = time.monotonic()
+        models = {}
+        for name in cls._specs:
+            entry = {**cls._stats.get(name, {'loaded': False, 'loads': 0, 'reloads': 0, 'evictions': 0})}
+            entry['resident'] = name in cls._models
+            entry['in_use'] = cls._in_use.get(name, 0)
+            entry['idle_seconds'] = round(now - cls._last_used[name], 1) if name in cls._last_used else None
+            models[name] = entry
+        return {
+            'memory_budget_mb': cls._settings.get('memory_budget_mb', 0),
+            'resident_mb': cls.resident_mb(),
+            'models': models
+        }
+
+
+def _model_bytes(model):
+    """Taille des paramètres et buffers torch d'un modèle, d'un pipeline ou d'un tuple (tokenizer, modèle)."""
+    if model is None:
+        return 0
+    if isinstance(model, (tuple, list)):
+        return sum(_model_bytes(m) for m in model)
+    if hasattr(model, 'state_dict') and hasattr(model, 'parameters'):
+        # state_dict plutôt que parameters() : les poids int8 des couches quantifiées n'y figurent pas
+        tensors = {}
+        for value in model.state_dict().values():
+            for tensor in (value if isinstance(value, tuple) else (value,)):
+                if hasattr(tensor, 'numel') and hasattr(tensor, 'element_size'):
+                    tensors[id(tensor)] = tensor
+        return sum(t.numel() * t.element_size() for t in tensors.values())
+    if hasattr(model, 'model'):
+        return _model_bytes(model.model)
+    return 0
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return 0.0
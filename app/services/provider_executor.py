@@ -0,0 +1,145 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ProviderExecutor:
+    """Pool de threads borné, partagé par toutes les recherches, pour appeler les providers de scraping.
+
+    Une recherche n'attend jamais ses providers retardataires : leurs futures sont annulées si elles n'ont
+    pas démarré, sinon abandonnées (le résultat tardif peut encore alimenter le cache).
+    """
+
+    DEFAULT_MAX_WORKERS = 16
+    DEFAULT_MAX_PENDING = 64
+    DEFAULT_DEADLINE = 6.0
+
+    _settings = {'max_workers': DEFAULT_MAX_WORKERS, 'max_pending': DEFAULT_MAX_PENDING, 'deadline': DEFAULT_DEADLINE}
+    _executor = None
+    _slots = None
+    _pid = None
+    _lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _queued = 0
+    _in_flight = 0
+    _counters = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'abandoned': 0, 'late_results': 0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'max_workers': app.config.get('PROVIDER_MAX_WORKERS', cls.DEFAULT_MAX_WORKERS),
+            'max_pending': app.config.get('PROVIDER_MAX_PENDING', cls.DEFAULT_MAX_PENDING),
+            'deadline': app.config.get('SEARCH_DEADLINE', cls.DEFAULT_DEADLINE),
+        }
+        cls.shutdown()
+
+    @classmethod
+    def deadline(cls):
+        return cls._settings.get('deadline', cls.DEFAULT_DEADLINE)
+
+    @classmethod
+    def _get_executor(cls):
+        # Un pool par processus : les threads du parent n'existent plus après un fork
+        pid = os.getpid()
+        if cls._executor is None or cls._pid != pid:
+            with cls._lock:
+                if cls._executor is None or cls._pid != pid:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=cls._settings.get('max_workers', cls.DEFAULT_MAX_WORKERS),
+                        thread_name_prefix='provider'
+                    )
+                    cls._slots = threading.BoundedSemaphore(cls._settings.get('max_pending', cls.DEFAULT_MAX_PENDING))
+                    cls._pid = pid
+                    with cls._stats_lock:
+                        cls._queued = 0
+                        cls._in_flight = 0
+        return cls._executor
+
+    @classmethod
+    def _incr(cls, counter, n=1):
+        with cls._stats_lock:
+            cls._counters[counter] += n
+
+    @classmethod
+    def _run(cls, fn, args):
+        with cls._stats_lock:
+            cls._queued -= 1
+            cls._in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with cls._stats_lock:
+                cls._in_flight -= 1
+
+    @classmethod
+    def submit(cls, fn, *args):
+        """Future de fn(*args), ou None si le pool est saturé (la recherche se passe alors de ce provider)."""
+        executor = cls._get_executor()
+        slots = cls._slots
+        if not slots.acquire(blocking=False):
+            cls._incr('rejected')
+            return None
+        with cls._stats_lock:
+            cls._queued += 1
+            cls._counters['submitted'] += 1
+        try:
+            future = executor.submit(cls._run, fn, args)
+        except RuntimeError:
+            # Pool arrêté entre-temps
+            with cls._stats_lock:
+                cls._queued -= 1
+            slots.release()
+            raise
+        future.add_done_callback(lambda f: cls._on_done(f, slots))
+        return future
+
+    @classmethod
+    def _on_done(cls, future, slots):
+        slots.release()
+        if future.cancelled():
+            with cls._stats_lock:
+                cls._queued -= 1
+                cls._counters['cancelled'] += 1
+        elif future.exception() is not None:
+            cls._incr('failed')
+        else:
+            cls._incr('completed')
+
+    @classmethod
+    def abandon(cls, futures, on_result=None):
+        """Libère la recherche de ses futures restantes : annulées si en file, sinon on_result(résultat) à la fin."""
+        for future in futures:
+            if future.cancel():
+                continue
+            cls._incr('abandoned')
+            if on_result is not None:
+                future.add_done_callback(lambda f: cls._deliver_late(f, on_result))
+
+    @classmethod
+    def _deliver_late(cls, future, on_result):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if result:
+            cls._incr('late_results')
+            on_result(result)
+
+    @classmethod
+    def shutdown(cls, wait=False):
+        with cls._lock:
+            if cls._executor is not None and cls._pid == os.getpid():
+                cls._executor.shutdown(wait=wait, cancel_futures=True)
+            cls._executor = None
+            cls._slots = None
+            cls._pid = None
+
+    @classmethod
+    def get_stats(cls):
+        with cls._stats_lock:
+            stats = dict(cls._counters)
+            stats['queue_depth'] = cls._queued
+            stats['in_flight'] = cls._in_flight
+        stats['max_workers'] = cls._settings.get('max_workers', cls.DEFAULT_MAX_WORKERS)
+        stats['max_pending'] = cls._settings.get('max_pending', cls.DEFAULT_MAX_PENDING)
+        stats['deadline'] = cls.deadline()
+        return stats
@@ -0,0 +1,131 @@
+import math
+import random
+import threading
+
+
+class ProviderScheduler:
+    """Choisit l'ordre et le nombre de providers à lancer par (type de requête, langue), façon bandit manchot.
+
+    Récompense d'un appel : 0 s'il est vide ou en échec, sinon (0.5 + 0.5 * remplissage) / (1 + latence / échelle).
+    Politique par défaut : Thompson sampling (Beta) ; mode déterministe : UCB1, égalités départagées par l'ordre prévu.
+    """
+
+    _settings = {'enabled': False}
+    _arms = {}
+    _lock = threading.Lock()
+    _rng = random.Random()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('SCHEDULER_ENABLED', False),
+            'deterministic': app.config.get('SCHEDULER_DETERMINISTIC', False),
+            'max_providers': app.config.get('SCHEDULER_MAX_PROVIDERS', 2),
+            'exploration': app.config.get('SCHEDULER_EXPLORATION', 0.5),
+            'decay': app.config.get('SCHEDULER_DECAY', 0.99),
+            'latency_scale': app.config.get('SCHEDULER_LATENCY_SCALE', 2.0),
+            'confident_rate': app.config.get('SCHEDULER_CONFIDENT_RATE', 0.9),
+            'min_samples': app.config.get('SCHEDULER_MIN_SAMPLES', 10),
+        }
+        cls.reset(app.config.get('SCHEDULER_SEED'))
+
+    @classmethod
+    def reset(cls, seed=None):
+        with cls._lock:
+            cls._arms = {}
+            cls._rng = random.Random(seed)
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def _arm(cls, query_type, lang, name):
+        return cls._arms.setdefault((query_type, lang, name), {
+            'weight': 0.0, 'reward': 0.0, 'success_weight': 0.0,
+            'calls': 0, 'successes': 0, 'results': 0, 'latency': 0.0, 'wins': 0
+        })
+
+    @classmethod
+    def reward(cls, count, limit, elapsed):
+        if not count:
+            return 0.0
+        fill = min(count / max(limit, 1), 1.0)
+        return (0.5 + 0.5 * fill) / (1 + elapsed / cls._settings.get('latency_scale', 2.0))
+
+    @classmethod
+    def record(cls, query_type, lang, name, count, limit, elapsed, failed=False):
+        decay = cls._settings.get('decay', 0.99)
+        reward = 0.0 if failed else cls.reward(count, limit, elapsed)
+        with cls._lock:
+            arm = cls._arm(query_type, lang, name)
+            # Décroissance : un provider qui se met à bloquer (ou se rétablit) est réévalué en quelques appels
+            arm['weight'] = arm['weight'] * decay + 1
+            arm['reward'] = arm['reward'] * decay + reward
+            arm['success_weight'] = arm['success_weight'] * decay + (1 if count and not failed else 0)
+            arm['calls'] += 1
+            arm['successes'] += 1 if count and not failed else 0
+            arm['results'] += count
+            arm['latency'] += elapsed
+
+    @classmethod
+    def record_win(cls, query_type, lang, name):
+        with cls._lock:
+            cls._arm(query_type, lang, name)['wins'] += 1
+
+    @classmethod
+    def _score(cls, arm, total_weight):
+        if cls._settings.get('deterministic', False):
+            if not arm['weight']:
+                return math.inf
+            bonus = cls._settings.get('exploration', 0.5) * math.sqrt(math.log(max(total_weight, 1)) / arm['weight'])
+            return arm['reward'] / arm['weight'] + bonus
+        return cls._rng.betavariate(1 + arm['reward'], 1 + arm['weight'] - arm['reward'])
+
+    @classmethod
+    def plan(cls, query_type, lang, sources, inline=()):
+        """(sources réordonnées, nombre à lancer tout de suite) ; les suivantes servent de réserve.
+
+        Les providers de inline (locaux, appelés en ligne) restent en tête, hors classement : le nombre
+        à lancer ne compte que les providers réseau.
+        Ordonnanceur désactivé : (sources, None), le plan d'origine est conservé.
+        """
+        if not cls.enabled() or not sources:
+            return sources, None
+        local = [(name, provider) for name, provider in sources if name in inline]
+        sources = [(name, provider) for name, provider in sources if name not in inline]
+        if not sources:
+            return local, None
+
+        with cls._lock:
+            arms = [dict(cls._arm(query_type, lang, name)) for name, _ in sources]
+            total_weight = sum(arm['weight'] for arm in arms)
+            scores = [cls._score(arm, total_weight) for arm in arms]
+
+        # Tri stable : à score égal, l'ordre prévu par _plan_sources est conservé
+        order = sorted(range(len(sources)), key=lambda i: -scores[i])
+        ranked = [sources[i] for i in order]
+
+        best = arms[order[0]]
+        confident = (
+            best['weight'] >= cls._settings.get('min_samples', 10)
+            and best['success_weight'] / best['weight'] >= cls._settings.get('confident_rate', 0.9)
+        )
+        count = 1 if confident else min(cls._settings.get('max_providers', 2), len(ranked))
+        return local + ranked, count
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            arms = {key: dict(arm) for key, arm in cls._arms.items()}
+        stats = {}
+        for (query_type, lang, name), arm in arms.items():
+            stats.setdefault(f"{query_type}:{lang}", {})[name] = {
+                'calls': arm['calls'],
+                'success_rate': round(arm['successes'] / arm['calls'], 3) if arm['calls'] else 0.0,
+                'avg_results': round(arm['results'] / arm['calls'], 2) if arm['calls'] else 0.0,
+                'avg_latency': round(arm['latency'] / arm['calls'], 3) if arm['calls'] else 0.0,
+                'wins': arm['wins'],
+                'reward': round(arm['reward'] / arm['weight'], 3) if arm['weight'] else None,
+            }
+        return {'enabled': cls.enabled(), 'deterministic': cls._settings.get('deterministic', False), 'arms': stats}
@@ -1,9 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus, urlparse, parse_qs
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import closing
 import re
 import os
+import time
 import torch
 from langdetect import detect, LangDetectException
 
@@ -16,8 +16,26 @@ except ImportError:
 
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
+from app.utils.http_client import HttpClient
+from app.utils.helpers import normalize_query, canonicalize_url
+from app.utils.html_parsers import ResultPageParser
+from app.services.cache_service import ScrapeCache
+from app.services.provider_executor import ProviderExecutor
+from app.services.circuit_breaker import ProviderBreakers
+from app.services.hedging import HedgePolicy
+from app.services.provider_scheduler import ProviderScheduler
+from app.services.wikipedia_local import WikipediaLocal
+from app.services.local_corpus import LocalCorpus
+from app.services.inference_server import InferenceServerClient
+from app.services.model_registry import ModelRegistry
+from app.services.summary_router import SummaryRouter
+
 class ScrapingService:
     DEFAULT_TIMEOUT = 10
+    # Providers sans réseau : interrogés en ligne avant de lancer les autres
+    LOCAL_PROVIDERS = {'wikipedia_local', 'local_corpus'}
+    # Résultats déjà vus, peut-être périmés : ils ne remportent pas la course, les providers réseau partent quand même
+    PROVISIONAL_PROVIDERS = {'local_corpus'}
 
     NEWS_CATEGORIES = {
         'world': ['monde', 'international', 'global'],
@@ -30,47 +48,68 @@ class ScrapingService:
         'health': ['santé', 'médecine', 'bien-être', 'virus', 'covid'],
     }
 
-    _summarizer_tokenizer = None
-    _summarizer_model = None
+    SUMMARIZER_MODEL_NAME = "mrm8488/bert2bert_shared-french-summarization"
 
     @classmethod
-    def _load_summarizer_model(cls):
-        if cls._summarizer_tokenizer is None or cls._summarizer_model is None:
-            model_name = "mrm8488/bert2bert_shared-french-summarization"
-            cls._summarizer_tokenizer = AutoTokenizer.from_pretrained(model_name)
-            cls._summarizer_model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-        return cls._summarizer_tokenizer, cls._summarizer_model
+    def _build_summarizer_model(cls):
+        tokenizer = AutoTokenizer.from_pretrained(cls.SUMMARIZER_MODEL_NAME)
+        model = AutoModelForSeq2SeqLM.from_pretrained(cls.SUMMARIZER_MODEL_NAME)
+        model.eval()
+        return tokenizer, model
 
     @classmethod
-    def enrich_with_ai_summary(cls, text, lang="fr"):
-        if not text or len(text.split()) < 5:
-            return "Résumé indisponible."
+    def _generate_summaries(cls, tokenizer_model, texts):
+        tokenizer, model = tokenizer_model
+        inputs = tokenizer(texts, max_length=512, return_tensors="pt", truncation=True, padding=True)
+        with torch.no_grad():
+            summary_ids = model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                num_beams=4,
+                min_length=10,
+                max_length=60,
+                early_stopping=True
+            )
+        return tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+    @classmethod
+    def summarize_batch(cls, texts, lang="fr"):
+        """Résume un lot de textes avec bert2bert (une seule génération batchée)."""
+        summaries = ["Résumé indisponible."] * len(texts)
+        todo = [i for i, text in enumerate(texts) if text and len(text.split()) >= 5]
+        if not todo:
+            return summaries
         try:
-            tokenizer, model = cls._load_summarizer_model()
-            model.eval()
-            inputs = tokenizer([text], max_length=512, return_tensors="pt", truncation=True)
-            with torch.no_grad():
-                summary_ids = model.generate(
-                    inputs["input_ids"],
-                    num_beams=4,
-                    min_length=10,
-                    max_length=60,
-                    early_stopping=True
-                )
-            summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-            return summary
+            if InferenceServerClient.enabled():
+                for i, summary in zip(todo, InferenceServerClient.summarize([texts[i] for i in todo], lang)):
+                    summaries[i] = summary or summaries[i]
+                return summaries
+            with ModelRegistry.use('bert2bert') as tokenizer_model:
+                if tokenizer_model is None:
+                    return summaries
+                generated = cls._generate_summaries(tokenizer_model, [texts[i] for i in todo])
+            for i, summary in zip(todo, generated):
+                summaries[i] = summary
         except Exception as e:
-            cls._log_error("enrich_with_ai_summary", e)
-            return "Résumé indisponible."
+            cls._log_error("summarize_batch", e)
+        return summaries
 
     @classmethod
-    def get_timeout(cls):
+    def enrich_with_ai_summary(cls, text, lang="fr"):
+        return SummaryRouter.summarize([text], lambda texts: cls.summarize_batch(texts, lang))[0]
+
+    @classmethod
+    def _config(cls, key, default):
         try:
             if current_app:
-                return current_app.config.get('SCRAPE_TIMEOUT', cls.DEFAULT_TIMEOUT)
+                return current_app.config.get(key, default)
         except RuntimeError:
             pass
-        return cls.DEFAULT_TIMEOUT
+        return default
+
+    @classmethod
+    def get_timeout(cls):
+        return cls._config('SCRAPE_TIMEOUT', cls.DEFAULT_TIMEOUT)
 
     @classmethod
     def _log_error(cls, context, error):
@@ -153,7 +192,7 @@ class ScrapingService:
             url = f"https://gnews.io/api/v4/search?q={q}&lang={lang or 'fr'}&max={limit}&token={api_key}"
             if category:
                 url += f"&topic={category}"
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=cls.get_timeout())
+            response = HttpClient.fetch(url, provider='gnews', headers={'User-Agent': 'Mozilla/5.0'})
             if response.status_code != 200:
                 return []
             articles = response.json().get('articles', [])[:limit]
@@ -162,8 +201,7 @@ class ScrapingService:
                 'url': a.get('url'),
                 'snippet': a.get('description') or a.get('content') or '',
                 'source': 'gnews',
-                'ai_summary': cls.enrich_with_ai_summary(a.get('description') or '', lang),
-                'enriched': True,
+                'enriched': False,
                 'image': a.get('image'),
                 'language': lang
             } for a in articles ]
@@ -171,6 +209,16 @@ class ScrapingService:
             cls._log_error("_scrape_gnews", e)
             return []
 
+    @classmethod
+    def _fetch_result_blocks(cls, layout, url, limit):
+        """Télécharge une page de résultats en flux et arrête la lecture dès que limit blocs sont extraits."""
+        with HttpClient.stream(url, provider=layout, headers={'User-Agent': 'Mozilla/5.0'}) as body:
+            parser = ResultPageParser.incremental(layout, limit, encoding=body.encoding)
+            for chunk in body:
+                if parser.feed(chunk):
+                    break
+            return parser.close()
+
     @classmethod
     def _scrape_google(cls, query, limit, lang=None, debug=False):
         try:
@@ -178,28 +226,15 @@ class ScrapingService:
             url = f"https://www.google.com/search?q={q}&num={limit}"
             if lang:
                 url += f"&hl={lang}"
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=cls.get_timeout())
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = []
-            for result in soup.select('div.g'):
-                title = result.find('h3')
-                link = result.find('a', href=True)
-                snippet_tag = result.find('div', class_='IsZvec')
-                if title and link:
-                    snippet = snippet_tag.get_text(strip=True) if snippet_tag else ''
-                    results.append({
-                        'title': title.get_text(strip=True),
-                        'url': cls._clean_google_url(link['href']),
-                        'snippet': snippet,
-                        'source': 'google',
-                        'ai_summary': cls.enrich_with_ai_summary(snippet, lang),
-                        'enriched': True,
-                        'image': None,
-                        'language': lang
-                    })
-                    if len(results) >= limit:
-                        break
-            return results
+            return [{
+                'title': block['title'],
+                'url': cls._clean_google_url(block['href']),
+                'snippet': block['snippet'],
+                'source': 'google',
+                'enriched': False,
+                'image': None,
+                'language': lang
+            } for block in cls._fetch_result_blocks('google', url, limit)]
         except Exception as e:
             cls._log_error("_scrape_google", e)
             return []
@@ -208,15 +243,14 @@ class ScrapingService:
     def _scrape_duckduckgo(cls, query, limit, lang=None, debug=False):
         try:
             url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
-            data = requests.get(url, timeout=cls.get_timeout()).json()
+            data = HttpClient.fetch(url, provider='duckduckgo').json()
             if data.get('AbstractText'):
                 return [{
                     'title': data.get('Heading', query),
                     'url': data.get('AbstractURL'),
                     'snippet': data['AbstractText'],
                     'source': 'duckduckgo',
-                    'ai_summary': cls.enrich_with_ai_summary(data['AbstractText'], lang),
-                    'enriched': True,
+                    'enriched': False,
                     'image': None,
                     'language': lang
                 }][:limit]
@@ -229,26 +263,15 @@ class ScrapingService:
     def _scrape_bing(cls, query, limit, lang=None, debug=False):
         try:
             url = f"https://www.bing.com/search?q={quote_plus(query)}&count={limit}"
-            soup = BeautifulSoup(requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=cls.get_timeout()).text, 'html.parser')
-            results = []
-            for result in soup.find_all('li', class_='b_algo'):
-                title = result.find('h2')
-                link = result.find('a', href=True)
-                snippet = result.find('p')
-                if title and link:
-                    results.append({
-                        'title': title.get_text(strip=True),
-                        'url': link['href'],
-                        'snippet': snippet.get_text(strip=True) if snippet else '',
-                        'source': 'bing',
-                        'ai_summary': cls.enrich_with_ai_summary(snippet.get_text(strip=True) if snippet else '', lang),
-                        'enriched': True,
-                        'image': None,
-                        'language': lang
-                    })
-                    if len(results) >= limit:
-                        break
-            return results
+            return [{
+                'title': block['title'],
+                'url': block['href'],
+                'snippet': block['snippet'],
+                'source': 'bing',
+                'enriched': False,
+                'image': None,
+                'language': lang
+            } for block in cls._fetch_result_blocks('bing', url, limit)]
         except Exception as e:
             cls._log_error("_scrape_bing", e)
             return []
@@ -257,14 +280,13 @@ class ScrapingService:
     def _scrape_wikipedia(cls, query, lang="fr", debug=False):
         try:
             url = f"https://{lang}.wikipedia.org/api/rest_v1/page/summary/{quote_plus(query)}"
-            data = requests.get(url, timeout=cls.get_timeout()).json()
+            data = HttpClient.fetch(url, provider='wikipedia').json()
             return [{
                 'title': data.get('title'),
                 'url': data.get('content_urls', {}).get('desktop', {}).get('page'),
                 'snippet': data.get('extract', ''),
                 'source': 'wikipedia',
-                'ai_summary': cls.enrich_with_ai_summary(data.get('extract', ''), lang),
-                'enriched': True,
+                'enriched': False,
                 'image': data.get('thumbnail', {}).get('source'),
                 'language': lang
             }]
@@ -273,53 +295,121 @@ class ScrapingService:
             return []
 
     @classmethod
-    def scrape_web(cls, query, limit=10, lang=None, debug=False):
+    def _scrape_wikipedia_local(cls, query, lang="fr", debug=False):
         try:
-            lang = lang or cls.detect_language(query)
-            rewritten = cls.reformulate_query(query, lang, debug)
-
-            # IMPORTANT : on ne nettoie PAS la requête reformulée pour garder tous les mots utiles
-            cleaned_query = rewritten
+            record = WikipediaLocal.lookup(query, lang or 'fr')
+            if debug:
+                print(f"[_scrape_wikipedia_local] {'trouvé : ' + record['title'] if record else 'absent de l’index'}")
+            if not record:
+                return []
+            return [{
+                'title': record['title'],
+                'url': record['url'],
+                'snippet': record['abstract'],
+                'source': 'wikipedia',
+                'enriched': False,
+                'image': None,
+                'language': lang
+            }]
+        except Exception as e:
+            cls._log_error("_scrape_wikipedia_local", e)
+            return []
 
+    @classmethod
+    def _scrape_local_corpus(cls, query, limit, lang=None, debug=False):
+        try:
+            results = LocalCorpus.search(query, lang, limit)
             if debug:
-                print(f"🔍 Query utilisée pour scraping: '{cleaned_query}', langue: {lang}")
-
-            query_type = cls.detect_query_type(query)
-            category = cls.detect_news_category(cleaned_query) if query_type == 'news' else None
-
-            if query_type == 'definition':
-                sources = [
-                    lambda q, l, ln, d: cls._scrape_wikipedia(q, lang=ln, debug=d),
-                    cls._scrape_google,
-                ]
-            elif query_type == 'news':
-                sources = [
-                    lambda q, l, ln, d: cls._scrape_gnews(q, l, ln, d, category),
-                    cls._scrape_google,
-                ]
+                print(f"[_scrape_local_corpus] {len(results)} résultat(s) déjà vus")
+            return results
+        except Exception as e:
+            cls._log_error("_scrape_local_corpus", e)
+            return []
+
+    @classmethod
+    def _prepare_query(cls, query, lang=None, debug=False):
+        lang = lang or cls.detect_language(query)
+        rewritten = cls.reformulate_query(query, lang, debug)
+
+        # IMPORTANT : on ne nettoie PAS la requête reformulée pour garder tous les mots utiles
+        cleaned_query = rewritten
+
+        if debug:
+            print(f"🔍 Query utilisée pour scraping: '{cleaned_query}', langue: {lang}")
+
+        query_type = cls.detect_query_type(query)
+        category = cls.detect_news_category(cleaned_query) if query_type == 'news' else None
+        return lang, cleaned_query, query_type, category
+
+    @classmethod
+    def _plan_sources(cls, query_type, category=None):
+        """Liste ordonnée (nom, provider) à lancer selon le type de requête ; le corpus local ferme la marche."""
+        corpus = [('local_corpus', cls._scrape_local_corpus)] if LocalCorpus.enabled() else []
+        if query_type == 'definition':
+            local = [('wikipedia_local', lambda q, l, ln, d: cls._scrape_wikipedia_local(q, lang=ln, debug=d))] if WikipediaLocal.enabled() else []
+            return local + [
+                ('wikipedia', lambda q, l, ln, d: cls._scrape_wikipedia(q, lang=ln, debug=d)),
+                ('google', cls._scrape_google),
+            ] + corpus
+        if query_type == 'news':
+            return [
+                ('gnews', lambda q, l, ln, d: cls._scrape_gnews(q, l, ln, d, category)),
+                ('google', cls._scrape_google),
+            ] + corpus
+        return [
+            ('google', cls._scrape_google),
+            ('duckduckgo', cls._scrape_duckduckgo),
+            ('bing', cls._scrape_bing),
+            ('wikipedia', lambda q, l, ln, d: cls._scrape_wikipedia(q, lang=ln, debug=d)),
+        ] + corpus
+
+    @classmethod
+    def _available_sources(cls, sources, cleaned_query, lang, debug=False):
+        """Retire les providers disjonctés et ceux qui viennent de revenir vides pour cette requête."""
+        key = (normalize_query(cleaned_query), lang)
+        available = []
+        for name, provider in sources:
+            if ProviderBreakers.is_known_empty(name, key):
+                if debug:
+                    print(f"🚫 {name} ignoré : aucun résultat récent pour cette requête")
+            elif not ProviderBreakers.available(name):
+                if debug:
+                    print(f"🔌 {name} ignoré : disjoncteur ouvert")
             else:
-                sources = [
-                    cls._scrape_google,
-                    cls._scrape_duckduckgo,
-                    cls._scrape_bing,
-                    lambda q, l, ln, d: cls._scrape_wikipedia(q, lang=ln, debug=d),
-                ]
-
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {
-                    executor.submit(s, cleaned_query, limit, lang, debug): str(s)
-                    for s in sources
-                }
-                for future in as_completed(futures):
-                    res = future.result()
-                    if res:
-                        return res[:limit]
+                available.append((name, provider))
+        return available
 
-        except Exception as e:
-            cls._log_error("scrape_web", e)
+    @classmethod
+    def _call_provider(cls, name, provider, cleaned_query, limit, lang, debug, query_type=None):
+        """Appelle un provider et rapporte son issue et sa latence (disjoncteur, hedging, ordonnanceur)."""
+        HttpClient.reset_failures()
+        start = time.monotonic()
+        try:
+            res = provider(cleaned_query, limit, lang, debug)
+        except Exception:
+            ProviderBreakers.record(name, False, time.monotonic() - start)
+            ProviderScheduler.record(query_type, lang, name, 0, limit, time.monotonic() - start, failed=True)
+            raise
+        # Les providers avalent leurs erreurs : un [] après une erreur HTTP est un échec, pas une absence de résultat
+        failed = not res and HttpClient.failure_count() > 0
+        elapsed = time.monotonic() - start
+        ProviderBreakers.record(name, not failed, elapsed)
+        if not failed:
+            HedgePolicy.observe(name, elapsed)
+        ProviderScheduler.record(query_type, lang, name, len(res or []), limit, elapsed, failed=failed)
+        if not res and not failed and name not in cls.LOCAL_PROVIDERS:
+            # Inutile pour un provider local : il ne coûte rien et verrait tard les documents qu'on vient d'indexer
+            ProviderBreakers.remember_empty(name, (normalize_query(cleaned_query), lang))
+        if res and name not in cls.LOCAL_PROVIDERS:
+            # Tout résultat réseau alimente le corpus local (repli hors ligne, premier lot instantané en streaming)
+            LocalCorpus.add(res)
+        return res
 
-        # Fallback IA local si rien trouvé
-        summary = cls.enrich_with_ai_summary(f"{query} est un sujet intéressant. Recherche plus approfondie en cours...", lang)
+    @classmethod
+    def _fallback_results(cls, query, lang):
+        """Aucun provider, corpus local compris, n'a rien renvoyé à temps : texte générique."""
+        # Fallback IA local si rien trouvé : texte déjà court, inutile de le faire passer par un résumeur
+        summary = f"{query} est un sujet intéressant. Recherche plus approfondie en cours..."
         return [{
             'title': f'Contenu généré pour {query}',
             'url': None,
@@ -331,7 +421,299 @@ class ScrapingService:
             'language': lang
         }]
 
+    @classmethod
+    def _race_providers(cls, sources, cleaned_query, limit, lang, debug, on_late=None, query_type=None, launch_count=None, deadline=None):
+        """Générateur (nom, résultats) dans l'ordre d'arrivée, jusqu'à la deadline de la recherche.
+
+        Les providers locaux passent d'abord, en ligne (les provisoires n'empêchent pas les appels réseau) ; parmi les providers réseau, seuls les launch_count
+        premiers partent (tous par défaut, HEDGE_PRIMARY_PROVIDERS avec le hedging) ; les suivants sont lancés
+        dès que les premiers ont répondu vide, ou en couverture si aucun résultat n'est arrivé après le délai
+        de hedging.
+        À la fermeture (premier résultat retenu, deadline, client parti), les providers restants sont
+        abandonnés sans être attendus ; on_late reçoit leurs résultats tardifs non vides.
+        """
+        # Providers locaux : quelques microsecondes, en ligne ; s'ils suffisent, aucun appel réseau ne part
+        local = [(name, provider) for name, provider in sources if name in cls.LOCAL_PROVIDERS]
+        if local:
+            sources = [(name, provider) for name, provider in sources if name not in cls.LOCAL_PROVIDERS]
+            for name, provider in local:
+                if not ProviderBreakers.allow(name):
+                    continue
+                res = cls._call_provider(name, provider, cleaned_query, limit, lang, debug, query_type)
+                if res and name not in cls.PROVISIONAL_PROVIDERS and ProviderScheduler.enabled():
+                    ProviderScheduler.record_win(query_type, lang, name)
+                yield name, res
+
+        hedging = HedgePolicy.enabled() and bool(sources)
+        if launch_count is None:
+            launch_count = HedgePolicy.primary_count() if hedging else len(sources)
+        primaries, alternates = sources[:launch_count], list(sources[launch_count:])
+
+        futures = {}
+        pending = set()
+
+        def launch(name, provider, hedged):
+            # Disjoncteur consulté au dernier moment : en half_open, seul un appel réellement lancé prend la sonde
+            if not ProviderBreakers.allow(name):
+                if debug:
+                    print(f"🔌 {name} ignoré : disjoncteur ouvert")
+                return False
+            future = ProviderExecutor.submit(cls._call_provider, name, provider, cleaned_query, limit, lang, debug, query_type)
+            if future is None:
+                ProviderBreakers.release(name)
+                cls._log_error("scrape_web", RuntimeError(f"pool des providers saturé, '{name}' ignoré"))
+                return False
+            futures[future] = (name, hedged)
+            pending.add(future)
+            return True
+
+        for name, provider in primaries:
+            if hedging:
+                HedgePolicy.record_primary()
+            launch(name, provider, False)
+
+        start = time.monotonic()
+        deadline = start + (deadline or ProviderExecutor.deadline())
+        hedges_left = HedgePolicy.max_per_search() if hedging else 0
+        hedge_at = start + HedgePolicy.delay_for([name for name, _ in primaries]) if hedges_left else None
+        won = False
+        try:
+            while pending or alternates:
+                now = time.monotonic()
+                if now >= deadline:
+                    if debug:
+                        print(f"⏱️ Deadline atteinte, providers abandonnés : {', '.join(futures[f][0] for f in pending)}")
+                    break
+
+                if not pending:
+                    if won:
+                        break
+                    # Tous les providers lancés ont répondu vide : le suivant part tout de suite
+                    name, provider = alternates.pop(0)
+                    if hedging:
+                        HedgePolicy.record_primary()
+                    launch(name, provider, False)
+                    continue
+
+                if hedge_at is not None and now >= hedge_at:
+                    # Une couverture refusée (surcoût, pool saturé) ne compte pas : nouvel essai après un nouveau délai
+                    if HedgePolicy.try_hedge():
+                        # Provider de secours, ou à défaut second appel au primaire le plus rapide (nouvelle connexion)
+                        if alternates:
+                            name, provider = alternates.pop(0)
+                        else:
+                            name = HedgePolicy.fastest([name for name, _ in primaries])
+                            provider = dict(primaries)[name]
+                        if debug:
+                            print(f"🛡️ Couverture après {now - start:.2f}s : {name}")
+                        if launch(name, provider, True):
+                            HedgePolicy.record_launched()
+                            hedges_left -= 1
+                        else:
+                            HedgePolicy.release()
+                    hedge_at = now + HedgePolicy.delay_for([name for name, _ in primaries]) if hedges_left else None
+
+                timeout = min(deadline, hedge_at) if hedge_at is not None else deadline
+                done, still_pending = wait(pending, timeout=max(timeout - now, 0), return_when=FIRST_COMPLETED)
+                pending.intersection_update(still_pending)
+                for future in done:
+                    name, hedged = futures[future]
+                    try:
+                        res = future.result()
+                    except Exception as e:
+                        cls._log_error(name, e)
+                        continue
+                    if res and not won:
+                        won = True
+                        if hedging:
+                            HedgePolicy.record_win(name, hedged)
+                        if ProviderScheduler.enabled():
+                            ProviderScheduler.record_win(query_type, lang, name)
+                    yield name, res
+        finally:
+            ProviderExecutor.abandon(pending, on_late)
+
+    @classmethod
+    def _late_results_to_cache(cls, query, lang, query_type, limit, state):
+        """Callback pour les providers abandonnés : le premier résultat tardif sert la prochaine recherche."""
+        def feed(res):
+            if not state['cached']:
+                state['cached'] = True
+                ScrapeCache.set(query, lang, query_type, limit, res[:limit])
+        return feed
+
+    @classmethod
+    def _canonical_url(cls, url):
+        return canonicalize_url(cls._clean_google_url(url)) if url else ''
+
+    @staticmethod
+    def _fill_missing(target, other):
+        for key, value in other.items():
+            if value and not target.get(key):
+                target[key] = value
+
+    @classmethod
+    def merge_results(cls, batches, limit, k=None):
+        """Fusionne les listes de plusieurs providers : dédoublonnage par URL canonique puis reciprocal rank fusion.
+
+        batches : [(provider, résultats)] dans l'ordre du plan, qui départage les égalités ; le classement
+        ne dépend donc pas de l'ordre d'arrivée des providers.
+        """
+        k = k or cls._config('SCRAPE_MERGE_RRF_K', 60)
+        merged = {}
+        for order, (name, results) in enumerate(batches):
+            for rank, result in enumerate(results, start=1):
+                key = cls._canonical_url(result.get('url')) or f"{name}#{rank}"
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = {'result': dict(result), 'score': 0.0, 'best': (rank, order), 'sources': []}
+                    entry = merged[key]
+                elif (rank, order) < entry['best']:
+                    # Représentant = occurrence la mieux classée, complétée par les autres (snippet, image...)
+                    previous, entry['result'] = entry['result'], dict(result)
+                    cls._fill_missing(entry['result'], previous)
+                    entry['best'] = (rank, order)
+                else:
+                    cls._fill_missing(entry['result'], result)
+                if name not in entry['sources']:
+                    entry['score'] += 1.0 / (k + rank)
+                    entry['sources'].append(name)
+
+        ranked = sorted(merged.items(), key=lambda item: (-item[1]['score'], item[1]['best'], item[0]))
+        results = []
+        for _, entry in ranked[:limit]:
+            result = entry['result']
+            if result.get('url'):
+                result['url'] = cls._clean_google_url(result['url'])
+            result['sources'] = entry['sources']
+            result['rrf_score'] = round(entry['score'], 5)
+            results.append(result)
+        return results
+
+    @classmethod
+    def _scrape_merged(cls, cleaned_query, limit, lang, query_type, category, debug=False):
+        """Interroge tous les providers disponibles jusqu'à la deadline de fusion et fusionne leurs réponses."""
+        sources = cls._available_sources(cls._plan_sources(query_type, category), cleaned_query, lang, debug)
+        collected = {}
+        deadline = cls._config('SCRAPE_MERGE_DEADLINE', ProviderExecutor.deadline())
+        with closing(cls._race_providers(sources, cleaned_query, limit, lang, debug, None, query_type, len(sources), deadline)) as batches:
+            for name, res in batches:
+                if res:
+                    collected.setdefault(name, res)
+        if debug:
+            print(f"🔀 Fusion de {len(collected)} provider(s) : {', '.join(collected)}")
+        return cls.merge_results([(name, collected[name]) for name, _ in sources if name in collected], limit)
+
+    @classmethod
+    def scrape_web(cls, query, limit=10, lang=None, debug=False, use_cache=True, merge=None):
+        """Résultats web : premier provider non vide, ou fusion de tous les providers (merge / SCRAPE_MERGE_MODE)."""
+        provisional = None
+        try:
+            lang, cleaned_query, query_type, category = cls._prepare_query(query, lang, debug)
+            merge = cls._config('SCRAPE_MERGE_MODE', False) if merge is None else merge
+            mode = 'merge' if merge else None
+
+            if use_cache:
+                cached = ScrapeCache.get(query, lang, query_type, limit, mode)
+                if cached:
+                    if debug:
+                        print(f"⚡ Résultats servis depuis le cache pour '{query}'")
+                    return cached
+            else:
+                ScrapeCache.record_bypass()
+
+            if merge:
+                merged = cls._scrape_merged(cleaned_query, limit, lang, query_type, category, debug)
+                if any(set(result['sources']) - cls.PROVISIONAL_PROVIDERS for result in merged):
+                    ScrapeCache.set(query, lang, query_type, limit, merged, mode)
+                return merged or cls._fallback_results(query, lang)
+
+            sources = cls._available_sources(cls._plan_sources(query_type, category), cleaned_query, lang, debug)
+            sources, launch_count = ProviderScheduler.plan(query_type, lang, sources, cls.LOCAL_PROVIDERS)
+            state = {'cached': False}
+            on_late = cls._late_results_to_cache(query, lang, query_type, limit, state)
+
+            with closing(cls._race_providers(sources, cleaned_query, limit, lang, debug, on_late, query_type, launch_count)) as batches:
+                for name, res in batches:
+                    if not res:
+                        continue
+                    if name in cls.PROVISIONAL_PROVIDERS:
+                        # Gardé en repli, jamais mis en cache : le cache ne garde que des réponses fraîches
+                        provisional = provisional or res[:limit]
+                        continue
+                    state['cached'] = True
+                    ScrapeCache.set(query, lang, query_type, limit, res[:limit])
+                    return res[:limit]
+
+        except Exception as e:
+            cls._log_error("scrape_web", e)
+
+        return provisional or cls._fallback_results(query, lang)
+
+    @classmethod
+    def iter_web_results(cls, query, limit=10, lang=None, debug=False, use_cache=True):
+        """Générateur (source, résultats) : chaque provider est émis dès qu'il répond, sans attendre les autres.
+
+        Le corpus local n'émet d'abord que LOCAL_CORPUS_FIRST_RESULTS résultats ; la suite n'est émise
+        que si aucun provider réseau ne répond.
+        """
+        found = False
+        provisional, provisional_rest = False, []
+        try:
+            lang, cleaned_query, query_type, category = cls._prepare_query(query, lang, debug)
+
+            if use_cache:
+                cached = ScrapeCache.get(query, lang, query_type, limit)
+                if cached:
+                    yield 'cache', cached
+                    return
+            else:
+                ScrapeCache.record_bypass()
+
+            sources = cls._available_sources(cls._plan_sources(query_type, category), cleaned_query, lang, debug)
+            sources, launch_count = ProviderScheduler.plan(query_type, lang, sources, cls.LOCAL_PROVIDERS)
+            state = {'cached': False}
+            on_late = cls._late_results_to_cache(query, lang, query_type, limit, state)
+
+            # Client déconnecté ou générateur fermé : closing() abandonne les providers restants sans les attendre
+            with closing(cls._race_providers(sources, cleaned_query, limit, lang, debug, on_late, query_type, launch_count)) as batches:
+                for name, res in batches:
+                    if not res:
+                        continue
+                    if name in cls.PROVISIONAL_PROVIDERS:
+                        # Premier lot instantané, jamais mis en cache : le cache ne garde que des réponses fraîches
+                        first = min(cls._config('LOCAL_CORPUS_FIRST_RESULTS', 3), limit)
+                        provisional, provisional_rest = True, res[first:limit]
+                        yield name, res[:first]
+                        continue
+                    if not state['cached']:
+                        # Même contenu que scrape_web : le premier provider non vide alimente le cache
+                        state['cached'] = True
+                        ScrapeCache.set(query, lang, query_type, limit, res[:limit])
+                    found = True
+                    yield name, res[:limit]
+
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            cls._log_error("iter_web_results", e)
+
+        if found:
+            return
+        if provisional_rest:
+            yield 'local_corpus', provisional_rest
+        elif not provisional:
+            fallback = cls._fallback_results(query, lang)
+            yield fallback[0]['source'], fallback
+
     @classmethod
     def scrape_news(cls, query, limit=10, lang='fr', debug=False):
         category = cls.detect_news_category(query)
         return cls._scrape_gnews(query, limit, lang=lang, debug=debug, category=category)
+
+
+ModelRegistry.register(
+    'bert2bert', ScrapingService._build_summarizer_model,
+    warmup=lambda m: ScrapingService._generate_summaries(m, ["Le modèle de résumé français est chargé et prêt à être utilisé."]),
+    quantize=True
+)
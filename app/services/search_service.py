@@ -5,21 +5,30 @@ from flask import current_app
 from pymongo import DESCENDING
 from transformers import CamembertTokenizer, CamembertForMaskedLM
 
+from app.services.model_registry import ModelRegistry
+
 
 class SearchService:
-    _tokenizer = None
-    _model = None
+    @classmethod
+    def _build_camembert(cls):
+        return CamembertTokenizer.from_pretrained('camembert-base'), CamembertForMaskedLM.from_pretrained('camembert-base')
 
     @classmethod
-    def _load_camembert(cls):
-        if cls._tokenizer is None or cls._model is None:
-            cls._tokenizer = CamembertTokenizer.from_pretrained('camembert-base')
-            cls._model = CamembertForMaskedLM.from_pretrained('camembert-base')
-        return cls._tokenizer, cls._model
+    def _warmup_camembert(cls, tokenizer_model):
+        tokenizer, model = tokenizer_model
+        with torch.no_grad():
+            model(tokenizer.encode(f"Bonjour {tokenizer.mask_token}", return_tensors='pt'))
 
     @classmethod
     def get_ai_suggestions_local(cls, query, limit=5):
-        tokenizer, model = cls._load_camembert()
+        with ModelRegistry.use('camembert') as tokenizer_model:
+            if tokenizer_model is None:
+                raise RuntimeError("Modèle CamemBERT indisponible")
+            return cls._predict_masked(tokenizer_model, query, limit)
+
+    @classmethod
+    def _predict_masked(cls, tokenizer_model, query, limit):
+        tokenizer, model = tokenizer_model
         model.eval()
 
         prompt = query.strip()
@@ -176,3 +185,6 @@ class SearchService:
             })
 
         return trends
+
+
+ModelRegistry.register('camembert', SearchService._build_camembert, warmup=SearchService._warmup_camembert, quantize=True)
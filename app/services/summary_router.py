@@ -0,0 +1,177 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_TOKENIZER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bert-base-uncased', 'tokenizer.json')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?…])\s+')
+WORD = re.compile(r'\w+')
+
+
+class SummaryRouter:
+    """Aiguillage des résumés selon la longueur en tokens (tokenizer bert-base-uncased) :
+    texte déjà plus court qu'un résumé rendu tel quel, texte moyen résumé par extraction (phrases notées
+    TF-IDF, en NumPy), seul le texte long passe par le modèle abstractif (beam search).
+    """
+
+    DEFAULT_SETTINGS = {
+        'enabled': True, 'passthrough_tokens': 60, 'abstractive_tokens': 200, 'tokenizer_path': DEFAULT_TOKENIZER_PATH,
+    }
+
+    _settings = dict(DEFAULT_SETTINGS)
+    _tokenizer = None
+    _tokenizer_loaded = False
+    _lock = threading.Lock()
+    _stats = {'passthrough': 0, 'extractive': 0, 'abstractive': 0, 'routing_time': 0.0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('SUMMARY_ROUTING_ENABLED', True),
+            'passthrough_tokens': app.config.get('SUMMARY_PASSTHROUGH_TOKENS', 60),
+            'abstractive_tokens': app.config.get('SUMMARY_ABSTRACTIVE_TOKENS', 200),
+            'tokenizer_path': app.config.get('SUMMARY_TOKENIZER_PATH') or DEFAULT_TOKENIZER_PATH,
+        }
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._tokenizer = None
+            cls._tokenizer_loaded = False
+            cls._stats = {'passthrough': 0, 'extractive': 0, 'abstractive': 0, 'routing_time': 0.0}
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def _get_tokenizer(cls):
+        if not cls._tokenizer_loaded:
+            with cls._lock:
+                if not cls._tokenizer_loaded:
+                    try:
+                        from tokenizers import Tokenizer
+                        tokenizer = Tokenizer.from_file(cls._settings['tokenizer_path'])
+                        tokenizer.no_truncation()
+                        cls._tokenizer = tokenizer
+                    except Exception as e:
+                        print(f"[SummaryRouter] Tokenizer indisponible, comptage approché : {e}")
+                    cls._tokenizer_loaded = True
+        return cls._tokenizer
+
+    @classmethod
+    def count_tokens(cls, texts):
+        """Nombre de tokens WordPiece de chaque texte (sans [CLS]/[SEP]), en un seul appel au tokenizer."""
+        tokenizer = cls._get_tokenizer()
+        if tokenizer is None:
+            # Repli : ~1,3 token par mot pour le français avec un vocabulaire anglais
+            return [round(len(WORD.findall(text or '')) * 1.3) for text in texts]
+        return [len(encoding.ids) for encoding in tokenizer.encode_batch([text or '' for text in texts], add_special_tokens=False)]
+
+    @classmethod
+    def extractive(cls, text, max_tokens=None):
+        """Phrases les plus représentatives (cosinus TF-IDF avec le texte entier), dans l'ordre du texte,
+        jusqu'à max_tokens tokens."""
+        max_tokens = max_tokens or cls._settings['passthrough_tokens']
+        sentences = [s.strip() for s in SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+        if len(sentences) < 2:
+            return cls._truncate(text, max_tokens)
+
+        tokens = [WORD.findall(sentence.lower()) for sentence in sentences]
+        vocabulary = {}
+        rows, cols = [], []
+        for row, words in enumerate(tokens):
+            for word in words:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+        tf = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+        np.add.at(tf, (rows, cols), 1.0)
+        idf = np.log((1 + len(sentences)) / (1 + np.count_nonzero(tf, axis=0))) + 1.0
+        tfidf = tf * idf
+        tfidf /= np.maximum(np.linalg.norm(tfidf, axis=1, keepdims=True), 1e-9)
+        centroid = tfidf.sum(axis=0)
+        scores = tfidf @ (centroid / max(np.linalg.norm(centroid), 1e-9))
+
+        lengths = cls.count_tokens(sentences)
+        chosen, used = [], 0
+        for index in np.argsort(-scores, kind='stable'):
+            if used + lengths[index] > max_tokens and chosen:
+                continue
+            chosen.append(int(index))
+            used += lengths[index]
+            if used >= max_tokens:
+                break
+        summary = ' '.join(sentences[i] for i in sorted(chosen))
+        return summary if used <= max_tokens else cls._truncate(summary, max_tokens)
+
+    @classmethod
+    def _truncate(cls, text, max_tokens):
+        # Une seule phrase trop longue : coupée au mot près, environ max_tokens tokens
+        words = text.split()
+        while len(words) > 1 and cls.count_tokens([' '.join(words)])[0] > max_tokens:
+            words = words[:max(int(len(words) * 0.8), 1)]
+        return ' '.join(words) + ('…' if len(words) < len(text.split()) else '')
+
+    @classmethod
+    def route(cls, texts):
+        """Aiguillage de chaque texte : 'passthrough', 'extractive' ou 'abstractive' (texte long, texte vide,
+        ou aiguillage désactivé)."""
+        if not cls.enabled():
+            return ['abstractive'] * len(texts)
+        routes = []
+        for text, count in zip(texts, cls.count_tokens(texts)):
+            if not text or not text.strip():
+                # Le résumeur abstractif a déjà sa réponse pour un texte vide
+                routes.append('abstractive')
+            elif count <= cls._settings['passthrough_tokens']:
+                routes.append('passthrough')
+            elif count <= cls._settings['abstractive_tokens']:
+                routes.append('extractive')
+            else:
+                routes.append('abstractive')
+        return routes
+
+    @classmethod
+    def summarize(cls, texts, abstractive):
+        """Résumés de texts ; abstractive(textes) -> résumés n'est appelé que pour les textes longs, en un lot."""
+        if not cls.enabled() or not texts:
+            return abstractive(texts)
+        start = time.perf_counter()
+        summaries = [None] * len(texts)
+        long_texts = []
+        passthrough = extractive = empty = 0
+        for i, (text, route) in enumerate(zip(texts, cls.route(texts))):
+            if route == 'passthrough':
+                summaries[i] = text.strip()
+                passthrough += 1
+            elif route == 'extractive':
+                summaries[i] = cls.extractive(text)
+                extractive += 1
+            else:
+                long_texts.append(i)
+                if not text or not text.strip():
+                    empty += 1
+        elapsed = time.perf_counter() - start
+        if long_texts:
+            for i, summary in zip(long_texts, abstractive([texts[i] for i in long_texts])):
+                summaries[i] = summary
+        with cls._lock:
+            cls._stats['passthrough'] += passthrough
+            cls._stats['extractive'] += extractive
+            cls._stats['abstractive'] += len(long_texts) - empty
+            cls._stats['routing_time'] += elapsed
+        return summaries
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+        routed = stats['passthrough'] + stats['extractive'] + stats['abstractive']
+        stats['abstractive_rate'] = round(stats['abstractive'] / routed, 3) if routed else 0.0
+        stats['routing_ms'] = round(stats.pop('routing_time') * 1000, 1)
+        stats['enabled'] = cls.enabled()
+        stats['tokenizer'] = cls._tokenizer is not None if cls._tokenizer_loaded else None
+        return stats
@@ -0,0 +1,328 @@
+"""Index local des résumés Wikipédia, mappé en mémoire : réponses aux requêtes de définition sans réseau.
+
+Construction depuis un dump d'abstracts (ex. frwiki-latest-abstract.xml.gz) :
+    python -m app.services.wikipedia_local build --lang fr --dump frwiki-latest-abstract.xml.gz
+Vérification : python -m app.services.wikipedia_local lookup --lang fr "photosynthèse"
+
+Format (petit-boutiste) : en-tête | colonnes des tables (titres triés, titres normalisés triés) | clés | fiches.
+Les colonnes sont lues en place dans le mmap : les workers partagent les pages du cache système,
+sans copie par processus.
+"""
+import argparse
+import bz2
+import gzip
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from array import array
+
+from app.utils.mapped_file import MappedFile, columns_size, write_columns
+
+MAGIC = b'WIKIABS2'
+HEADER = struct.Struct('<8sQQQQ')  # magic, nb titres, nb titres normalisés, offset des clés, offset des fiches
+# Tables en colonnes (entiers 64 bits d'abord, pour l'alignement), dans cet ordre après l'en-tête
+COLUMNS = (
+    ('title_key_off', 'Q', 'title'),
+    ('rec_off', 'Q', 'title'),
+    ('norm_key_off', 'Q', 'norm'),
+    ('title_key_len', 'I', 'title'),
+    ('rec_len', 'I', 'title'),
+    ('norm_key_len', 'I', 'norm'),
+    ('norm_title', 'I', 'norm'),
+)
+FIELD_SEP = '\x1f'
+
+# Mots en tête de requête de définition qui ne font pas partie du titre (après normalisation : sans accents)
+QUERY_PREFIXES = {
+    'definition', 'definir', 'def', 'c', 'est', 'quoi', 'qu', 'ce', 'que', 'qui',
+    'le', 'la', 'les', 'l', 'un', 'une', 'des', 'du', 'de', 'd',
+    'what', 'is', 'a', 'an', 'the', 'define', 'meaning', 'of',
+}
+TITLE_PREFIX = re.compile(r'^Wikip[ée]dia\s*:\s*')
+# Abstracts réduits à du balisage (modèles, tableaux) dans les dumps
+MARKUP_PREFIXES = ('|', '{', '!', '[[', '<')
+
+
+def normalize_title(text):
+    """Minuscules, sans accents ni ponctuation, espaces simples : 'Photosynthèse' -> 'photosynthese'."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'\w+', text))
+
+
+def title_candidates(query):
+    """Titres normalisés à essayer : la requête entière ('la defense'), puis sans ses mots de tête
+    ('définition de la photosynthèse' -> 'photosynthese')."""
+    words = normalize_title(query).split()
+    candidates = [' '.join(words)]
+    while len(words) > 1 and words[0] in QUERY_PREFIXES:
+        words.pop(0)
+    if ' '.join(words) != candidates[0]:
+        candidates.append(' '.join(words))
+    return candidates
+
+
+def _open_dump(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_abstracts_dump(path):
+    """(titre, url, abstract) d'un dump d'abstracts Wikipédia, en flux (mémoire constante)."""
+    with _open_dump(path) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event != 'end' or elem.tag != 'doc':
+                continue
+            title = TITLE_PREFIX.sub('', (elem.findtext('title') or '').strip())
+            url = (elem.findtext('url') or '').strip()
+            abstract = (elem.findtext('abstract') or '').strip()
+            root.clear()
+            if title and abstract and not abstract.startswith(MARKUP_PREFIXES):
+                yield title, url, abstract
+
+
+def build_index(entries, path):
+    """Écrit l'index à partir d'itérables (titre, url, abstract) ; renvoie le nombre de titres indexés."""
+    titles, norms, offsets, lengths = [], [], [], []
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.TemporaryFile(dir=directory) as records:
+        position = 0
+        seen = set()
+        for title, url, abstract in entries:
+            key = title.encode('utf-8')
+            if key in seen:
+                continue
+            seen.add(key)
+            record = FIELD_SEP.join((title, url, abstract.replace(FIELD_SEP, ' '))).encode('utf-8')
+            records.write(record)
+            titles.append(key)
+            norms.append(normalize_title(title).encode('utf-8'))
+            offsets.append(position)
+            lengths.append(len(record))
+            position += len(record)
+
+        order = sorted(range(len(titles)), key=titles.__getitem__)
+        # Un titre normalisé peut correspondre à plusieurs pages : la première dans l'ordre des titres l'emporte
+        norm_entries = []
+        for norm, rank in sorted((norms[i], rank) for rank, i in enumerate(order) if norms[i]):
+            if not norm_entries or norm_entries[-1][0] != norm:
+                norm_entries.append((norm, rank))
+
+        count, norm_count = len(order), len(norm_entries)
+        keys_off = HEADER.size + columns_size(COLUMNS, {'title': count, 'norm': norm_count})
+        columns = {name: array(code) for name, code, _ in COLUMNS}
+        cursor = keys_off
+        for i in order:
+            columns['title_key_off'].append(cursor)
+            columns['title_key_len'].append(len(titles[i]))
+            columns['rec_off'].append(offsets[i])
+            columns['rec_len'].append(lengths[i])
+            cursor += len(titles[i])
+        for norm, title_rank in norm_entries:
+            columns['norm_key_off'].append(cursor)
+            columns['norm_key_len'].append(len(norm))
+            columns['norm_title'].append(title_rank)
+            cursor += len(norm)
+        records_off = cursor
+        columns['rec_off'] = array('Q', (offset + records_off for offset in columns['rec_off']))
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, count, norm_count, keys_off, records_off))
+            write_columns(out, COLUMNS, columns)
+            for i in order:
+                out.write(titles[i])
+            for norm, _ in norm_entries:
+                out.write(norm)
+            records.seek(0)
+            shutil.copyfileobj(records, out, 1024 * 1024)
+        # Remplacement atomique : les workers qui ont déjà mappé l'ancien fichier le gardent jusqu'à réouverture
+        os.replace(tmp_path, path)
+    return count
+
+
+class AbstractIndex(MappedFile):
+    """Lecture d'un index construit par build_index : recherches dichotomiques dans le mmap, sans copie."""
+
+    def __init__(self, path):
+        super().__init__(path, HEADER, MAGIC)
+        _, count, norm_count, _, _ = self.header
+        for name, view in self.map_columns(COLUMNS, {'title': count, 'norm': norm_count}, HEADER.size).items():
+            setattr(self, f"_{name}", view)
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def record(self, rank):
+        title, url, abstract = self.bytes(self._rec_off[rank], self._rec_len[rank]).decode('utf-8').split(FIELD_SEP, 2)
+        return {'title': title, 'url': url, 'abstract': abstract}
+
+    def get(self, title):
+        """Fiche du titre exact, sinon du titre normalisé ; None si absent."""
+        rank = self.search(self._title_key_off, self._title_key_len, title.encode('utf-8'))
+        if rank is None:
+            rank = self.find(normalize_title(title))
+        return self.record(rank) if rank is not None else None
+
+    def find(self, normalized):
+        """Rang du titre normalisé dans la table des titres, ou None."""
+        rank = self.search(self._norm_key_off, self._norm_key_len, normalized.encode('utf-8'))
+        return self._norm_title[rank] if rank is not None else None
+
+
+class WikipediaLocal:
+    """Provider hors ligne : un index mappé par langue ({WIKI_LOCAL_INDEX_DIR}/{lang}.idx), ouvert à la demande
+    et rouvert quand le fichier est reconstruit (vérifié toutes les WIKI_LOCAL_CHECK_INTERVAL secondes).
+    """
+
+    DEFAULT_CHECK_INTERVAL = 60
+
+    _settings = {'enabled': False}
+    _indexes = {}
+    _checks = {}
+    _lock = threading.Lock()
+    _stats = {'lookups': 0, 'hits': 0, 'total_time': 0.0}
+
+    @classmethod
+    def init_app(cls, app):
+        cls._settings = {
+            'enabled': app.config.get('WIKI_LOCAL_ENABLED', True),
+            'index_dir': app.config.get('WIKI_LOCAL_INDEX_DIR', 'data/wikipedia'),
+            'check_interval': app.config.get('WIKI_LOCAL_CHECK_INTERVAL', cls.DEFAULT_CHECK_INTERVAL),
+        }
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            for index in cls._indexes.values():
+                if index is not None:
+                    index.close()
+            cls._indexes = {}
+            cls._checks = {}
+            cls._stats = {'lookups': 0, 'hits': 0, 'reloads': 0, 'total_time': 0.0}
+
+    @classmethod
+    def enabled(cls):
+        return cls._settings.get('enabled', False)
+
+    @classmethod
+    def index_path(cls, lang):
+        return os.path.join(cls._settings.get('index_dir', 'data/wikipedia'), f"{lang}.idx")
+
+    @classmethod
+    def _signature(cls, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def index(cls, lang):
+        """Index de la langue, ou None s'il n'a pas été construit.
+
+        Le fichier n'est consulté (stat) qu'une fois par check_interval : un index reconstruit (os.replace,
+        nouvel inode) est rouvert, l'ancien mapping reste lisible par les recherches en cours et se libère
+        avec sa dernière référence.
+        """
+        interval = cls._settings.get('check_interval', cls.DEFAULT_CHECK_INTERVAL)
+        checked = cls._checks.get(lang)
+        if checked is not None and time.monotonic() - checked[0] < interval:
+            return cls._indexes.get(lang)
+        with cls._lock:
+            now = time.monotonic()
+            checked = cls._checks.get(lang)
+            if checked is not None and now - checked[0] < interval:
+                return cls._indexes.get(lang)
+            path = cls.index_path(lang)
+            signature = cls._signature(path)
+            if checked is None or signature != checked[1]:
+                try:
+                    cls._indexes[lang] = AbstractIndex(path) if signature else None
+                except (OSError, ValueError):
+                    # Fichier illisible : l'index déjà ouvert reste servi, nouvel essai au prochain intervalle
+                    signature = checked[1] if checked is not None else None
+                else:
+                    if checked is not None:
+                        cls._stats['reloads'] += 1
+            cls._checks[lang] = (now, signature)
+            return cls._indexes.get(lang)
+
+    @classmethod
+    def lookup(cls, query, lang='fr'):
+        index = cls.index(lang) if cls.enabled() else None
+        if index is None:
+            return None
+        start = time.perf_counter()
+        record = None
+        for candidate in title_candidates(query):
+            rank = index.find(candidate)
+            if rank is not None:
+                record = index.record(rank)
+                break
+        with cls._lock:
+            cls._stats['lookups'] += 1
+            cls._stats['hits'] += 1 if record else 0
+            cls._stats['total_time'] += time.perf_counter() - start
+        return record
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            indexes = {lang: len(index) for lang, index in cls._indexes.items() if index is not None}
+        stats['avg_lookup_us'] = round(stats.pop('total_time') / stats['lookups'] * 1e6, 1) if stats['lookups'] else 0.0
+        stats['enabled'] = cls.enabled()
+        stats['indexes'] = indexes
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index local des résumés Wikipédia")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="construit l'index depuis un dump d'abstracts")
+    build.add_argument('--dump', required=True, help="*-abstract.xml, .xml.gz ou .xml.bz2")
+    build.add_argument('--lang', default='fr')
+    build.add_argument('--out', help="chemin de l'index (défaut : WIKI_LOCAL_INDEX_DIR/<lang>.idx)")
+    lookup = commands.add_parser('lookup', help="interroge un index")
+    lookup.add_argument('query')
+    lookup.add_argument('--lang', default='fr')
+    lookup.add_argument('--index', help="chemin de l'index (défaut : WIKI_LOCAL_INDEX_DIR/<lang>.idx)")
+    args = parser.parse_args(argv)
+
+    index_dir = os.environ.get('WIKI_LOCAL_INDEX_DIR', 'data/wikipedia')
+    if args.command == 'build':
+        out = args.out or os.path.join(index_dir, f"{args.lang}.idx")
+        start = time.perf_counter()
+        count = build_index(iter_abstracts_dump(args.dump), out)
+        print(f"✅ {count} résumés indexés dans {out} ({os.path.getsize(out) / 1024 / 1024:.1f} Mo, {time.perf_counter() - start:.1f}s)")
+        return
+
+    index = AbstractIndex(args.index or os.path.join(index_dir, f"{args.lang}.idx"))
+    start = time.perf_counter()
+    ranks = [rank for rank in map(index.find, title_candidates(args.query)) if rank is not None]
+    elapsed = (time.perf_counter() - start) * 1e6
+    if not ranks:
+        sys.exit(f"Aucun résumé pour '{args.query}' ({elapsed:.1f} µs)")
+    record = index.record(ranks[0])
+    print(f"{record['title']} — {record['url']} ({elapsed:.1f} µs)\n{record['abstract']}")
+
+
+if __name__ == '__main__':
+    main()
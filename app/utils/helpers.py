@@ -1,5 +1,5 @@
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 from datetime import datetime, timedelta
 from flask import current_app
 from app.models import User
@@ -36,7 +36,28 @@ def normalize_query(query):
     query = query.strip()
     query = re.sub(r'[^\w\s-]', '', query)
     query = re.sub(r'\s+', ' ', query)
-    return query.lower()
+    return query.strip().lower()
+
+# Only unambiguous trackers: 'ref' selects content on many sites (GitHub branches, docs versions)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ocid', 'ref_src'}
+
+def canonicalize_url(url):
+    """Canonical form of a URL: https, lowercase host without www/mobile label or default port, no fragment, tracking params and trailing slash"""
+    if not url:
+        return ''
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower().rsplit('@', 1)[-1]
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    labels = host.split('.')
+    # www.example.com, m.example.com, fr.m.wikipedia.org -> example.com, fr.wikipedia.org
+    host = '.'.join(label for i, label in enumerate(labels) if not (label in ('www', 'm', 'mobile') and len(labels) - i > 2))
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse(('https', host, path, '', urlencode(params), ''))
 
 def format_timestamp(timestamp):
     """Format timestamp for API responses"""
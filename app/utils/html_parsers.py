@@ -0,0 +1,196 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+def _class_xpath(tag, css_class, axis='.//'):
+    return f"{axis}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+
+def _lxml_text(element):
+    # Même rendu que get_text(strip=True) de BeautifulSoup : morceaux de texte nettoyés, sans séparateur
+    return ''.join(piece.strip() for piece in element.itertext()) if element is not None else ''
+
+
+def _has_class(css_class):
+    # Le SoupStrainer voit l'attribut class brut ("g tF2Cxc") pendant le parsing, pas la liste découpée
+    def match(value):
+        if not value:
+            return False
+        return css_class in (value.split() if isinstance(value, str) else value)
+    return match
+
+
+def _first(element, xpath):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+
+class ResultPageParser:
+    """Extraction des blocs de résultats Google / Bing avec un backend configurable (SCRAPE_PARSER).
+
+    - 'html.parser' : BeautifulSoup pur Python sur toute la page (historique)
+    - 'bs4-lxml'    : BeautifulSoup sur lxml, en ne construisant que les conteneurs de résultats (SoupStrainer)
+    - 'lxml'        : arbre lxml et XPath directs, sans objets BeautifulSoup
+    Chaque extraction renvoie des dicts {'title', 'href', 'snippet'}.
+    """
+
+    BACKENDS = ('html.parser', 'bs4-lxml', 'lxml')
+    DEFAULT_BACKEND = 'lxml' if lxml is not None else 'html.parser'
+
+    # (balise du conteneur, classe du conteneur, balise du titre, (balise, classe) du snippet)
+    LAYOUTS = {
+        'google': ('div', 'g', 'h3', ('div', 'IsZvec')),
+        'bing': ('li', 'b_algo', 'h2', ('p', None)),
+    }
+
+    _backend = DEFAULT_BACKEND
+
+    @classmethod
+    def init_app(cls, app):
+        cls.set_backend(app.config.get('SCRAPE_PARSER', cls.DEFAULT_BACKEND))
+
+    @classmethod
+    def set_backend(cls, backend):
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Parseur inconnu : {backend} (attendus : {', '.join(cls.BACKENDS)})")
+        if backend != 'html.parser' and lxml is None:
+            backend = 'html.parser'
+        cls._backend = backend
+
+    @classmethod
+    def backend(cls):
+        return cls._backend
+
+    @classmethod
+    def parse(cls, layout, html, limit, backend=None):
+        backend = backend or cls._backend
+        if backend == 'lxml':
+            return cls._parse_lxml(layout, html, limit)
+        return cls._parse_soup(layout, html, limit, strained=backend == 'bs4-lxml')
+
+    @classmethod
+    def incremental(cls, layout, limit, encoding=None, backend=None):
+        """Parseur à alimenter morceau par morceau (feed) ; feed renvoie True dès que limit résultats sont extraits."""
+        backend = backend or cls._backend
+        if backend == 'lxml':
+            return _LxmlIncrementalParser(cls.LAYOUTS[layout], limit, encoding)
+        return _BufferedParser(layout, limit, encoding, backend)
+
+    @classmethod
+    def _parse_soup(cls, layout, html, limit, strained=False):
+        container_tag, container_class, title_tag, (snippet_tag, snippet_class) = cls.LAYOUTS[layout]
+        if strained:
+            soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer(container_tag, class_=_has_class(container_class)))
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+
+        results = []
+        for block in soup.find_all(container_tag, class_=container_class):
+            title = block.find(title_tag)
+            link = block.find('a', href=True)
+            snippet = block.find(snippet_tag, class_=snippet_class) if snippet_class else block.find(snippet_tag)
+            if title and link:
+                results.append({
+                    'title': title.get_text(strip=True),
+                    'href': link['href'],
+                    'snippet': snippet.get_text(strip=True) if snippet else ''
+                })
+                if len(results) >= limit:
+                    break
+        return results
+
+    @classmethod
+    def _parse_lxml(cls, layout, html, limit):
+        container_tag, container_class, title_tag, (snippet_tag, snippet_class) = cls.LAYOUTS[layout]
+        if not html or not html.strip():
+            return []
+        tree = lxml.html.fromstring(html)
+
+        results = []
+        for block in tree.xpath(_class_xpath(container_tag, container_class, axis='//')):
+            result = _extract_lxml(block, title_tag, snippet_tag, snippet_class)
+            if result is None:
+                continue
+            results.append(result)
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _extract_lxml(block, title_tag, snippet_tag, snippet_class):
+    title = _first(block, f".//{title_tag}")
+    link = _first(block, ".//a[@href]")
+    if title is None or link is None:
+        return None
+    snippet_xpath = _class_xpath(snippet_tag, snippet_class) if snippet_class else f".//{snippet_tag}"
+    return {
+        'title': _lxml_text(title),
+        'href': link.get('href'),
+        'snippet': _lxml_text(_first(block, snippet_xpath))
+    }
+
+
+class _LxmlIncrementalParser:
+    """Parseur lxml en flux : chaque conteneur est extrait à sa balise fermante, puis vidé de l'arbre."""
+
+    def __init__(self, layout, limit, encoding=None):
+        self.container_tag, self.container_class, self.title_tag, (self.snippet_tag, self.snippet_class) = layout
+        self.limit = limit
+        self.results = []
+        # Sans charset annoncé libxml2 supposerait du latin-1 : Google et Bing servent de l'UTF-8
+        self._parser = lxml.etree.HTMLPullParser(events=('end',), tag=self.container_tag, encoding=encoding or 'utf-8')
+
+    def _is_container(self, element):
+        return self.container_class in (element.get('class') or '').split()
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def _drain(self):
+        for _, element in self._parser.read_events():
+            if len(self.results) >= self.limit or not self._is_container(element):
+                continue
+            result = _extract_lxml(element, self.title_tag, self.snippet_tag, self.snippet_class)
+            if result is not None:
+                self.results.append(result)
+            # Un conteneur imbriqué dans un autre doit rester lisible quand le parent se fermera
+            if not any(self._is_container(parent) for parent in element.iterancestors(self.container_tag)):
+                element.clear(keep_tail=True)
+        return len(self.results) >= self.limit
+
+    def close(self):
+        if len(self.results) < self.limit:
+            try:
+                self._parser.close()
+            except lxml.etree.XMLSyntaxError:
+                # Page vide ou coupée au plafond d'octets : on garde ce qui a déjà été extrait
+                pass
+            self._drain()
+        return self.results
+
+
+class _BufferedParser:
+    """Backends BeautifulSoup : pas de parsing incrémental, la page (plafonnée) est parsée à la fin."""
+
+    def __init__(self, layout, limit, encoding, backend):
+        self.layout = layout
+        self.limit = limit
+        self.encoding = encoding
+        self.backend = backend
+        self._chunks = []
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        return False
+
+    def close(self):
+        html = b''.join(self._chunks)
+        if self.encoding:
+            html = html.decode(self.encoding, errors='replace')
+        return ResultPageParser.parse(self.layout, html, self.limit, backend=self.backend)
@@ -0,0 +1,338 @@
+import calendar
+import email.utils
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Statuts stockables sans directive explicite (RFC 9111 §4.2.2 : « heuristically cacheable »)
+CACHEABLE_STATUSES = {200, 203, 300, 301, 308, 404, 410}
+# Le corps est stocké décodé : ces en-têtes ne le décrivent plus
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+
+
+def parse_cache_control(value):
+    """'max-age=300, no-cache' -> {'max-age': '300', 'no-cache': None}"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _http_date(value):
+    parsed = email.utils.parsedate_tz(value) if value else None
+    return calendar.timegm(parsed[:9]) - (parsed[9] or 0) if parsed else None
+
+
+def _seconds(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class _PrefixedRaw(io.RawIOBase):
+    """Flux brut : les octets déjà lus, puis le reste de la réponse (décodé comme iter_content)."""
+
+    def __init__(self, prefix, rest):
+        super().__init__()
+        self._prefix = io.BytesIO(prefix)
+        self._rest = rest
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._prefix.read(size)
+        if data:
+            return data
+        size = size if size and size > 0 else None
+        # Réponse urllib3 : décodage gzip comme iter_content ; flux déjà décodé (rejeu) sinon
+        if hasattr(self._rest, 'stream'):
+            return self._rest.read(size, decode_content=True) or b''
+        return self._rest.read(size) or b''
+
+    def close(self):
+        self._rest.close()
+        super().close()
+
+
+class HttpCache:
+    """Cache HTTP privé sur disque (RFC 9111) : fraîcheur max-age / Expires / heuristique, revalidation
+    conditionnelle (If-None-Match, If-Modified-Since), Vary, taille totale plafonnée (LRU par date d'accès).
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_entry_bytes=1024 * 1024, heuristic_max_age=86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.heuristic_max_age = heuristic_max_age
+        self._size = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'not_stored': 0, 'evictions': 0}
+
+    def count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(f"GET {url}".encode('utf-8')).hexdigest()
+
+    def _paths(self, url):
+        key = self.key(url)
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.body"
+
+    def load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['content'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def touch(self, url):
+        _, body_path = self._paths(url)
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def store(self, url, status, reason, headers, content, request_headers):
+        vary = headers.get('Vary', '')
+        entry = {
+            'url': url,
+            'status': status,
+            'reason': reason,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+            'stored_at': time.time(),
+            'vary': {name.strip().lower(): request_headers.get(name.strip()) for name in vary.split(',') if name.strip()},
+        }
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + suffix, 'wb') as f:
+            f.write(content)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+        self.count('stores')
+        self._grow(len(content))
+
+    def refresh(self, url, entry, headers):
+        """Après un 304 : en-têtes de la réponse fraîche fusionnés, âge remis à zéro (RFC 9111 §4.3.4)."""
+        entry = dict(entry)
+        content = entry.pop('content')
+        merged = CaseInsensitiveDict(entry['headers'])
+        merged.update({k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS})
+        entry['headers'] = dict(merged)
+        entry['stored_at'] = time.time()
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+        self.touch(url)
+        return {**entry, 'content': content}
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.body'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _grow(self, added):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+            # Plusieurs workers partagent le dossier : on repart de l'état réel du disque avant d'évincer
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            self._size = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            for body_path, size, _ in entries:
+                if self._size <= target:
+                    break
+                for path in (body_path, body_path[:-len('.body')] + '.json'):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._size -= size
+                self._stats['evictions'] += 1
+
+    # --- Règles de fraîcheur (RFC 9111 §4.2) ---
+
+    def freshness_lifetime(self, entry):
+        headers = CaseInsensitiveDict(entry['headers'])
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        max_age = _seconds(directives.get('max-age'))
+        if max_age is not None:
+            return max_age
+        date = _http_date(headers.get('Date')) or entry['stored_at']
+        expires = headers.get('Expires')
+        if expires is not None:
+            expires_at = _http_date(expires)
+            return max(expires_at - date, 0) if expires_at else 0
+        last_modified = _http_date(headers.get('Last-Modified'))
+        if last_modified and entry['status'] in CACHEABLE_STATUSES:
+            return min(max((date - last_modified) * 0.1, 0), self.heuristic_max_age)
+        return 0
+
+    def current_age(self, entry, now=None):
+        headers = CaseInsensitiveDict(entry['headers'])
+        now = time.time() if now is None else now
+        date = _http_date(headers.get('Date'))
+        apparent_age = max(entry['stored_at'] - date, 0) if date else 0
+        initial_age = max(apparent_age, _seconds(headers.get('Age')) or 0)
+        return initial_age + max(now - entry['stored_at'], 0)
+
+    def is_fresh(self, entry, request_directives):
+        response_directives = parse_cache_control(CaseInsensitiveDict(entry['headers']).get('Cache-Control'))
+        if 'no-cache' in response_directives or 'no-cache' in request_directives:
+            return False
+        lifetime = self.freshness_lifetime(entry)
+        request_max_age = _seconds(request_directives.get('max-age'))
+        if request_max_age is not None:
+            lifetime = min(lifetime, request_max_age)
+        return self.current_age(entry) < lifetime
+
+    def is_storable(self, status, headers):
+        if status not in CACHEABLE_STATUSES:
+            return False
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+            return False
+        # Sans durée de vie ni validateur, l'entrée ne servirait jamais
+        return bool(
+            'max-age' in directives or headers.get('Expires') or headers.get('ETag') or headers.get('Last-Modified')
+        )
+
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, 'bytes': self._size, 'max_bytes': self.max_bytes}
+
+
+class CachingAdapter(BaseAdapter):
+    """Transport qui place HttpCache devant inner pour les hôtes listés (suffixes : 'wikipedia.org')."""
+
+    def __init__(self, cache, inner, hosts):
+        super().__init__()
+        self.cache = cache
+        self.inner = inner
+        self.hosts = tuple(host.lower() for host in hosts)
+
+    def _in_scope(self, request):
+        host = (urlparse(request.url).hostname or '').lower()
+        return request.method == 'GET' and any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def _build_response(self, request, entry, age=None):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason', '')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        if age is not None:
+            response.headers['Age'] = str(int(age))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(entry['content'])
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def _vary_matches(entry, request):
+        return all(request.headers.get(name) == value for name, value in entry.get('vary', {}).items())
+
+    def send(self, request, **kwargs):
+        if not self._in_scope(request):
+            return self.inner.send(request, **kwargs)
+
+        request_directives = parse_cache_control(request.headers.get('Cache-Control'))
+        if 'no-store' in request_directives:
+            return self.inner.send(request, **kwargs)
+
+        entry = self.cache.load(request.url)
+        if entry is not None and not self._vary_matches(entry, request):
+            entry = None
+        if entry is not None and self.cache.is_fresh(entry, request_directives):
+            self.cache.count('hits')
+            self.cache.touch(request.url)
+            return self._build_response(request, entry, age=self.cache.current_age(entry))
+
+        if entry is not None:
+            headers = CaseInsensitiveDict(entry['headers'])
+            if headers.get('ETag'):
+                request.headers['If-None-Match'] = headers['ETag']
+            if headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+
+        response = self.inner.send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.count('revalidated')
+            response.close()
+            return self._build_response(request, self.cache.refresh(request.url, entry, response.headers), age=0)
+
+        self.cache.count('misses')
+        if not self.cache.is_storable(response.status_code, response.headers):
+            self.cache.count('not_stored')
+            return response
+        return self._store(request, response)
+
+    def _store(self, request, response):
+        length = _seconds(response.headers.get('Content-Length'))
+        if length is not None and length > self.cache.max_entry_bytes:
+            self.cache.count('not_stored')
+            return response
+
+        # Lecture bornée : au-delà de max_entry_bytes, la réponse est rendue intacte sans être stockée
+        chunks, size = [], 0
+        iterator = response.iter_content(64 * 1024)
+        for chunk in iterator:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.cache.max_entry_bytes:
+                self.cache.count('not_stored')
+                response.raw = _PrefixedRaw(b''.join(chunks), response.raw)
+                response._content_consumed = False
+                return response
+
+        content = b''.join(chunks)
+        self.cache.store(request.url, response.status_code, response.reason or '', response.headers, content, request.headers)
+        response.close()
+        return self._build_response(request, {
+            'status': response.status_code,
+            'reason': response.reason or '',
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            'content': content
+        })
+
+    def close(self):
+        self.inner.close()
+
+    def get_stats(self):
+        return self.cache.get_stats()
@@ -0,0 +1,298 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.utils.http_cache import CachingAdapter, HttpCache
+from app.utils.http_replay import transport_from_config
+
+
+class StreamedBody:
+    """Corps d'une réponse lu morceau par morceau, plafonné à max_bytes.
+
+    Le consommateur peut sortir de la boucle dès qu'il a ce qu'il lui faut : le reste n'est jamais lu.
+    """
+
+    def __init__(self, response, max_bytes, chunk_size):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.complete = False
+        self.truncated = False
+
+    @property
+    def encoding(self):
+        # Seulement un charset annoncé : sans lui requests supposerait ISO-8859-1, le parseur choisit lui-même
+        return self.response.encoding if 'charset' in self.response.headers.get('Content-Type', '').lower() else None
+
+    def __iter__(self):
+        for chunk in self.response.iter_content(self.chunk_size):
+            remaining = self.max_bytes - self.bytes_read
+            if len(chunk) > remaining:
+                self.truncated = True
+                chunk = chunk[:remaining]
+            self.bytes_read += len(chunk)
+            if chunk:
+                yield chunk
+            if self.truncated:
+                return
+        self.complete = True
+
+    def read(self):
+        return b''.join(self)
+
+
+class HttpClient:
+    """Client HTTP partagé par les providers : pools keep-alive par hôte, thread-safe."""
+
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 20
+    DEFAULT_POOL_BLOCK = False
+    DEFAULT_CONNECT_TIMEOUT = 3.05
+    DEFAULT_READ_TIMEOUT = 10
+    DEFAULT_MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+    DEFAULT_STREAM_CHUNK_SIZE = 16 * 1024
+    # Réponses qui signalent un provider en difficulté (blocage, quota, panne), à la différence d'un 404
+    FAILURE_STATUSES = {403, 429}
+
+    _settings = {}
+    _session = None
+    _adapter = None
+    _transport = None
+    _transport_factory = None
+    _http_cache = None
+    _pid = None
+    _lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _host_stats = {}
+    _download_stats = {}
+    _local = threading.local()
+
+    @classmethod
+    def init_app(cls, app):
+        """Lit la configuration du pool une fois pour toutes (les threads des providers n'ont pas de contexte Flask)."""
+        cls._settings = {
+            'pool_connections': app.config.get('HTTP_POOL_CONNECTIONS', cls.DEFAULT_POOL_CONNECTIONS),
+            'pool_maxsize': app.config.get('HTTP_POOL_MAXSIZE', cls.DEFAULT_POOL_MAXSIZE),
+            'pool_block': app.config.get('HTTP_POOL_BLOCK', cls.DEFAULT_POOL_BLOCK),
+            'connect_timeout': app.config.get('HTTP_CONNECT_TIMEOUT', cls.DEFAULT_CONNECT_TIMEOUT),
+            'read_timeout': app.config.get('SCRAPE_TIMEOUT', cls.DEFAULT_READ_TIMEOUT),
+            'max_response_bytes': app.config.get('HTTP_MAX_RESPONSE_BYTES', cls.DEFAULT_MAX_RESPONSE_BYTES),
+            'stream_chunk_size': app.config.get('HTTP_STREAM_CHUNK_SIZE', cls.DEFAULT_STREAM_CHUNK_SIZE),
+        }
+        # Enregistrement / rejeu des échanges (HTTP_TRANSPORT) : benchmarks et tests hors ligne reproductibles.
+        # Construit dans chaque processus avec sa session : un worker ne partage pas le pool de son parent
+        cls._transport = None
+        cls._transport_factory = partial(
+            transport_from_config,
+            app.config,
+            pool_connections=cls._settings['pool_connections'],
+            pool_maxsize=cls._settings['pool_maxsize'],
+            pool_block=cls._settings['pool_block'],
+            max_retries=0
+        )
+        # Cache HTTP sur disque devant les API JSON peu changeantes (Wikipedia, DuckDuckGo)
+        cls._http_cache = None
+        if app.config.get('HTTP_CACHE_ENABLED', False):
+            cls._http_cache = HttpCache(
+                app.config.get('HTTP_CACHE_DIR', 'cache/http'),
+                max_bytes=app.config.get('HTTP_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+                max_entry_bytes=app.config.get('HTTP_CACHE_MAX_ENTRY_BYTES', 1024 * 1024),
+                heuristic_max_age=app.config.get('HTTP_CACHE_HEURISTIC_MAX_AGE', 86400)
+            )
+        hosts = app.config.get('HTTP_CACHE_HOSTS', '')
+        cls._settings['cache_hosts'] = [h.strip() for h in hosts.split(',') if h.strip()] if isinstance(hosts, str) else list(hosts)
+        cls.reset()
+
+    @classmethod
+    def _setting(cls, key, default):
+        return cls._settings.get(key, default)
+
+    @classmethod
+    def _build_session(cls):
+        session = requests.Session()
+        if cls._transport_factory is not None:
+            cls._transport = cls._transport_factory()
+        adapter = cls._transport or HTTPAdapter(
+            pool_connections=cls._setting('pool_connections', cls.DEFAULT_POOL_CONNECTIONS),
+            pool_maxsize=cls._setting('pool_maxsize', cls.DEFAULT_POOL_MAXSIZE),
+            pool_block=cls._setting('pool_block', cls.DEFAULT_POOL_BLOCK),
+            max_retries=0
+        )
+        if cls._http_cache is not None:
+            adapter = CachingAdapter(cls._http_cache, adapter, cls._setting('cache_hosts', []))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session, adapter
+
+    @classmethod
+    def get_session(cls):
+        # Une session par processus : après un fork (workers gunicorn) les sockets du parent ne sont pas réutilisés
+        pid = os.getpid()
+        if cls._session is None or cls._pid != pid:
+            with cls._lock:
+                if cls._session is None or cls._pid != pid:
+                    cls._session, cls._adapter = cls._build_session()
+                    cls._pid = pid
+                    with cls._stats_lock:
+                        cls._host_stats = {}
+                        cls._download_stats = {}
+        return cls._session
+
+    @classmethod
+    def use_transport(cls, transport):
+        """Remplace le transport des sessions (RecordingAdapter, ReplayAdapter ; None pour revenir au réseau)."""
+        cls._transport = transport
+        cls._transport_factory = None
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        """Ferme les connexions du pool courant (tests, rechargement de config)."""
+        with cls._lock:
+            if cls._session is not None and cls._pid == os.getpid():
+                cls._session.close()
+            cls._session = None
+            cls._adapter = None
+            cls._pid = None
+        with cls._stats_lock:
+            cls._host_stats = {}
+            cls._download_stats = {}
+
+    @classmethod
+    def default_timeout(cls):
+        return (
+            cls._setting('connect_timeout', cls.DEFAULT_CONNECT_TIMEOUT),
+            cls._setting('read_timeout', cls.DEFAULT_READ_TIMEOUT)
+        )
+
+    @classmethod
+    def _record(cls, host, elapsed, error=False):
+        with cls._stats_lock:
+            stats = cls._host_stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_time': 0.0})
+            stats['requests'] += 1
+            stats['total_time'] += elapsed
+            if error:
+                stats['errors'] += 1
+
+    @classmethod
+    def request(cls, method, url, **kwargs):
+        kwargs.setdefault('timeout', cls.default_timeout())
+        host = urlparse(url).netloc
+        session = cls.get_session()
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            cls._record(host, time.perf_counter() - start, error=True)
+            cls._local.failures = cls.failure_count() + 1
+            raise
+        cls._record(host, time.perf_counter() - start)
+        if response.status_code in cls.FAILURE_STATUSES or response.status_code >= 500:
+            cls._local.failures = cls.failure_count() + 1
+        return response
+
+    @classmethod
+    def reset_failures(cls):
+        """Remet à zéro le compteur d'échecs du thread courant (avant un appel de provider)."""
+        cls._local.failures = 0
+
+    @classmethod
+    def failure_count(cls):
+        """Échecs (exceptions, 403/429/5xx) du thread courant depuis reset_failures()."""
+        return getattr(cls._local, 'failures', 0)
+
+    @classmethod
+    def get(cls, url, **kwargs):
+        return cls.request('GET', url, **kwargs)
+
+    @classmethod
+    @contextmanager
+    def stream(cls, url, provider=None, max_bytes=None, **kwargs):
+        """GET en streaming : produit un StreamedBody plafonné à HTTP_MAX_RESPONSE_BYTES.
+
+        Les octets lus, les arrêts anticipés (le consommateur a eu ce qu'il voulait) et les coupures
+        au plafond sont comptés par provider (l'hôte à défaut).
+        """
+        response = cls.request('GET', url, stream=True, **kwargs)
+        body = StreamedBody(
+            response,
+            max_bytes or cls._setting('max_response_bytes', cls.DEFAULT_MAX_RESPONSE_BYTES),
+            cls._setting('stream_chunk_size', cls.DEFAULT_STREAM_CHUNK_SIZE)
+        )
+        try:
+            yield body
+        finally:
+            # Une lecture interrompue ferme la connexion au lieu de la rendre au pool : c'est le prix de l'arrêt anticipé
+            response.close()
+            cls._record_download(provider or urlparse(url).netloc, body)
+
+    @classmethod
+    def fetch(cls, url, provider=None, max_bytes=None, **kwargs):
+        """GET dont le corps est lu en streaming et plafonné ; .json() / .text restent utilisables."""
+        with cls.stream(url, provider=provider, max_bytes=max_bytes, **kwargs) as body:
+            content = body.read()
+        # Corps déjà consommé : on le rend à la réponse comme l'aurait fait une lecture normale
+        body.response._content = content
+        return body.response
+
+    @classmethod
+    def _record_download(cls, name, body):
+        with cls._stats_lock:
+            stats = cls._download_stats.setdefault(name, {'requests': 0, 'bytes_read': 0, 'early_stops': 0, 'truncated': 0})
+            stats['requests'] += 1
+            stats['bytes_read'] += body.bytes_read
+            if body.truncated:
+                stats['truncated'] += 1
+            elif not body.complete:
+                stats['early_stops'] += 1
+
+    @classmethod
+    def get_stats(cls):
+        """Statistiques d'utilisation des pools : requêtes, connexions ouvertes, réutilisation par hôte."""
+        with cls._stats_lock:
+            hosts = {host: dict(values) for host, values in cls._host_stats.items()}
+            downloads = {name: dict(values) for name, values in cls._download_stats.items()}
+
+        adapter = cls._adapter
+        # Cache et enregistreur délèguent au vrai pool (inner) ; le rejoueur n'en a pas
+        while adapter is not None and not hasattr(adapter, 'poolmanager'):
+            adapter = getattr(adapter, 'inner', None)
+        pool_manager = adapter.poolmanager if adapter is not None else None
+        if pool_manager is not None and cls._pid == os.getpid():
+            pools = pool_manager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+                entry = hosts.setdefault(host, {'requests': 0, 'errors': 0, 'total_time': 0.0})
+                entry['connections_opened'] = pool.num_connections
+                entry['pool_requests'] = pool.num_requests
+                # La file du pool est pré-remplie de None : seules les vraies connexions sont au repos
+                entry['idle_connections'] = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+                entry['reuse_ratio'] = round(1 - pool.num_connections / pool.num_requests, 3) if pool.num_requests else 0.0
+
+        for entry in hosts.values():
+            entry['avg_time'] = round(entry['total_time'] / entry['requests'], 4) if entry['requests'] else 0.0
+            entry['total_time'] = round(entry['total_time'], 4)
+
+        for entry in downloads.values():
+            entry['avg_bytes'] = round(entry['bytes_read'] / entry['requests']) if entry['requests'] else 0
+
+        return {
+            'pool_connections': cls._setting('pool_connections', cls.DEFAULT_POOL_CONNECTIONS),
+            'pool_maxsize': cls._setting('pool_maxsize', cls.DEFAULT_POOL_MAXSIZE),
+            'max_response_bytes': cls._setting('max_response_bytes', cls.DEFAULT_MAX_RESPONSE_BYTES),
+            'transport': cls._transport.get_stats() if cls._transport is not None else {'mode': 'live'},
+            'http_cache': cls._http_cache.get_stats() if cls._http_cache is not None else None,
+            'hosts': hosts,
+            'downloads': downloads
+        }
@@ -0,0 +1,208 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Paramètres jamais écrits dans les fixtures ni pris en compte dans leur clé (clés d'API)
+SECRET_PARAMS = {'token', 'key', 'apikey', 'api_key', 'access_token'}
+# Le corps est stocké décodé : ces en-têtes ne le décrivent plus
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'set-cookie', 'connection'}
+
+
+def redact_url(url):
+    parsed = urlparse(url)
+    params = [(k, 'REDACTED' if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+    return urlunparse(parsed._replace(query=urlencode(sorted(params))))
+
+
+class FixtureStore:
+    """Échanges HTTP enregistrés : un fichier JSON par (méthode, URL sans secrets), rangé par hôte."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url):
+        return hashlib.sha1(f"{method.upper()} {redact_url(url)}".encode('utf-8')).hexdigest()
+
+    def _path(self, method, url):
+        host = urlparse(url).netloc or 'unknown'
+        return os.path.join(self.directory, host, f"{self.key(method, url)}.json")
+
+    def load(self, method, url):
+        path = self._path(method, url)
+        with self._lock:
+            if path in self._cache:
+                return self._cache[path]
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            fixture = json.load(f)
+        if 'body_b64' in fixture:
+            fixture['content'] = base64.b64decode(fixture.pop('body_b64'))
+        else:
+            fixture['content'] = fixture.pop('body', '').encode('utf-8')
+        with self._lock:
+            self._cache[path] = fixture
+        return fixture
+
+    def save(self, method, url, status, headers, content, reason=''):
+        fixture = {
+            'method': method.upper(),
+            'url': redact_url(url),
+            'status': status,
+            'reason': reason,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+        }
+        try:
+            fixture['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            fixture['body_b64'] = base64.b64encode(content).decode('ascii')
+
+        path = self._path(method, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._cache.pop(path, None)
+
+    def __len__(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(len([f for f in files if f.endswith('.json')]) for _, _, files in os.walk(self.directory))
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport qui laisse passer les requêtes (vers inner, HTTPAdapter par défaut) et enregistre chaque réponse."""
+
+    def __init__(self, store, inner=None, **adapter_kwargs):
+        super().__init__()
+        self.store = store
+        self.inner = inner or HTTPAdapter(**adapter_kwargs)
+        self.recorded = 0
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        # Lecture complète : en enregistrement la réponse entière fait la fixture, le plafond s'applique ensuite
+        content = response.content
+        self.store.save(request.method, request.url, response.status_code, response.headers, content, response.reason or '')
+        self.recorded += 1
+        return response
+
+    def close(self):
+        self.inner.close()
+
+    def get_stats(self):
+        return {'mode': 'record', 'recorded': self.recorded}
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport qui sert les fixtures enregistrées, avec latence et pannes injectées (graine fixe possible).
+
+    latency : secondes, ou dict {hôte: secondes} avec '*' par défaut ; jitter : +/- uniforme en secondes.
+    failure_rate : proportion de requêtes en échec, en erreur de connexion (failure_status=None) ou avec ce statut.
+    Une requête sans fixture lève une ConnectionError, comme un provider injoignable.
+    """
+
+    def __init__(self, store, latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=None, seed=None):
+        super().__init__()
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {'served': 0, 'missing': 0, 'injected_failures': 0, 'timeouts': 0}
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _delay(self, host):
+        latency = self.latency.get(host, self.latency.get('*', 0.0)) if isinstance(self.latency, dict) else self.latency
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            failed = self.failure_rate and self._rng.random() < self.failure_rate
+        return max(latency + jitter, 0.0), failed
+
+    @staticmethod
+    def _read_timeout(timeout):
+        return timeout[1] if isinstance(timeout, tuple) else timeout
+
+    def _build_response(self, request, status, headers, content, reason=''):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(content)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        delay, failed = self._delay(urlparse(request.url).netloc)
+        read_timeout = self._read_timeout(timeout)
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            self._count('timeouts')
+            raise requests.ReadTimeout(f"replay : latence injectée {delay:.2f}s > timeout {read_timeout}s", request=request)
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            self._count('injected_failures')
+            if self.failure_status is None:
+                raise requests.ConnectionError("replay : panne injectée", request=request)
+            return self._build_response(request, self.failure_status, {}, b'', 'Injected failure')
+
+        fixture = self.store.load(request.method, request.url)
+        if fixture is None:
+            self._count('missing')
+            raise requests.ConnectionError(f"replay : aucune fixture pour {request.method} {redact_url(request.url)}", request=request)
+        self._count('served')
+        return self._build_response(request, fixture['status'], fixture['headers'], fixture['content'], fixture.get('reason', ''))
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        with self._lock:
+            return {'mode': 'replay', **self._stats}
+
+
+def transport_from_config(config, **adapter_kwargs):
+    """Transport HTTP selon HTTP_TRANSPORT : None en 'live', enregistreur ou rejoueur sur HTTP_FIXTURES_DIR sinon."""
+    mode = config.get('HTTP_TRANSPORT', 'live')
+    if mode == 'live':
+        return None
+    store = FixtureStore(config.get('HTTP_FIXTURES_DIR', 'fixtures/http'))
+    if mode == 'record':
+        return RecordingAdapter(store, **adapter_kwargs)
+    if mode == 'replay':
+        failure_status = config.get('HTTP_REPLAY_FAILURE_STATUS', 0)
+        return ReplayAdapter(
+            store,
+            latency=config.get('HTTP_REPLAY_LATENCY', 0.0),
+            jitter=config.get('HTTP_REPLAY_JITTER', 0.0),
+            failure_rate=config.get('HTTP_REPLAY_FAILURE_RATE', 0.0),
+            failure_status=failure_status or None,
+            seed=config.get('HTTP_REPLAY_SEED')
+        )
+    raise ValueError(f"HTTP_TRANSPORT inconnu : {mode} (attendus : live, record, replay)")
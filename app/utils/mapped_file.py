@@ -0,0 +1,75 @@
+import mmap
+import sys
+from array import array
+
+
+def columns_size(spec, counts):
+    """Taille en octets des colonnes spec ((nom, code array, table), ...) pour {table: nombre de lignes}."""
+    return sum(array(code).itemsize * counts[table] for _, code, table in spec)
+
+
+def write_columns(out, spec, columns):
+    """Écrit les colonnes (arrays) dans l'ordre de spec, en petit-boutiste."""
+    for name, code, _ in spec:
+        column = columns[name] if isinstance(columns[name], array) else array(code, columns[name])
+        if sys.byteorder != 'little':
+            column = array(code, column)
+            column.byteswap()
+        out.write(column.tobytes())
+
+
+class MappedFile:
+    """Fichier binaire en lecture seule mappé en mémoire : en-tête struct, colonnes d'entiers lues en place
+    (memoryview typée, sans copie), blobs d'octets. Les pages sont partagées entre processus par le cache système.
+    """
+
+    def __init__(self, path, header, magic):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        self.header = header.unpack_from(self._mm, 0)
+        if self.header[0] != magic or sys.byteorder != 'little':
+            self._mm.close()
+            raise ValueError(f"{path} : format non reconnu ou illisible sur cette plateforme")
+
+    def map_columns(self, spec, counts, offset):
+        """{nom: memoryview} des colonnes de spec, consécutives à partir d'offset."""
+        views = {}
+        for name, code, table in spec:
+            size = array(code).itemsize * counts[table]
+            views[name] = self.view(offset, size, code)
+            offset += size
+        return views
+
+    def view(self, offset, size, code):
+        view = memoryview(self._mm)[offset:offset + size].cast(code)
+        self._views.append(view)
+        return view
+
+    def bytes(self, start, length):
+        return self._mm[start:start + length]
+
+    def search(self, key_offs, key_lens, key):
+        """Indice de key dans la table de clés triées (offsets, longueurs), ou None : dichotomie dans le mmap."""
+        mm = self._mm
+        lo, hi = 0, len(key_offs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = key_offs[mid]
+            if mm[start:start + key_lens[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(key_offs):
+            start = key_offs[lo]
+            if mm[start:start + key_lens[lo]] == key:
+                return lo
+        return None
+
+    def close(self):
+        # Les memoryviews exportent le buffer du mmap : elles sont libérées avant la fermeture
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mm.close()
@@ -0,0 +1,95 @@
+import os
+import threading
+
+import torch
+
+
+class TorchRuntime:
+    """Réglages d'inférence CPU : nombre de threads torch par worker et quantification int8 dynamique."""
+
+    PRECISIONS = ('fp32', 'int8')
+
+    _settings = {'precision': 'fp32', 'intra_op_threads': 0, 'inter_op_threads': 0}
+    _configured_pid = None
+    _lock = threading.Lock()
+    _logger = None
+
+    @classmethod
+    def init_app(cls, app):
+        precision = str(app.config.get('INFERENCE_PRECISION', 'fp32')).lower()
+        if precision not in cls.PRECISIONS:
+            app.logger.warning(f"⚠️ INFERENCE_PRECISION inconnue '{precision}', repli sur fp32")
+            precision = 'fp32'
+        cls._settings = {
+            'precision': precision,
+            'intra_op_threads': app.config.get('TORCH_INTRA_OP_THREADS', 0),
+            'inter_op_threads': app.config.get('TORCH_INTER_OP_THREADS', 0),
+        }
+        cls._logger = app.logger
+        cls._configured_pid = None
+        cls.configure_threads()
+
+    @classmethod
+    def _log(cls, msg, level='info'):
+        if cls._logger:
+            getattr(cls._logger, level)(msg)
+        else:
+            print(msg)
+
+    @classmethod
+    def precision(cls):
+        return cls._settings.get('precision', 'fp32')
+
+    @classmethod
+    def configure_threads(cls):
+        """Applique les nombres de threads une fois par processus (chaque worker gunicorn a ses propres pools)."""
+        pid = os.getpid()
+        if cls._configured_pid == pid:
+            return
+        with cls._lock:
+            if cls._configured_pid == pid:
+                return
+            intra = cls._settings.get('intra_op_threads', 0)
+            inter = cls._settings.get('inter_op_threads', 0)
+            if intra:
+                torch.set_num_threads(intra)
+            if inter:
+                try:
+                    torch.set_num_interop_threads(inter)
+                except RuntimeError as e:
+                    # Non modifiable une fois qu'un travail parallèle a démarré dans le processus
+                    cls._log(f"⚠️ Threads inter-op non modifiables : {e}", 'warning')
+            cls._configured_pid = pid
+
+    @classmethod
+    def optimize(cls, model, precision=None):
+        """Quantifie en int8 les couches Linear d'un modèle, d'un pipeline ou d'un tuple (tokenizer, modèle)."""
+        precision = precision or cls.precision()
+        if precision != 'int8' or model is None:
+            return model
+        if isinstance(model, (tuple, list)):
+            return type(model)(cls.optimize(m, precision) for m in model)
+        if isinstance(model, torch.nn.Module):
+            return _quantize_module(model)
+        if isinstance(getattr(model, 'model', None), torch.nn.Module):
+            # Pipeline transformers : le modèle est quantifié sur place
+            model.model = _quantize_module(model.model)
+        return model
+
+    @classmethod
+    def get_stats(cls):
+        return {
+            'precision': cls.precision(),
+            'intra_op_threads': torch.get_num_threads(),
+            'inter_op_threads': torch.get_num_interop_threads(),
+            'quantized_engine': torch.backends.quantized.engine,
+        }
+
+
+def _quantize_module(module):
+    device = next(module.parameters(), torch.empty(0)).device
+    if device.type != 'cpu':
+        # La quantification dynamique ne concerne que l'inférence CPU
+        return module
+    quantize_dynamic = getattr(torch, 'ao', torch).quantization.quantize_dynamic
+    return quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
@@ -0,0 +1,100 @@
+"""Compare la latence par requête de l'enrichissement unitaire (historique) et batché.
+
+Usage : python -m benchmarks.bench_enrichment [--sizes 10 20 50] [--repeat 3] [--legacy-sleep]
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sentence_transformers import util
+
+from app.services.ai_service import AIService
+from app.services.model_registry import ModelRegistry
+
+SNIPPETS = [
+    "L'intelligence artificielle désigne l'ensemble des techniques permettant à des machines d'imiter une forme d'intelligence réelle.",
+    "Le football est un sport collectif qui se joue avec un ballon sphérique entre deux équipes de onze joueurs.",
+    "La photosynthèse est le processus bioénergétique qui permet aux plantes de synthétiser de la matière organique en utilisant la lumière du soleil.",
+    "Python is a high-level, general-purpose programming language whose design philosophy emphasizes code readability.",
+    "Le Cameroun est un pays d'Afrique centrale, situé entre le Nigeria au nord-ouest et la Guinée équatoriale au sud.",
+]
+
+
+def make_results(n):
+    return [
+        {
+            'title': f'Résultat {i}',
+            'url': f'https://example.com/{i}',
+            'snippet': SNIPPETS[i % len(SNIPPETS)] + f" Document numéro {i}.",
+            'source': 'bench',
+            'language': 'fr'
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_enrich(query, results, sleep=False):
+    """Boucle historique : requête ré-encodée, résumé et embedding un par un, topics en O(n²)."""
+    summarizer = ModelRegistry.get('summarizer')
+    similarity_model = ModelRegistry.get('similarity')
+    enriched = []
+    for result in results:
+        context = result.get('snippet', '')[:512]
+        summary = summarizer(context, max_length=50, min_length=10, do_sample=False)[0]['summary_text']
+        score = util.cos_sim(
+            similarity_model.encode(query, convert_to_tensor=True),
+            similarity_model.encode(context, convert_to_tensor=True)
+        ).item()
+        words = re.findall(r'\w+', context.lower())
+        stopwords = {"le", "la", "les", "the", "and", "de"}
+        topics = sorted(set([w for w in words if w not in stopwords]), key=words.count, reverse=True)[:5]
+        enriched.append({**result, 'ai_summary': summary, 'relevance_score': round(score * 10), 'topics': topics, 'enriched': True})
+        if sleep:
+            time.sleep(0.2)
+    return sorted(enriched, key=lambda x: x['relevance_score'], reverse=True)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 50])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-sleep', action='store_true', help="inclut le time.sleep(0.2) historique")
+    args = parser.parse_args()
+
+    ModelRegistry.preload(['summarizer', 'similarity'])
+
+    app = Flask(__name__)
+    query = "intelligence artificielle"
+    with app.app_context():
+        # Même modèle des deux côtés : distilbart pour toutes les langues
+        AIService._summarizers = {}
+        AIService.register_summarizer('default', AIService._summarize_distilbart)
+
+        # Échauffement : le premier appel paie l'initialisation des kernels
+        AIService.enrich_search_results(query, make_results(2))
+
+        print(f"{'résultats':>10} | {'unitaire (s)':>13} | {'batché (s)':>11} | {'gain':>6}")
+        for size in args.sizes:
+            results = make_results(size)
+            legacy = timed(lambda: legacy_enrich(query, results, args.legacy_sleep), args.repeat)
+            batched = timed(lambda: AIService.enrich_search_results(query, results), args.repeat)
+            print(f"{size:>10} | {legacy:>13.3f} | {batched:>11.3f} | {legacy / batched:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Compare les backends de parsing des pages de résultats Google / Bing : ms/page et pic mémoire.
+
+Usage : python -m benchmarks.bench_parsers [--pages DOSSIER] [--repeat 20] [--results 10]
+
+--pages : pages sauvegardées nommées google_*.html / bing_*.html ; à défaut, pages synthétiques
+gonflées comme les vraies (scripts, styles, navigation autour des conteneurs de résultats).
+Le pic mémoire est mesuré avec tracemalloc : il couvre les allocations Python (BeautifulSoup)
+mais pas la mémoire C de libxml2, ce qui avantage lxml sur cette colonne.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.html_parsers import ResultPageParser
+
+NOISE = (
+    "<script>var config = {" + ", ".join(f"k{i}: {i}" for i in range(300)) + "};</script>"
+    "<style>" + " ".join(f".c{i} {{ margin: {i}px; }}" for i in range(300)) + "</style>"
+    "<nav>" + "".join(f"<a href='/nav/{i}'>Lien {i}</a>" for i in range(100)) + "</nav>"
+)
+
+
+def synthetic_page(layout, results):
+    if layout == 'google':
+        blocks = "".join(
+            f"<div class='g'><div class='yuRUbf'><a href='/url?q=https://example.com/{i}&sa=U'>"
+            f"<h3>Résultat <b>{i}</b></h3></a></div>"
+            f"<div class='IsZvec'><span>Extrait du résultat {i}, avec du <em>texte</em> mis en avant.</span></div></div>"
+            for i in range(results)
+        )
+        body = f"<div id='search'><div id='rso'>{blocks}</div></div>"
+    else:
+        blocks = "".join(
+            f"<li class='b_algo'><h2><a href='https://example.com/{i}'>Résultat <strong>{i}</strong></a></h2>"
+            f"<div class='b_caption'><p>Extrait du résultat {i}, avec du <strong>texte</strong> mis en avant.</p></div></li>"
+            for i in range(results)
+        )
+        body = f"<ol id='b_results'>{blocks}</ol>"
+    return f"<html><head>{NOISE}</head><body>{NOISE}{body}{NOISE}</body></html>"
+
+
+def load_pages(directory, results):
+    if not directory:
+        return {layout: [synthetic_page(layout, results)] for layout in ResultPageParser.LAYOUTS}
+    pages = {}
+    for layout in ResultPageParser.LAYOUTS:
+        for path in sorted(glob.glob(os.path.join(directory, f"{layout}_*.html"))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.setdefault(layout, []).append(f.read())
+    return pages
+
+
+def measure(layout, pages, backend, repeat, limit):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            ResultPageParser.parse(layout, html, limit, backend=backend)
+        samples.append((time.perf_counter() - start) / len(pages))
+
+    tracemalloc.start()
+    for html in pages:
+        ResultPageParser.parse(layout, html, limit, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples) * 1000, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', help="dossier de pages sauvegardées (google_*.html, bing_*.html)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--results', type=int, default=10, help="résultats par page synthétique")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.results)
+    if not pages:
+        sys.exit(f"Aucune page google_*.html / bing_*.html dans {args.pages}")
+
+    print(f"{'page':>7} | {'backend':>11} | {'ms/page':>8} | {'pic (Mo)':>9} | {'résultats':>9}")
+    for layout, htmls in pages.items():
+        reference = None
+        for backend in ResultPageParser.BACKENDS:
+            extracted = ResultPageParser.parse(layout, htmls[0], args.results, backend=backend)
+            reference = extracted if reference is None else reference
+            ms, peak = measure(layout, htmls, backend, args.repeat, args.results)
+            flag = '' if extracted == reference else '  (extraction différente de html.parser)'
+            print(f"{layout:>7} | {backend:>11} | {ms:>8.2f} | {peak:>9.2f} | {len(extracted):>9}{flag}")
+
+
+if __name__ == '__main__':
+    main()
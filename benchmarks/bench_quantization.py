@@ -0,0 +1,140 @@
+"""Compare latence et fidélité des modèles en fp32 et en int8 dynamique (CPU).
+
+La fidélité est mesurée par rapport aux sorties fp32 : cosinus des embeddings et recouvrement du
+classement pour la similarité, ROUGE-L des résumés, recouvrement des suggestions CamemBERT.
+
+Usage : python -m benchmarks.bench_quantization [--models similarity summarizer bert2bert camembert]
+                                                [--repeat 3] [--threads 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import torch
+from sentence_transformers import util
+
+from app.services import ai_service  # noqa: F401  (enregistre 'summarizer' et 'similarity')
+from app.services.model_registry import ModelRegistry, _model_bytes
+from app.services.scraping_service import ScrapingService
+from app.services.search_service import SearchService
+from app.utils.torch_runtime import TorchRuntime
+from benchmarks.bench_enrichment import SNIPPETS
+
+QUERIES = ["intelligence artificielle", "coupe du monde de football", "énergie solaire", "langage de programmation"]
+PROMPTS = ["La capitale de la France est", "Le football est un", "Python est un langage de"]
+
+
+def rouge_l(reference, candidate):
+    """F1 de la plus longue sous-séquence commune, sur les mots."""
+    ref, cand = reference.lower().split(), candidate.lower().split()
+    if not ref or not cand:
+        return 0.0
+    previous = [0] * (len(cand) + 1)
+    for r in ref:
+        current = [0]
+        for j, c in enumerate(cand):
+            current.append(previous[j] + 1 if r == c else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def overlap(a, b):
+    return len(set(a) & set(b)) / max(len(set(a) | set(b)), 1)
+
+
+def run_similarity(model):
+    with torch.no_grad():
+        docs = model.encode(SNIPPETS, convert_to_tensor=True)
+        queries = model.encode(QUERIES, convert_to_tensor=True)
+    return {'docs': docs, 'ranking': util.cos_sim(queries, docs).argsort(dim=1, descending=True)[:, :3].tolist()}
+
+
+def compare_similarity(reference, candidate):
+    cosines = util.cos_sim(reference['docs'], candidate['docs']).diagonal()
+    rankings = [overlap(r, c) for r, c in zip(reference['ranking'], candidate['ranking'])]
+    return f"cos moyen {cosines.mean().item():.4f}, top-3 commun {statistics.mean(rankings):.0%}"
+
+
+def run_distilbart(model):
+    outputs = model(SNIPPETS, max_length=50, min_length=10, do_sample=False, batch_size=len(SNIPPETS))
+    return [o['summary_text'] for o in outputs]
+
+
+def run_bert2bert(model):
+    return ScrapingService._generate_summaries(model, SNIPPETS)
+
+
+def compare_summaries(reference, candidate):
+    scores = [rouge_l(r, c) for r, c in zip(reference, candidate)]
+    identical = sum(r == c for r, c in zip(reference, candidate)) / len(reference)
+    return f"ROUGE-L {statistics.mean(scores):.3f}, identiques {identical:.0%}"
+
+
+def run_camembert(model):
+    return [SearchService._predict_masked(model, prompt, 5) for prompt in PROMPTS]
+
+
+def compare_suggestions(reference, candidate):
+    return f"suggestions communes {statistics.mean(overlap(r, c) for r, c in zip(reference, candidate)):.0%}"
+
+
+BENCHES = {
+    'similarity': (run_similarity, compare_similarity),
+    'summarizer': (run_distilbart, compare_summaries),
+    'bert2bert': (run_bert2bert, compare_summaries),
+    'camembert': (run_camembert, compare_suggestions),
+}
+
+
+def timed(func, model, repeat):
+    func(model)  # échauffement
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(model)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', nargs='+', default=list(BENCHES), choices=list(BENCHES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=0, help="threads intra-op torch (0 = défaut)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    print(f"threads intra-op : {torch.get_num_threads()}, moteur quantifié : {torch.backends.quantized.engine}")
+    print(f"{'modèle':>11} | {'fp32 (s)':>9} | {'int8 (s)':>9} | {'gain':>5} | {'fp32 Mo':>8} | {'int8 Mo':>8} | fidélité int8")
+
+    for name in args.models:
+        run, compare = BENCHES[name]
+        loader = ModelRegistry._specs[name]['loader']
+
+        model = loader()
+        fp32_mb = _model_bytes(model) / 2 ** 20
+        fp32_time, reference = timed(run, model, args.repeat)
+        del model
+
+        model = TorchRuntime.optimize(loader(), 'int8')
+        int8_mb = _model_bytes(model) / 2 ** 20
+        int8_time, candidate = timed(run, model, args.repeat)
+        del model
+
+        print(
+            f"{name:>11} | {fp32_time:>9.3f} | {int8_time:>9.3f} | {fp32_time / int8_time:>4.1f}x | "
+            f"{fp32_mb:>8.1f} | {int8_mb:>8.1f} | {compare(reference, candidate)}"
+        )
+
+
+if __name__ == '__main__':
+    main()
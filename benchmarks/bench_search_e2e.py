@@ -0,0 +1,170 @@
+"""Benchmark hors ligne de la recherche texte de bout en bout (scraping -> filtres et doublons -> enrichissement IA).
+
+Les providers sont servis par le rejeu des fixtures HTTP (HTTP_TRANSPORT=replay) : mêmes pages à chaque
+exécution, avec latence et pannes injectées. Rapporte le débit et les p50/p95/p99 par étape.
+
+Enregistrer les fixtures (réseau réel) : python -m benchmarks.bench_search_e2e --record --fixtures fixtures/http
+Rejouer : python -m benchmarks.bench_search_e2e --fixtures fixtures/http [--latency 0.2 --jitter 0.05]
+          [--failure-rate 0.1] [--concurrency 4] [--repeat 5] [--models stub|real]
+
+--models stub (défaut) remplace résumeur et encodeur par des modèles factices déterministes : on mesure
+alors le pipeline, pas l'inférence ; --models real charge distilbart et MiniLM comme en production.
+"""
+import argparse
+import hashlib
+import math
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+QUERIES = [
+    "intelligence artificielle",
+    "c'est quoi la photosynthèse",
+    "actualités football",
+    "comment fonctionne un moteur électrique",
+    "python programming language",
+]
+FILTERS = {'date': 'any', 'type': 'all', 'domain': '', 'language': 'fr', 'category': ''}
+STAGES = ('scrape', 'filter', 'enrich', 'total')
+
+
+class StubEncoder:
+    """Encodeur factice : sac de mots haché sur 128 dimensions, normalisé."""
+
+    DIM = 128
+
+    def encode(self, texts, convert_to_tensor=True, batch_size=None):
+        import torch
+        vectors = torch.zeros(len(texts), self.DIM)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % self.DIM] += 1.0
+        return torch.nn.functional.normalize(vectors, dim=1)
+
+
+class StubSummarizer:
+    """Résumeur factice : première phrase du texte, coupée à max_length mots."""
+
+    def __call__(self, texts, max_length=50, **kwargs):
+        return [{'summary_text': ' '.join(re.split(r'(?<=[.!?])\s', text)[0].split()[:max_length])} for text in texts]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def configure_environment(args):
+    # Lu par app.config à l'import : à poser avant de charger l'application
+    os.environ['HTTP_TRANSPORT'] = 'record' if args.record else 'replay'
+    os.environ['HTTP_FIXTURES_DIR'] = args.fixtures
+    os.environ['HTTP_REPLAY_LATENCY'] = str(args.latency)
+    os.environ['HTTP_REPLAY_JITTER'] = str(args.jitter)
+    os.environ['HTTP_REPLAY_FAILURE_RATE'] = str(args.failure_rate)
+    os.environ['HTTP_REPLAY_SEED'] = str(args.seed)
+    os.environ['SCRAPE_CACHE_ENABLED'] = 'false'
+    if args.models == 'stub':
+        os.environ['MODEL_PRELOAD'] = ''
+
+
+def install_stub_models():
+    from app.services.ai_service import AIService
+    from app.services.model_registry import ModelRegistry
+
+    for name in ('summarizer', 'similarity'):
+        ModelRegistry.unload(name)
+    ModelRegistry.register('summarizer', StubSummarizer)
+    ModelRegistry.register('similarity', StubEncoder)
+    # Un seul résumeur pour toutes les langues : bert2bert n'a pas de version factice
+    AIService._summarizers = {}
+    AIService.register_summarizer('default', AIService._summarize_distilbart)
+
+
+def run_query(app, query, limit, timings, lock):
+    from app.services.ai_service import AIService
+    from app.services.dedup_service import DedupService
+    from app.services.scraping_service import ScrapingService
+    from app.services.search_service import SearchService
+
+    with app.app_context():
+        start = time.perf_counter()
+        scraped = ScrapingService.scrape_web(query, limit, lang=FILTERS['language'], use_cache=False)
+        scraped_at = time.perf_counter()
+        filtered = DedupService.collapse(SearchService.apply_filters(scraped, FILTERS))
+        filtered_at = time.perf_counter()
+        enriched = AIService.enrich_search_results(query, filtered)
+        done = time.perf_counter()
+
+    with lock:
+        timings['scrape'].append(scraped_at - start)
+        timings['filter'].append(filtered_at - scraped_at)
+        timings['enrich'].append(done - filtered_at)
+        timings['total'].append(done - start)
+        timings['results'].append(len(enriched))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='fixtures/http')
+    parser.add_argument('--record', action='store_true', help="interroge les vrais providers et enregistre les fixtures")
+    parser.add_argument('--queries', help="fichier de requêtes, une par ligne")
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help="latence injectée par réponse (s)")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--models', choices=['stub', 'real'], default='stub')
+    args = parser.parse_args()
+
+    configure_environment(args)
+    from app import create_app
+    from app.services.provider_scheduler import ProviderScheduler
+    from app.utils.http_client import HttpClient
+
+    queries = QUERIES
+    if args.queries:
+        with open(args.queries, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    app = create_app('testing')
+    with app.app_context():
+        if args.models == 'stub':
+            install_stub_models()
+    ProviderScheduler.reset(args.seed)
+
+    timings = {stage: [] for stage in STAGES}
+    timings['results'] = []
+    lock = threading.Lock()
+    # Un seul passage en enregistrement : chaque requête donne ses fixtures une fois
+    workload = queries * (1 if args.record else args.repeat)
+
+    # Échauffement hors mesure : imports paresseux, premiers appels des modèles
+    run_query(app, queries[0], args.limit, {stage: [] for stage in (*STAGES, 'results')}, lock)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in [pool.submit(run_query, app, query, args.limit, timings, lock) for query in workload]:
+            future.result()
+    wall = time.perf_counter() - start
+
+    transport = HttpClient.get_stats()['transport']
+    print(f"{len(workload)} recherches en {wall:.2f}s : {len(workload) / wall:.2f} req/s "
+          f"(concurrence {args.concurrency}, {statistics.mean(timings['results']):.1f} résultats en moyenne)")
+    print(f"transport : {transport}")
+    print(f"{'étape':>7} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9} | {'moy. (ms)':>9}")
+    for stage in STAGES:
+        samples = timings[stage]
+        print(f"{stage:>7} | {percentile(samples, 50) * 1000:>9.1f} | {percentile(samples, 95) * 1000:>9.1f} | "
+              f"{percentile(samples, 99) * 1000:>9.1f} | {statistics.mean(samples) * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import re
+from app.services.ai_service import AIService
+from app.services.cache_service import EnrichmentStore
+from app.services.model_registry import ModelRegistry
+from app.services.summary_router import SummaryRouter
+
+
+def test_extract_topics_matches_frequency_order():
+    text = "La data science utilise la data et encore la data pour la science des données"
+    words = re.findall(r'\w+', text.lower())
+    legacy = sorted(set(w for w in words if w not in AIService.TOPIC_STOPWORDS), key=words.count, reverse=True)[:5]
+
+    topics = AIService.extract_topics(text)
+
+    assert topics[:2] == ['data', 'science']
+    assert set(topics[:2]) == set(legacy[:2])
+    assert 'la' not in topics
+
+
+def test_enrich_search_results_without_models_returns_empty():
+    ModelRegistry.register('similarity', lambda: None)
+    ModelRegistry.unload('similarity')
+    assert AIService.enrich_search_results('intelligence artificielle', [{'snippet': 'x'}]) == []
+
+
+def _stub_models(monkeypatch, summarized, short=()):
+    import torch
+
+    def embed(texts):
+        # Score décroissant avec la position : 'r0' est le plus pertinent
+        return torch.tensor([[1.0, float(int(t[1:]))] for t in texts])
+
+    def summarize(texts, lang=None):
+        summarized.extend(texts)
+        return [f"résumé de {t}" for t in texts]
+
+    monkeypatch.setattr(AIService, 'is_ready', staticmethod(lambda: True))
+    monkeypatch.setattr(AIService, 'embed', staticmethod(embed))
+    monkeypatch.setattr(AIService, 'encode_query', staticmethod(lambda query: torch.tensor([1.0, 0.0])))
+    monkeypatch.setattr(AIService, 'summarize_batch', staticmethod(summarize))
+    # Aiguillage : seuls les textes de short passent sans le modèle abstractif
+    monkeypatch.setattr(SummaryRouter, 'route', classmethod(
+        lambda cls, texts: ['passthrough' if t in short else 'abstractive' for t in texts]
+    ))
+
+
+def test_cascade_summarizes_only_top_k(monkeypatch):
+    summarized = []
+    _stub_models(monkeypatch, summarized)
+    results = [{'title': f'r{i}', 'snippet': f'r{i}', 'language': 'fr'} for i in (3, 0, 2, 1)]
+
+    enriched = AIService.enrich_search_results('requête', results, summary_budget=2)
+
+    assert sorted(summarized) == ['r0', 'r1']
+    assert [r['snippet'] for r in enriched] == ['r0', 'r1', 'r2', 'r3']
+    assert enriched[0]['ai_summary'] == 'résumé de r0' and enriched[0]['enriched']
+    assert enriched[3]['ai_summary'] is None and enriched[3]['summary_pending']
+
+    # Suite à la demande (endpoint /summaries)
+    done = AIService.summarize_results([enriched[3]])
+    assert done[0]['ai_summary'] == 'résumé de r3' and not done[0]['summary_pending']
+
+
+def test_cascade_budget_counts_only_abstractive_summaries(monkeypatch):
+    summarized = []
+    _stub_models(monkeypatch, summarized, short={'r4'})
+    # r0, le plus pertinent, a déjà un résumé mémorisé : il ne prend pas de place dans le budget
+    monkeypatch.setattr(EnrichmentStore, 'lookup', classmethod(lambda cls, results: {
+        i: {'ai_summary': 'résumé mémorisé', 'topics': None, 'embedding': None}
+        for i, r in enumerate(results) if r['snippet'] == 'r0'
+    }))
+    results = [{'title': f'r{i}', 'snippet': f'r{i}', 'language': 'fr'} for i in range(5)]
+
+    enriched = AIService.enrich_search_results('requête', results, summary_budget=2)
+
+    # r4 est court : résolu d'office malgré son rang, sans entamer le budget
+    assert sorted(summarized) == ['r1', 'r2', 'r4']
+    by_snippet = {r['snippet']: r for r in enriched}
+    assert by_snippet['r0']['ai_summary'] == 'résumé mémorisé'
+    assert by_snippet['r4']['enriched'] and not by_snippet['r4'].get('summary_pending')
+    assert by_snippet['r3']['ai_summary'] is None and by_snippet['r3']['summary_pending']
+
+
+def test_enrich_batch_marks_failed_or_unready_batches_unavailable(app, monkeypatch):
+    results = [{'title': 'r0', 'snippet': 'r0', 'language': 'fr'}]
+    monkeypatch.setattr(AIService, 'is_ready', staticmethod(lambda: False))
+    enriched, spent = AIService.enrich_batch('requête', results, summary_budget=2)
+    assert enriched[0]['ai_summary'] == 'Résumé indisponible' and spent == 0
+
+    def fail(*args):
+        raise RuntimeError('modèle en panne')
+
+    monkeypatch.setattr(AIService, 'is_ready', staticmethod(lambda: True))
+    monkeypatch.setattr(AIService, '_enrich_batch', staticmethod(fail))
+    with app.app_context():
+        enriched, spent = AIService.enrich_batch('requête', results, summary_budget=2)
+    assert not enriched[0]['enriched'] and enriched[0]['title'] == 'r0' and spent == 0
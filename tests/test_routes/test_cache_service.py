@@ -0,0 +1,143 @@
+import time
+import pytest
+from unittest.mock import patch
+from app.services.cache_service import ScrapeCache, SemanticCache, EnrichmentStore
+
+
+def _reset_cache(max_entries=512):
+    ScrapeCache._collection = None
+    ScrapeCache._settings = {
+        'enabled': True,
+        'max_entries': max_entries,
+        'default_ttl': 60,
+        'ttls': {'news': 5, 'definition': 3600},
+    }
+    ScrapeCache.clear()
+
+
+def test_key_uses_normalized_query():
+    key_a = ScrapeCache.make_key('  Intelligence   Artificielle ?', 'fr', 'general', 10)
+    key_b = ScrapeCache.make_key('intelligence artificielle', 'fr', 'general', 10)
+    assert key_a == key_b
+    assert key_a != ScrapeCache.make_key('intelligence artificielle', 'en', 'general', 10)
+
+
+def test_hit_and_miss_counters():
+    _reset_cache()
+    results = [{'title': 'IA', 'url': 'http://example.com', 'snippet': 'x'}]
+
+    assert ScrapeCache.get('ia', 'fr', 'general', 10) is None
+    ScrapeCache.set('ia', 'fr', 'general', 10, results)
+    assert ScrapeCache.get('ia', 'fr', 'general', 10) == results
+
+    stats = ScrapeCache.get_stats()
+    assert stats['misses'] == 1
+    assert stats['memory_hits'] == 1
+
+
+def test_lru_eviction():
+    _reset_cache(max_entries=2)
+    for query in ['a1', 'b2', 'c3']:
+        ScrapeCache.set(query, 'fr', 'general', 10, [{'title': query}])
+
+    assert ScrapeCache.get('a1', 'fr', 'general', 10) is None
+    assert ScrapeCache.get('c3', 'fr', 'general', 10) == [{'title': 'c3'}]
+    assert ScrapeCache.get_stats()['evictions'] == 1
+
+
+def test_news_entries_expire_with_their_ttl():
+    _reset_cache()
+    with patch('app.services.cache_service.time.monotonic', return_value=1000.0):
+        ScrapeCache.set('actualités foot', 'fr', 'news', 10, [{'title': 'match'}])
+    with patch('app.services.cache_service.time.monotonic', return_value=1006.0):
+        assert ScrapeCache.get('actualités foot', 'fr', 'news', 10) is None
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.finds = []
+        self.bulk_writes = 0
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find(self, query, projection=None):
+        self.finds.append(query)
+        return [dict(self.docs[key], _id=key) for key in query['_id']['$in'] if key in self.docs]
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+        for op in operations:
+            self.docs[op._filter['_id']] = dict(op._doc['$set'])
+
+
+def _reset_store(flush_size=32):
+    EnrichmentStore._collection = _FakeCollection()
+    EnrichmentStore._settings = {'enabled': True, 'ttl': 60, 'flush_size': flush_size, 'flush_interval': 3600}
+    EnrichmentStore._pending = {}
+    EnrichmentStore._last_flush = time.monotonic()
+    for counter in EnrichmentStore._stats:
+        EnrichmentStore._stats[counter] = 0
+    return EnrichmentStore._collection
+
+
+def test_enrichment_key_uses_canonical_url():
+    result = {'url': 'https://fr.wikipedia.org/wiki/Python/', 'snippet': 'Python est un langage.'}
+    variant = {'url': 'http://FR.wikipedia.org/wiki/Python?utm_source=x#Histoire', 'snippet': 'Python est un langage.'}
+    assert EnrichmentStore.make_key(result) == EnrichmentStore.make_key(variant)
+    assert EnrichmentStore.make_key({**result, 'snippet': 'Autre texte.'}) != EnrichmentStore.make_key(result)
+    assert EnrichmentStore.make_key({'url': None, 'snippet': 'x'}) is None
+    # ?ref= désigne souvent un contenu (branche GitHub, version de doc) : ce n'est pas un traceur
+    github = {'url': 'https://github.com/org/projet?ref=main', 'snippet': 'README'}
+    assert EnrichmentStore.make_key(github) != EnrichmentStore.make_key({**github, 'url': 'https://github.com/org/projet?ref=v2'})
+
+
+def test_enrichment_store_batches_writes_and_bulk_lookups():
+    collection = _reset_store(flush_size=2)
+    results = [{'url': f'https://example.com/{i}', 'snippet': f'Snippet {i}'} for i in range(3)]
+
+    EnrichmentStore.store(results[0], 'Résumé 0', ['snippet'], [0.1, 0.2])
+    assert collection.bulk_writes == 0
+    assert EnrichmentStore.lookup(results[:1])[0]['ai_summary'] == 'Résumé 0'
+
+    EnrichmentStore.store(results[1], 'Résumé 1', ['snippet'], [0.3, 0.4])
+    assert collection.bulk_writes == 1 and len(collection.docs) == 2
+
+    memo = EnrichmentStore.lookup(results)
+    assert len(collection.finds) == 1
+    assert set(memo) == {0, 1}
+    assert memo[1]['embedding'].tolist() == pytest.approx([0.3, 0.4])
+    assert EnrichmentStore.get_stats()['misses'] == 1
+
+
+def _semantic_cache(max_entries=4, threshold=0.9, ttl=60):
+    SemanticCache._settings = {'enabled': True, 'max_entries': max_entries, 'threshold': threshold, 'ttl': ttl}
+    SemanticCache.clear()
+
+
+def test_semantic_cache_serves_close_queries_in_same_context():
+    _semantic_cache()
+    context = SemanticCache.context('fr', 'definition', 10, {'language': 'fr'})
+    SemanticCache.set("c'est quoi la photosynthèse", [1.0, 0.0, 0.0], context, [{'title': 'Photosynthèse'}])
+
+    results, similarity = SemanticCache.get([0.95, 0.2, 0.0], context)
+    assert results == [{'title': 'Photosynthèse'}] and similarity > 0.9
+    assert SemanticCache.get([0.0, 1.0, 0.0], context) is None
+    assert SemanticCache.get([1.0, 0.0, 0.0], SemanticCache.context('en', 'definition', 10, {'language': 'fr'})) is None
+
+    stats = SemanticCache.get_stats()
+    assert (stats['lookups'], stats['hits'], stats['hit_rate']) == (3, 1, 0.333)
+
+
+def test_semantic_cache_evicts_least_recently_served():
+    _semantic_cache(max_entries=2)
+    context = SemanticCache.context('fr', 'general', 10)
+    SemanticCache.set('a', [1.0, 0.0], context, [{'title': 'a'}])
+    SemanticCache.set('b', [0.0, 1.0], context, [{'title': 'b'}])
+    assert SemanticCache.get([1.0, 0.0], context) is not None
+    SemanticCache.set('c', [-1.0, 0.0], context, [{'title': 'c'}])
+
+    assert SemanticCache.get([0.0, 1.0], context) is None
+    assert SemanticCache.get([1.0, 0.0], context)[0] == [{'title': 'a'}]
+    assert SemanticCache.get_stats()['evictions'] == 1
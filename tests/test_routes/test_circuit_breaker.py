@@ -0,0 +1,75 @@
+from unittest.mock import patch
+from app.services.circuit_breaker import CircuitBreaker, ProviderBreakers
+
+
+def test_breaker_opens_on_failure_rate_then_probes():
+    breaker = CircuitBreaker('google', window=10, min_calls=4, failure_rate=0.5, open_seconds=30)
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=100.0):
+        for ok in (True, False, False, True):
+            assert breaker.allow()
+            breaker.record(ok, 0.2)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=131.0):
+        # Une seule sonde en half-open
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record(True, 0.2)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker('bing', min_calls=3, slow_call_seconds=2.0, slow_call_rate=0.8)
+    for _ in range(3):
+        breaker.record(True, 4.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()['times_opened'] == 1
+
+
+def test_negative_cache_expires():
+    ProviderBreakers._settings = {'breaker': {}, 'negative_ttl': 60, 'negative_max_entries': 10}
+    ProviderBreakers.reset()
+    key = ('requête sans résultat', 'fr')
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=10.0):
+        ProviderBreakers.remember_empty('duckduckgo', key)
+        assert ProviderBreakers.is_known_empty('duckduckgo', key)
+        assert not ProviderBreakers.is_known_empty('wikipedia', key)
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=71.0):
+        assert not ProviderBreakers.is_known_empty('duckduckgo', key)
+    assert ProviderBreakers.get_stats()['negative_cache']['hits'] == 1
+
+
+def test_released_probe_lets_the_next_call_through():
+    breaker = CircuitBreaker('gnews', min_calls=1, open_seconds=30)
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=100.0):
+        breaker.record(False, 0.2)
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=131.0):
+        # available ne prend pas la sonde ; un appel refusé par le pool la rend
+        assert breaker.available() and breaker.available()
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+        assert not breaker.allow()
+
+
+def test_source_never_launched_keeps_the_half_open_probe():
+    from app.services.scraping_service import ScrapingService
+
+    ProviderBreakers._settings = {'breaker': {'min_calls': 1, 'open_seconds': 30}, 'negative_ttl': 0}
+    ProviderBreakers.reset()
+    with patch('app.services.circuit_breaker.time.monotonic', return_value=-100.0):
+        ProviderBreakers.record('bing', False, 0.2)
+
+    google = [{'title': 'A', 'url': 'https://a.fr', 'snippet': 'a'}]
+    sources = ScrapingService._available_sources([
+        ('google', lambda q, l, ln, d: google),
+        ('bing', lambda q, l, ln, d: []),
+    ], 'requête', 'fr')
+    assert [name for name, _ in sources] == ['google', 'bing']
+
+    # google répond seul : bing, de secours, ne part jamais et sa sonde reste libre
+    batches = list(ScrapingService._race_providers(sources, 'requête', 10, 'fr', False, launch_count=1))
+    assert batches == [('google', google)]
+    assert ProviderBreakers.get('bing').allow()
@@ -0,0 +1,69 @@
+from app.services.hedging import HedgePolicy
+
+
+def _reset_policy(**overrides):
+    HedgePolicy._settings = {
+        'enabled': True, 'primary_providers': 1, 'percentile': 90, 'default_delay': 1.0,
+        'min_delay': 0.1, 'min_samples': 5, 'max_extra_load': 0.25, 'max_per_search': 1,
+        **overrides
+    }
+    HedgePolicy.reset()
+
+
+def test_delay_uses_percentile_once_enough_samples():
+    _reset_policy()
+    for elapsed in (0.2, 0.3, 0.25, 0.4, 2.0):
+        HedgePolicy.observe('google', elapsed)
+    HedgePolicy.observe('bing', 0.05)
+
+    assert HedgePolicy.percentile('google', 50) == 0.3
+    assert HedgePolicy.delay_for(['google']) == 2.0
+    # Trop peu d'observations pour bing : délai par défaut
+    assert HedgePolicy.delay_for(['bing']) == 1.0
+
+
+def test_extra_load_is_capped():
+    _reset_policy(max_extra_load=0.25)
+    for _ in range(8):
+        HedgePolicy.record_primary()
+
+    granted = [HedgePolicy.try_hedge() for _ in range(4)]
+
+    assert granted == [True, True, False, False]
+    for _ in range(2):
+        HedgePolicy.record_launched()
+    HedgePolicy.record_win('duckduckgo', hedged=True)
+    stats = HedgePolicy.get_stats()
+    assert stats['refused'] == 2
+    assert stats['extra_load'] == 0.25
+    assert stats['hedge_win_rate'] == 0.5
+
+
+def test_fastest_primary_by_observed_percentile():
+    _reset_policy()
+    for elapsed in (0.8, 0.9, 1.0, 1.1, 1.2):
+        HedgePolicy.observe('google', elapsed)
+        HedgePolicy.observe('bing', elapsed / 4)
+    HedgePolicy.observe('duckduckgo', 0.01)
+
+    assert HedgePolicy.fastest(['google', 'bing', 'duckduckgo']) == 'bing'
+    # Aucun provider assez observé : le premier prévu
+    assert HedgePolicy.fastest(['duckduckgo', 'wikipedia']) == 'duckduckgo'
+
+
+def test_released_hedge_gives_its_budget_back():
+    _reset_policy(max_extra_load=0.25)
+    for _ in range(4):
+        HedgePolicy.record_primary()
+
+    assert HedgePolicy.try_hedge()
+    # Réservation en cours : pas de seconde couverture
+    assert not HedgePolicy.try_hedge()
+    # Pool saturé : couverture jamais lancée, ni comptée ni refusée
+    HedgePolicy.release()
+    assert HedgePolicy.get_stats()['hedges'] == 0
+
+    assert HedgePolicy.try_hedge()
+    HedgePolicy.record_launched()
+    stats = HedgePolicy.get_stats()
+    assert stats['hedges'] == 1 and stats['refused'] == 1
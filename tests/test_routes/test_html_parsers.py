@@ -0,0 +1,61 @@
+import pytest
+
+from app.utils.html_parsers import ResultPageParser
+
+GOOGLE_PAGE = """
+<html><head><script>var x = '<div class="g">';</script></head><body>
+<div id="rso">
+  <div class="g tF2Cxc"><a href="/url?q=https://example.com/a&amp;sa=U"><h3>Premier <b>résultat</b></h3></a>
+    <div class="IsZvec"><span>Extrait   du <em>premier</em> résultat</span></div></div>
+  <div class="g"><h3>Sans lien</h3></div>
+  <div class="g"><a href="https://example.com/b"><h3>Deuxième</h3></a></div>
+  <div class="gx"><a href="https://example.com/c"><h3>Pas un résultat</h3></a></div>
+</div></body></html>
+"""
+
+BING_PAGE = """
+<html><body><ol id="b_results">
+  <li class="b_algo"><h2><a href="https://example.com/1">Un <strong>titre</strong></a></h2>
+    <div class="b_caption"><p>Premier extrait</p></div></li>
+  <li class="b_ad"><h2><a href="https://ads.example.com">Annonce</a></h2></li>
+  <li class="b_algo"><h2><a href="https://example.com/2">Deux</a></h2></li>
+  <li class="b_algo"><h2><a href="https://example.com/3">Trois</a></h2><p>Troisième</p></li>
+</ol></body></html>
+"""
+
+
+@pytest.mark.parametrize('backend', ResultPageParser.BACKENDS)
+def test_google_extraction_is_identical_across_backends(backend):
+    assert ResultPageParser.parse('google', GOOGLE_PAGE, 10, backend=backend) == [
+        {'title': 'Premierrésultat', 'href': '/url?q=https://example.com/a&sa=U', 'snippet': 'Extrait   dupremierrésultat'},
+        {'title': 'Deuxième', 'href': 'https://example.com/b', 'snippet': ''},
+    ]
+
+
+@pytest.mark.parametrize('backend', ResultPageParser.BACKENDS)
+def test_bing_extraction_respects_limit(backend):
+    results = ResultPageParser.parse('bing', BING_PAGE, 2, backend=backend)
+    assert results == [
+        {'title': 'Untitre', 'href': 'https://example.com/1', 'snippet': 'Premier extrait'},
+        {'title': 'Deux', 'href': 'https://example.com/2', 'snippet': ''},
+    ]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        ResultPageParser.set_backend('regex')
+
+
+@pytest.mark.parametrize('backend', ResultPageParser.BACKENDS)
+def test_incremental_parser_stops_once_limit_is_reached(backend):
+    page = BING_PAGE.encode('utf-8')
+    parser = ResultPageParser.incremental('bing', 2, encoding='utf-8', backend=backend)
+    stopped_at = None
+    for offset in range(0, len(page), 64):
+        if parser.feed(page[offset:offset + 64]):
+            stopped_at = offset
+            break
+
+    assert parser.close() == ResultPageParser.parse('bing', BING_PAGE, 2, backend=backend)
+    if backend == 'lxml':
+        assert stopped_at is not None and stopped_at + 64 < len(page)
@@ -0,0 +1,101 @@
+import io
+
+import requests
+from requests.adapters import BaseAdapter
+
+from app.utils.http_cache import CachingAdapter, HttpCache
+
+SUMMARY_URL = 'https://fr.wikipedia.org/api/rest_v1/page/summary/Python'
+
+
+class _Origin(BaseAdapter):
+    """Serveur factice : renvoie les réponses prévues et garde les requêtes reçues."""
+
+    def __init__(self, *responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _session(tmp_path, origin, **cache_kwargs):
+    session = requests.Session()
+    adapter = CachingAdapter(HttpCache(str(tmp_path / 'http'), **cache_kwargs), origin, ['wikipedia.org'])
+    session.mount('https://', adapter)
+    return session, adapter.cache
+
+
+def test_fresh_response_is_served_without_network(tmp_path):
+    origin = _Origin((200, {'Cache-Control': 'max-age=300', 'Content-Type': 'application/json'}, b'{"title": "Python"}'))
+    session, cache = _session(tmp_path, origin)
+
+    assert session.get(SUMMARY_URL).json() == {'title': 'Python'}
+    assert session.get(SUMMARY_URL).json() == {'title': 'Python'}
+    assert len(origin.requests) == 1
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_stale_response_is_revalidated_with_etag(tmp_path):
+    origin = _Origin(
+        (200, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'}, b'{"title": "Python"}'),
+        (304, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'}, b''),
+    )
+    session, cache = _session(tmp_path, origin)
+
+    session.get(SUMMARY_URL)
+    response = session.get(SUMMARY_URL)
+    assert response.status_code == 200
+    assert response.json() == {'title': 'Python'}
+    assert origin.requests[1].headers['If-None-Match'] == '"v1"'
+    assert cache.get_stats()['revalidated'] == 1
+
+
+def test_no_store_and_other_hosts_are_not_cached(tmp_path):
+    origin = _Origin(
+        (200, {'Cache-Control': 'no-store'}, b'{}'),
+        (200, {'Cache-Control': 'no-store'}, b'{}'),
+        (200, {'Cache-Control': 'max-age=300'}, b'{}'),
+        (200, {'Cache-Control': 'max-age=300'}, b'{}'),
+    )
+    session, cache = _session(tmp_path, origin)
+
+    session.get(SUMMARY_URL)
+    session.get(SUMMARY_URL)
+    session.get('https://www.bing.com/search?q=python')
+    session.get('https://www.bing.com/search?q=python')
+    assert len(origin.requests) == 4
+    assert cache.get_stats()['stores'] == 0
+
+
+def test_cache_size_is_bounded(tmp_path):
+    body = b'x' * 400
+    origin = _Origin(*[(200, {'Cache-Control': 'max-age=300'}, body)] * 5)
+    session, cache = _session(tmp_path, origin, max_bytes=1000, max_entry_bytes=600)
+
+    for i in range(5):
+        assert session.get(f"{SUMMARY_URL}_{i}").content == body
+    stats = cache.get_stats()
+    assert stats['evictions'] >= 3
+    assert stats['bytes'] <= 1000
+
+
+def test_oversized_response_is_returned_intact(tmp_path):
+    body = b'y' * 150000
+    origin = _Origin((200, {'Cache-Control': 'max-age=300'}, body))
+    session, cache = _session(tmp_path, origin, max_entry_bytes=100000)
+
+    assert session.get(SUMMARY_URL).content == body
+    assert cache.get_stats()['not_stored'] == 1
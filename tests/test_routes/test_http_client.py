@@ -0,0 +1,51 @@
+import requests_mock
+from app.utils.http_client import HttpClient
+
+
+def test_session_is_shared_between_calls():
+    HttpClient.reset()
+    assert HttpClient.get_session() is HttpClient.get_session()
+
+
+def test_get_records_host_stats():
+    HttpClient.reset()
+    with requests_mock.Mocker() as m:
+        m.get('https://api.duckduckgo.com/', json={'AbstractText': 'ok'})
+        HttpClient.get('https://api.duckduckgo.com/?q=test')
+        HttpClient.get('https://api.duckduckgo.com/?q=autre')
+
+    stats = HttpClient.get_stats()['hosts']['api.duckduckgo.com']
+    assert stats['requests'] == 2
+    assert stats['errors'] == 0
+
+
+def test_default_timeout_uses_app_config(app):
+    HttpClient.init_app(app)
+    connect, read = HttpClient.default_timeout()
+    assert connect == app.config['HTTP_CONNECT_TIMEOUT']
+    assert read == app.config['SCRAPE_TIMEOUT']
+
+
+def test_stream_caps_bytes_and_counts_cutoffs():
+    HttpClient.reset()
+    with requests_mock.Mocker() as m:
+        m.get('https://www.bing.com/search', content=b'x' * 5000)
+        with HttpClient.stream('https://www.bing.com/search?q=a', provider='bing', max_bytes=1000) as body:
+            assert len(body.read()) == 1000
+        with HttpClient.stream('https://www.bing.com/search?q=b', provider='bing') as body:
+            next(iter(body))
+
+    stats = HttpClient.get_stats()['downloads']['bing']
+    assert stats['requests'] == 2
+    assert stats['truncated'] == 1
+    assert stats['early_stops'] == 1
+
+
+def test_fetch_keeps_json_usable():
+    HttpClient.reset()
+    with requests_mock.Mocker() as m:
+        m.get('https://api.duckduckgo.com/', json={'AbstractText': 'ok'})
+        response = HttpClient.fetch('https://api.duckduckgo.com/?q=test', provider='duckduckgo')
+
+    assert response.json() == {'AbstractText': 'ok'}
+    assert HttpClient.get_stats()['downloads']['duckduckgo']['early_stops'] == 0
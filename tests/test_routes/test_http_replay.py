@@ -0,0 +1,82 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.utils.http_client import HttpClient
+from app.utils.http_replay import FixtureStore, RecordingAdapter, ReplayAdapter
+
+
+def _store(tmp_path):
+    store = FixtureStore(str(tmp_path / 'fixtures'))
+    store.save('GET', 'https://api.duckduckgo.com/?q=python&format=json', 200,
+               {'Content-Type': 'application/json; charset=utf-8', 'Content-Encoding': 'gzip'},
+               b'{"AbstractText": "Langage"}')
+    return store
+
+
+def test_replay_serves_recorded_exchange(tmp_path):
+    store = _store(tmp_path)
+    HttpClient.use_transport(ReplayAdapter(store))
+    try:
+        # Ordre des paramètres indifférent
+        response = HttpClient.fetch('https://api.duckduckgo.com/?format=json&q=python', provider='duckduckgo')
+        assert response.json() == {'AbstractText': 'Langage'}
+        assert 'Content-Encoding' not in response.headers
+
+        with pytest.raises(requests.ConnectionError):
+            HttpClient.get('https://api.duckduckgo.com/?q=inconnu')
+        assert HttpClient.get_stats()['transport'] == {'mode': 'replay', 'served': 1, 'missing': 1, 'injected_failures': 0, 'timeouts': 0}
+    finally:
+        HttpClient.use_transport(None)
+
+
+def test_recording_redacts_api_keys(tmp_path):
+    source = _store(tmp_path)
+    source.save('GET', 'https://gnews.io/api/v4/search?q=ia&token=secret', 200, {}, b'{"articles": []}')
+    target = FixtureStore(str(tmp_path / 'recorded'))
+    HttpClient.use_transport(RecordingAdapter(target, inner=ReplayAdapter(source)))
+    try:
+        assert HttpClient.get('https://gnews.io/api/v4/search?q=ia&token=secret').json() == {'articles': []}
+    finally:
+        HttpClient.use_transport(None)
+
+    fixture = target.load('GET', 'https://gnews.io/api/v4/search?q=ia&token=autre')
+    assert fixture['url'] == 'https://gnews.io/api/v4/search?q=ia&token=REDACTED'
+    assert len(target) == 1
+
+
+def test_replay_injects_failures_and_latency(tmp_path):
+    store = _store(tmp_path)
+    url = 'https://api.duckduckgo.com/?q=python&format=json'
+    session = requests.Session()
+
+    session.mount('https://', ReplayAdapter(store, failure_rate=1.0, failure_status=503))
+    assert session.get(url).status_code == 503
+
+    session.mount('https://', ReplayAdapter(store, latency={'*': 0.05}))
+    start = time.perf_counter()
+    session.get(url)
+    assert time.perf_counter() - start >= 0.05
+
+    session.mount('https://', ReplayAdapter(store, latency=1.0))
+    with pytest.raises(requests.ReadTimeout):
+        session.get(url, timeout=(1, 0.01))
+
+
+def test_recording_transport_is_rebuilt_in_each_process(tmp_path):
+    HttpClient.init_app(SimpleNamespace(config={'HTTP_TRANSPORT': 'record', 'HTTP_FIXTURES_DIR': str(tmp_path)}))
+    try:
+        HttpClient.get_session()
+        parent = HttpClient._transport
+        assert isinstance(parent, RecordingAdapter)
+
+        # Worker forké : nouvelle session, et un pool de connexions qui n'est pas celui du parent
+        HttpClient._pid = os.getpid() + 1
+        HttpClient.get_session()
+        assert isinstance(HttpClient._transport, RecordingAdapter)
+        assert HttpClient._transport is not parent and HttpClient._transport.inner is not parent.inner
+    finally:
+        HttpClient.init_app(SimpleNamespace(config={}))
@@ -0,0 +1,124 @@
+import os
+import time
+
+from app.services.local_corpus import LocalCorpus, Segment, bm25_search, tokenize, write_segment
+from app.services.scraping_service import ScrapingService
+
+DOCS = [
+    {'url': 'https://ex.com/moteur', 'title': 'Moteur électrique', 'snippet': 'Fonctionnement du moteur électrique à courant continu.', 'language': 'fr', 'source': 'google'},
+    {'url': 'https://ex.com/voiture', 'title': 'Voiture électrique', 'snippet': 'Autonomie et recharge.', 'language': 'fr', 'source': 'bing'},
+    {'url': 'https://ex.com/python', 'title': 'Python', 'snippet': 'Un langage de programmation.', 'language': 'fr', 'source': 'duckduckgo'},
+    {'url': 'https://ex.com/engine', 'title': 'Electric motor', 'snippet': 'How an electric motor works.', 'language': 'en', 'source': 'google'},
+]
+
+
+def _enable(tmp_path, **settings):
+    LocalCorpus._settings = {**LocalCorpus.DEFAULT_SETTINGS, 'enabled': True, 'directory': str(tmp_path), **settings}
+    LocalCorpus.reset()
+
+
+def _disable():
+    LocalCorpus.reset()
+    LocalCorpus._settings = dict(LocalCorpus.DEFAULT_SETTINGS)
+
+
+def test_tokenize_strips_accents_and_stopwords():
+    assert tokenize("C'est quoi le moteur Électrique ?") == ['moteur', 'electrique']
+
+
+def test_segment_matches_memory_ranking(tmp_path):
+    path = str(tmp_path / 'seg.bm25')
+    assert write_segment(DOCS, path) == 4
+    segment = Segment(path)
+    try:
+        hits = bm25_search([segment], 'moteur électrique', limit=5, lang='fr')
+        assert [doc['url'] for _, doc in hits] == ['https://ex.com/moteur']
+        # Un seul terme sur deux : sous le seuil min_match
+        assert bm25_search([segment], 'voiture diesel', min_match=1.0) == []
+        assert segment.document(2)['title'] == 'Python'
+    finally:
+        segment.close()
+
+
+def test_added_results_are_searchable_then_flushed_and_merged(tmp_path):
+    _enable(tmp_path, segment_docs=2, max_segments=1, merge_factor=2)
+    try:
+        assert LocalCorpus.add(DOCS[:1]) == 1
+        assert LocalCorpus.search('moteur électrique', 'fr')[0]['source'] == 'local_corpus'
+        assert LocalCorpus.add(DOCS[:2]) == 1  # URL déjà indexée
+        LocalCorpus.add(DOCS[2:])
+        # Deux segments écrits, fusionnés en un par le thread d'arrière-plan au-delà de max_segments
+        LocalCorpus._merge_thread.join()
+        assert len([name for name in os.listdir(tmp_path) if name.endswith('.bm25')]) == 1
+
+        results = LocalCorpus.search('programmation python', 'fr')
+        assert results[0]['url'] == 'https://ex.com/python' and results[0]['origin'] == 'duckduckgo'
+        stats = LocalCorpus.get_stats()
+        assert stats['added'] == 4 and stats['duplicates'] == 1 and stats['segment_docs'] == 4
+        assert stats['segments'] == 1 and stats['merges'] == 1
+    finally:
+        _disable()
+
+
+def test_expired_and_oldest_segments_are_pruned_before_merge(tmp_path):
+    _enable(tmp_path, max_segments=8, max_docs=2, max_age=3600)
+    try:
+        old = str(tmp_path / f"seg-{(time.time_ns() - 7200 * 10**9):020d}-1-1.bm25")
+        write_segment(DOCS[:1], old)
+        for seq, doc in enumerate(DOCS[1:], start=2):
+            write_segment([doc], str(tmp_path / f"seg-{time.time_ns():020d}-1-{seq}.bm25"))
+        LocalCorpus.refresh(force=True)
+        assert LocalCorpus.search('moteur électrique', 'fr')
+
+        LocalCorpus.merge()
+        # Le segment de plus d'une heure expire, puis le plus ancien des trois autres (max_docs=2)
+        assert sorted(doc['url'] for segment in LocalCorpus._segments.values() for doc in segment.iter_documents()) == [
+            'https://ex.com/engine', 'https://ex.com/python'
+        ]
+        assert LocalCorpus.get_stats()['pruned'] == 2
+        assert not LocalCorpus.search('moteur électrique', 'fr')
+        # URL oubliée : elle peut être réindexée
+        assert LocalCorpus.add(DOCS[:1]) == 1
+    finally:
+        _disable()
+
+
+def test_merge_stops_at_merge_max_docs(tmp_path):
+    _enable(tmp_path, max_segments=1, merge_factor=4, merge_max_docs=2)
+    try:
+        for seq, doc in enumerate(DOCS):
+            write_segment([doc], str(tmp_path / f"seg-{time.time_ns():020d}-1-{seq}.bm25"))
+        while LocalCorpus.merge():
+            pass
+        assert sorted(segment.n_docs for segment in LocalCorpus._segments.values()) == [2, 2]
+    finally:
+        _disable()
+
+
+def test_corpus_is_a_provisional_provider(tmp_path, monkeypatch):
+    _enable(tmp_path)
+    network = [{'title': 'Python 3', 'url': 'https://www.python.org', 'snippet': 'Site officiel', 'source': 'google'}]
+    monkeypatch.setattr(ScrapingService, '_scrape_google', classmethod(lambda cls, q, l, ln=None, d=False: network))
+    for name in ('_scrape_duckduckgo', '_scrape_bing', '_scrape_wikipedia'):
+        monkeypatch.setattr(ScrapingService, name, classmethod(lambda cls, *args, **kwargs: []))
+    try:
+        LocalCorpus.add(DOCS)
+        batches = list(ScrapingService.iter_web_results('langage python', limit=1, lang='fr', use_cache=False))
+        # Premier lot du corpus, puis le provider réseau, lancé malgré les résultats déjà vus
+        assert [name for name, _ in batches] == ['local_corpus', 'google']
+        assert ScrapingService.scrape_web('langage python', limit=1, lang='fr', use_cache=False) == network
+    finally:
+        _disable()
+
+
+def test_corpus_results_replace_the_generic_fallback(tmp_path, monkeypatch):
+    _enable(tmp_path)
+    monkeypatch.setattr(ScrapingService, '_plan_sources', classmethod(
+        lambda cls, query_type, category=None: [('local_corpus', cls._scrape_local_corpus)]
+    ))
+    try:
+        assert ScrapingService.scrape_web('langage python', lang='fr', use_cache=False)[0]['source'] == 'ia-local'
+        LocalCorpus.add(DOCS)
+        assert ScrapingService.scrape_web('langage python', lang='fr', use_cache=False)[0]['url'] == 'https://ex.com/python'
+    finally:
+        _disable()
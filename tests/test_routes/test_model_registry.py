@@ -0,0 +1,80 @@
+import threading
+import time
+from app.services.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_lazily_and_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    ModelRegistry.register('test-lazy', loader)
+    ModelRegistry.unload('test-lazy')
+    assert not ModelRegistry.is_loaded('test-lazy')
+
+    threads = [threading.Thread(target=ModelRegistry.get, args=('test-lazy',)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert ModelRegistry.is_loaded('test-lazy')
+
+
+def test_preload_runs_warmup_and_reports_stats():
+    warmed = []
+    ModelRegistry.register('test-warm', lambda: 'model', warmup=warmed.append)
+    ModelRegistry.unload('test-warm')
+
+    ModelRegistry.preload(['test-warm'])
+
+    assert warmed == ['model']
+    stats = ModelRegistry.get_stats()['models']['test-warm']
+    assert stats['loaded'] and stats['resident']
+    assert stats['load_time'] >= 0
+
+
+def test_failed_loader_returns_none():
+    def loader():
+        raise OSError("download failed")
+
+    ModelRegistry.register('test-broken', loader)
+    ModelRegistry.unload('test-broken')
+    assert ModelRegistry.get('test-broken') is None
+    assert ModelRegistry.get_stats()['models']['test-broken']['loaded'] is False
+
+
+def test_memory_budget_evicts_least_recently_used_idle_model():
+    settings = dict(ModelRegistry._settings)
+    for name in [name for name in list(ModelRegistry._models) if name.startswith('test-')]:
+        ModelRegistry.unload(name)
+    for name in ('test-a', 'test-b', 'test-c'):
+        ModelRegistry.register(name, lambda: object())
+        ModelRegistry.unload(name)
+    try:
+        ModelRegistry._settings = {**settings, 'memory_budget_mb': 0}
+        ModelRegistry.get('test-a')
+        ModelRegistry.get('test-b')
+        for name in ('test-a', 'test-b'):
+            ModelRegistry._stats[name]['param_mb'] = 60
+        ModelRegistry._settings['memory_budget_mb'] = ModelRegistry.resident_mb() + 30
+
+        with ModelRegistry.use('test-a'):
+            ModelRegistry.get('test-c')
+            ModelRegistry._stats['test-c']['param_mb'] = 60
+            ModelRegistry._enforce_budget(keep='test-c')
+            # test-a est utilisé : c'est test-b, inactif, qui est déchargé
+            assert ModelRegistry.is_loaded('test-a')
+            assert not ModelRegistry.is_loaded('test-b')
+
+        ModelRegistry.get('test-b')
+        stats = ModelRegistry.get_stats()['models']['test-b']
+        assert stats['evictions'] == 1 and stats['reloads'] == 1
+    finally:
+        ModelRegistry._settings = settings
+        for name in ('test-a', 'test-b', 'test-c'):
+            ModelRegistry.unload(name)
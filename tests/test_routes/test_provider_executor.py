@@ -0,0 +1,56 @@
+import threading
+import time
+from app.services.provider_executor import ProviderExecutor
+
+
+def _reset_executor(max_workers=2, max_pending=3):
+    ProviderExecutor._settings = {'max_workers': max_workers, 'max_pending': max_pending, 'deadline': 1}
+    ProviderExecutor.shutdown()
+    for counter in ProviderExecutor._counters:
+        ProviderExecutor._counters[counter] = 0
+
+
+def test_saturated_pool_rejects_and_reports_depth():
+    _reset_executor(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    running = ProviderExecutor.submit(release.wait)
+    queued = ProviderExecutor.submit(lambda: ['late'])
+    assert ProviderExecutor.submit(lambda: ['refusé']) is None
+
+    time.sleep(0.05)
+    stats = ProviderExecutor.get_stats()
+    assert stats['in_flight'] == 1 and stats['queue_depth'] == 1
+    assert stats['rejected'] == 1
+
+    # Une future encore en file est annulée, elle ne prendra jamais de thread
+    ProviderExecutor.abandon([queued])
+    assert queued.cancelled()
+    release.set()
+    running.result(timeout=1)
+    time.sleep(0.05)
+    stats = ProviderExecutor.get_stats()
+    assert stats['queue_depth'] == 0 and stats['in_flight'] == 0
+    assert stats['cancelled'] == 1
+
+
+def test_abandoned_running_provider_delivers_late_result():
+    _reset_executor()
+    release = threading.Event()
+    late = []
+
+    def slow_provider():
+        release.wait()
+        return ['résultat tardif']
+
+    future = ProviderExecutor.submit(slow_provider)
+    time.sleep(0.05)
+    start = time.perf_counter()
+    ProviderExecutor.abandon([future], late.append)
+    assert time.perf_counter() - start < 0.05
+
+    release.set()
+    future.result(timeout=1)
+    time.sleep(0.05)
+    assert late == [['résultat tardif']]
+    assert ProviderExecutor.get_stats()['late_results'] == 1
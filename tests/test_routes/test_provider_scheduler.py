@@ -0,0 +1,67 @@
+from app.services.provider_scheduler import ProviderScheduler
+
+SOURCES = [('google', None), ('duckduckgo', None), ('bing', None), ('wikipedia', None)]
+
+
+def _reset_scheduler(deterministic=True, seed=None):
+    ProviderScheduler._settings = {
+        'enabled': True, 'deterministic': deterministic, 'max_providers': 2, 'exploration': 0.1,
+        'decay': 1.0, 'latency_scale': 2.0, 'confident_rate': 0.9, 'min_samples': 5,
+    }
+    ProviderScheduler.reset(seed)
+
+
+def _names(sources):
+    return [name for name, _ in sources]
+
+
+def test_untried_providers_keep_planned_order():
+    _reset_scheduler()
+    ranked, count = ProviderScheduler.plan('general', 'fr', SOURCES)
+    assert _names(ranked) == ['google', 'duckduckgo', 'bing', 'wikipedia']
+    assert count == 2
+
+
+def test_deterministic_mode_prefers_fast_productive_provider():
+    _reset_scheduler()
+    for _ in range(10):
+        ProviderScheduler.record('general', 'fr', 'google', 0, 10, 3.0, failed=True)
+        ProviderScheduler.record('general', 'fr', 'duckduckgo', 1, 10, 0.2)
+        ProviderScheduler.record('general', 'fr', 'bing', 10, 10, 0.4)
+        ProviderScheduler.record('general', 'fr', 'wikipedia', 0, 10, 0.1)
+
+    ranked, count = ProviderScheduler.plan('general', 'fr', SOURCES)
+    assert _names(ranked)[:2] == ['bing', 'duckduckgo']
+    # Égalité à zéro : l'ordre prévu départage
+    assert _names(ranked)[2:] == ['google', 'wikipedia']
+    # bing réussit toujours : un seul provider suffit
+    assert count == 1
+    assert ProviderScheduler.plan('general', 'fr', SOURCES) == (ranked, count)
+    # Les statistiques sont séparées par type de requête et langue
+    assert _names(ProviderScheduler.plan('news', 'fr', SOURCES)[0])[0] == 'google'
+
+
+def test_seeded_thompson_sampling_is_reproducible():
+    plans = []
+    for _ in range(2):
+        _reset_scheduler(deterministic=False, seed=42)
+        ProviderScheduler.record('definition', 'fr', 'wikipedia', 1, 10, 0.3)
+        plans.append([_names(ProviderScheduler.plan('definition', 'fr', SOURCES)[0]) for _ in range(5)])
+    assert plans[0] == plans[1]
+
+
+def test_inline_local_provider_stays_out_of_launch_window():
+    _reset_scheduler()
+    sources = SOURCES + [('wikipedia_local', None)]
+    for i in range(10):
+        ProviderScheduler.record('general', 'fr', 'wikipedia_local', 0, 10, 0.001)
+        ProviderScheduler.record('general', 'fr', 'google', 0 if i % 3 == 0 else 5, 10, 0.5)
+        ProviderScheduler.record('general', 'fr', 'bing', 0 if i % 2 == 0 else 4, 10, 0.5)
+        ProviderScheduler.record('general', 'fr', 'duckduckgo', 0, 10, 1.0, failed=True)
+        ProviderScheduler.record('general', 'fr', 'wikipedia', 0, 10, 1.0, failed=True)
+
+    ranked, count = ProviderScheduler.plan('general', 'fr', sources, {'wikipedia_local'})
+    # Le provider local part en ligne avant les autres ; le nombre à lancer ne vise que le réseau
+    assert _names(ranked)[0] == 'wikipedia_local'
+    assert _names(ranked[1:1 + count]) == ['google', 'bing']
+    assert count == 2
@@ -3,7 +3,7 @@ from app.services.scraping_service import ScrapingService
 
 @patch('app.services.scraping_service.ScrapingService._scrape_google', return_value=[])
 @patch('app.services.scraping_service.ScrapingService._scrape_bing', return_value=[])
-@patch('requests.get')
+@patch('app.utils.http_client.HttpClient.fetch')
 def test_scrape_web_duckduckgo_only(mock_get, mock_bing, mock_google, app):
     """Test DuckDuckGo scraping with mocked JSON response"""
 
@@ -38,3 +38,24 @@ def test_scrape_web_duckduckgo_only(mock_get, mock_bing, mock_google, app):
         assert 'http://example.com' in urls
         assert 'http://example.com/topic' in urls
         assert 'http://example.com/topic2' in urls
+
+
+def test_merge_results_deduplicates_and_fuses_ranks():
+    google = [
+        {'title': 'Python', 'url': 'https://www.google.com/url?q=https://www.python.org/', 'snippet': '', 'source': 'google'},
+        {'title': 'Wiki', 'url': 'https://fr.wikipedia.org/wiki/Python', 'snippet': 'Langage', 'source': 'google'},
+    ]
+    bing = [
+        {'title': 'Wikipédia', 'url': 'https://fr.m.wikipedia.org/wiki/Python?utm_source=bing', 'snippet': 'Python est un langage', 'source': 'bing'},
+        {'title': 'Python.org', 'url': 'http://python.org', 'snippet': 'Site officiel', 'source': 'bing'},
+        {'title': 'Tuto', 'url': 'https://example.com/tuto', 'snippet': 'Tutoriel', 'source': 'bing'},
+    ]
+
+    merged = ScrapingService.merge_results([('google', google), ('bing', bing)], limit=10, k=60)
+
+    assert [r['sources'] for r in merged] == [['google', 'bing'], ['google', 'bing'], ['bing']]
+    assert merged[0]['url'] == 'https://www.python.org/'
+    # Snippet vide complété par le doublon
+    assert merged[0]['snippet'] == 'Site officiel'
+    assert merged[2]['url'] == 'https://example.com/tuto'
+    assert len(ScrapingService.merge_results([('google', google), ('bing', bing)], limit=2)) == 2
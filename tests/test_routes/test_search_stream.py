@@ -0,0 +1,100 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from bson.objectid import ObjectId
+from flask_jwt_extended import create_access_token
+
+from app.services.ai_service import AIService
+from app.services.scraping_service import ScrapingService
+
+
+@pytest.fixture
+def stream_headers(app, monkeypatch):
+    """Token JWT d'un utilisateur fictif, historique Mongo remplacé par un mock."""
+    mongo = MagicMock()
+    monkeypatch.setattr(app, 'mongo', mongo)
+    with app.app_context():
+        token = create_access_token(identity=str(ObjectId()))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_stream_emits_meta_results_enriched_done(app, stream_headers, monkeypatch):
+    def iter_web_results(query, limit, lang=None, use_cache=True):
+        yield 'local_corpus', [{'title': 'A', 'url': 'https://a.fr', 'snippet': 'a'}]
+        # https://a.fr déjà émis ; le lot provisoire du corpus ne compte pas dans la limite : b et c sortent, d la dépasse
+        yield 'duckduckgo', [
+            {'title': 'A bis', 'url': 'https://a.fr', 'snippet': 'a'},
+            {'title': 'B', 'url': 'https://b.fr', 'snippet': 'b'},
+            {'title': 'C', 'url': 'https://c.fr', 'snippet': 'c'},
+            {'title': 'D', 'url': 'https://d.fr', 'snippet': 'd'},
+        ]
+
+    batches = []
+
+    def enrich_batch(query, results, query_embedding=None, summary_budget=None):
+        batches.append([r['url'] for r in results])
+        return [{**r, 'ai_summary': r['snippet'], 'enriched': True} for r in results], 0
+
+    monkeypatch.setattr(ScrapingService, 'iter_web_results', staticmethod(iter_web_results))
+    monkeypatch.setattr(AIService, 'is_ready', staticmethod(lambda: True))
+    monkeypatch.setattr(AIService, 'encode_query', staticmethod(lambda query: None))
+    monkeypatch.setattr(AIService, 'enrich_batch', staticmethod(enrich_batch))
+
+    response = app.test_client().post('/api/v1/search/stream', headers=stream_headers, json={
+        'query': 'moteur électrique', 'limit': 2, 'filters': {'language': 'fr'}
+    })
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    events = _events(response)
+    assert [e['event'] for e in events] == ['meta', 'results', 'enriched', 'results', 'enriched', 'enriched', 'done']
+    assert events[0]['filters']['date'] == 'any'
+    assert [(e['provider'], e['offset'], [r['url'] for r in e['results']]) for e in events if e['event'] == 'results'] == [
+        ('local_corpus', 0, ['https://a.fr']),
+        ('duckduckgo', 1, ['https://b.fr', 'https://c.fr']),
+    ]
+    assert [e['index'] for e in events if e['event'] == 'enriched'] == [0, 1, 2]
+    # Un seul passage d'enrichissement par lot de provider
+    assert batches == [['https://a.fr'], ['https://b.fr', 'https://c.fr']]
+    assert events[-1]['count'] == 3
+
+
+def test_stream_collapses_near_duplicates_and_urls_already_sent(app, stream_headers, monkeypatch):
+    text = 'Le moteur électrique convertit l énergie électrique en énergie mécanique grâce au champ magnétique'
+
+    def iter_web_results(query, limit, lang=None, use_cache=True):
+        yield 'google', [{'title': 'Moteur', 'url': 'https://a.fr/moteur', 'snippet': text}]
+        yield 'bing', [
+            # Même page qu'au premier lot, URL de suivi
+            {'title': 'Moteur (bing)', 'url': 'https://www.a.fr/moteur/?utm_source=bing', 'snippet': 'autre'},
+            {'title': 'Moteur électrique', 'url': 'https://b.fr/moteur', 'snippet': text},
+            {'title': 'Moteur électrique', 'url': 'https://c.fr/copie', 'snippet': text},
+        ]
+
+    monkeypatch.setattr(ScrapingService, 'iter_web_results', staticmethod(iter_web_results))
+    monkeypatch.setattr(AIService, 'is_ready', staticmethod(lambda: False))
+
+    response = app.test_client().post('/api/v1/search/stream', headers=stream_headers, json={'query': 'moteur électrique'})
+
+    results = [r for e in _events(response) if e['event'] == 'results' for r in e['results']]
+    assert [r['url'] for r in results] == ['https://a.fr/moteur', 'https://b.fr/moteur']
+    assert [a['url'] for a in results[1]['alternates']] == ['https://c.fr/copie']
+
+
+@pytest.mark.parametrize('payload', [
+    {'query': 'moteur électrique', 'limit': True},
+    {'query': 'moteur électrique', 'limit': 0},
+    {'query': 'moteur électrique', 'filters': {'language': 'xx'}},
+    {'query': 'moteur électrique', 'filters': {'unknown': 'x'}},
+    {'query': 'mo'},
+])
+def test_stream_rejects_invalid_post_body(app, stream_headers, payload):
+    response = app.test_client().post('/api/v1/search/stream', headers=stream_headers, json=payload)
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Validation failed'
@@ -0,0 +1,75 @@
+import gzip
+
+from app.services.wikipedia_local import AbstractIndex, WikipediaLocal, build_index, iter_abstracts_dump, title_candidates
+
+DUMP = """<feed>
+<doc><title>Wikipédia : Photosynthèse</title><url>https://fr.wikipedia.org/wiki/Photosynth%C3%A8se</url>
+<abstract>La photosynthèse est le processus bioénergétique des plantes.</abstract><links></links></doc>
+<doc><title>Wikipédia : La Défense</title><url>https://fr.wikipedia.org/wiki/La_D%C3%A9fense</url>
+<abstract>La Défense est un quartier d'affaires.</abstract></doc>
+<doc><title>Wikipédia : Modèle:Infobox</title><url>https://fr.wikipedia.org/wiki/Mod%C3%A8le:Infobox</url>
+<abstract>| nom = valeur</abstract></doc>
+<doc><title>Wikipédia : Python (langage)</title><url>https://fr.wikipedia.org/wiki/Python_(langage)</url>
+<abstract>Python est un langage de programmation.</abstract></doc>
+</feed>"""
+
+
+def _index(tmp_path):
+    dump = tmp_path / 'frwiki-abstract.xml.gz'
+    with gzip.open(dump, 'wt', encoding='utf-8') as f:
+        f.write(DUMP)
+    path = tmp_path / 'fr.idx'
+    assert build_index(iter_abstracts_dump(str(dump)), str(path)) == 3
+    return path
+
+
+def test_index_answers_exact_and_normalized_titles(tmp_path):
+    index = AbstractIndex(str(_index(tmp_path)))
+    try:
+        assert index.get('Python (langage)')['url'] == 'https://fr.wikipedia.org/wiki/Python_(langage)'
+        assert index.get('photosynthese')['title'] == 'Photosynthèse'
+        assert index.get('Modèle:Infobox') is None
+        assert index.get('Inconnu') is None
+    finally:
+        index.close()
+
+
+def test_definition_queries_strip_leading_words():
+    assert title_candidates("Définition de la photosynthèse ?") == ['definition de la photosynthese', 'photosynthese']
+    assert title_candidates('la défense') == ['la defense', 'defense']
+
+
+def test_lookup_uses_index_of_the_language(tmp_path):
+    _index(tmp_path)
+    WikipediaLocal._settings = {'enabled': True, 'index_dir': str(tmp_path)}
+    WikipediaLocal.reset()
+    try:
+        assert WikipediaLocal.lookup('définition photosynthèse', 'fr')['title'] == 'Photosynthèse'
+        assert WikipediaLocal.lookup('La Défense', 'fr')['title'] == 'La Défense'
+        assert WikipediaLocal.lookup('photosynthèse', 'en') is None
+        stats = WikipediaLocal.get_stats()
+        assert stats['lookups'] == 2 and stats['hits'] == 2
+        assert stats['indexes'] == {'fr': 3}
+    finally:
+        WikipediaLocal.reset()
+        WikipediaLocal._settings = {'enabled': False}
+
+
+def test_rebuilt_index_is_reopened_after_check_interval(tmp_path):
+    path = _index(tmp_path)
+    WikipediaLocal._settings = {'enabled': True, 'index_dir': str(tmp_path), 'check_interval': 3600}
+    WikipediaLocal.reset()
+    try:
+        assert WikipediaLocal.lookup('photosynthèse', 'fr')['abstract'].startswith('La photosynthèse')
+        build_index([('Photosynthèse', 'https://fr.wikipedia.org/wiki/Photosynth%C3%A8se', 'Nouvel abstract.')], str(path))
+        # Fichier pas encore revérifié : l'ancien mapping reste servi
+        assert WikipediaLocal.lookup('photosynthèse', 'fr')['abstract'].startswith('La photosynthèse')
+
+        WikipediaLocal._settings['check_interval'] = 0
+        assert WikipediaLocal.lookup('photosynthèse', 'fr')['abstract'] == 'Nouvel abstract.'
+        assert WikipediaLocal.lookup('La Défense', 'fr') is None
+        stats = WikipediaLocal.get_stats()
+        assert stats['reloads'] == 1 and stats['indexes'] == {'fr': 1}
+    finally:
+        WikipediaLocal.reset()
+        WikipediaLocal._settings = {'enabled': False}
@@ -0,0 +1,50 @@
+import numpy as np
+
+from app.services.dedup_service import DedupService
+
+DISPATCH = ("Le gouvernement a annoncé mardi un plan de relance de dix milliards d'euros "
+            "pour soutenir l'industrie automobile face à la crise")
+
+
+def _results():
+    return [
+        {'title': 'Plan de relance automobile', 'url': 'https://lemonde.fr/eco/relance', 'snippet': DISPATCH, 'source': 'google'},
+        {'title': 'Python', 'url': 'https://python.org', 'snippet': 'Python est un langage de programmation interprété.', 'source': 'google'},
+        {'title': "Plan de relance : dix milliards pour l'automobile", 'url': 'https://news.yahoo.fr/relance',
+         'snippet': DISPATCH + " selon l'AFP.", 'source': 'bing'},
+        {'title': 'Relance', 'url': 'https://www.lemonde.fr/eco/relance/?utm_source=x', 'snippet': 'Autre extrait', 'source': 'gnews'},
+    ]
+
+
+def _configure(**settings):
+    DedupService._settings = {**DedupService.DEFAULT_SETTINGS, **settings}
+    DedupService.reset()
+
+
+def test_syndicated_copies_are_attached_to_best_ranked():
+    _configure()
+    collapsed = DedupService.collapse(_results())
+
+    assert [r['url'] for r in collapsed] == ['https://lemonde.fr/eco/relance', 'https://python.org']
+    assert [a['source'] for a in collapsed[0]['alternates']] == ['bing', 'gnews']
+    assert 'alternates' not in collapsed[1]
+    assert DedupService.get_stats()['duplicates'] == 2
+
+
+def test_embedding_check_can_veto_a_minhash_match():
+    _configure(embedding_check=True, embedding_threshold=0.99)
+
+    def embed(texts):
+        # Vecteurs orthogonaux : aucune paire candidate n'est confirmée
+        return np.eye(len(texts), 4)
+
+    collapsed = DedupService.collapse(_results(), embed)
+    # Seul le doublon d'URL reste regroupé
+    assert len(collapsed) == 3
+    assert DedupService.get_stats()['embedding_rejects'] == 1
+
+
+def test_disabled_returns_results_unchanged():
+    _configure(enabled=False)
+    results = _results()
+    assert DedupService.collapse(results) is results
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+import pytest
+
+from multiprocessing.connection import Client
+
+from app.services.inference_server import InferenceServer, InferenceServerClient
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serveur d'inférence sur un socket Unix temporaire ; handlers factices, sans modèle."""
+    batches = []
+    release = threading.Event()
+    release.set()
+
+    def summarize(texts, lang):
+        batches.append(list(texts))
+        release.wait(2)
+        if 'boom' in texts:
+            raise ValueError('texte refusé')
+        if 'lent' in texts:
+            time.sleep(0.5)
+        return [f"{lang}:{text}" for text in texts]
+
+    address = str(tmp_path / 'inference.sock')
+    instance = InferenceServer(address, b'secret', {'summarize': summarize}, max_batch_size=16, max_wait_ms=50)
+    instance.batches = batches
+    instance.release = release
+    threading.Thread(target=instance.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if instance._listener is not None:
+            break
+        time.sleep(0.01)
+
+    InferenceServerClient._settings = {'enabled': True, 'address': address, 'authkey': b'secret', 'timeout': 2}
+    InferenceServerClient._close()
+    yield instance
+    InferenceServerClient._close()
+    instance.shutdown()
+
+
+def test_concurrent_calls_share_a_batch(server):
+    outputs = {}
+
+    def call(i):
+        outputs[i] = InferenceServerClient.summarize([f"t{i}a", f"t{i}b"], 'fr')
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outputs == {i: [f"fr:t{i}a", f"fr:t{i}b"] for i in range(4)}
+    assert len(server.batches) < 4
+    assert server.stats['summarize']['requests'] == 4 and server.stats['summarize']['items'] == 8
+    assert InferenceServerClient._pending == {}
+
+
+def test_handler_error_and_timeout_leave_nothing_pending(server):
+    with pytest.raises(RuntimeError, match='texte refusé'):
+        InferenceServerClient.summarize(['boom'])
+    assert InferenceServerClient._pending == {}
+
+    InferenceServerClient._settings['timeout'] = 0.05
+    with pytest.raises(TimeoutError):
+        InferenceServerClient.summarize(['lent'])
+    # La réponse tardive arrive sans appel en attente : elle est ignorée
+    assert InferenceServerClient._pending == {}
+
+
+def test_client_reconnects_after_fork(server):
+    InferenceServerClient.summarize(['a'], 'fr')
+    first = InferenceServerClient._conn
+
+    # Processus enfant : la connexion héritée appartient au parent, une nouvelle est ouverte
+    InferenceServerClient._pid = os.getpid() + 1
+    assert InferenceServerClient.summarize(['b'], 'fr') == ['fr:b']
+    assert InferenceServerClient._conn is not first
+    assert InferenceServerClient._pid == os.getpid()
+
+
+def test_disconnected_client_does_not_stop_the_batch_thread(server):
+    server.release.clear()
+    gone = Client(server.address, family='AF_UNIX', authkey=b'secret')
+    gone.send((1, 'summarize', 'fr', ['parti']))
+    time.sleep(0.1)
+    # Le worker disparaît pendant que son batch est en cours : la réponse ne peut plus partir
+    gone.close()
+    time.sleep(0.05)
+    server.release.set()
+    time.sleep(0.1)
+
+    assert InferenceServerClient.summarize(['encore là'], 'fr') == ['fr:encore là']
+    assert all(thread.is_alive() for thread in server._threads)
+
+
+def test_shutdown_stops_idle_batch_threads(server):
+    server.shutdown()
+    for thread in server._threads:
+        thread.join(timeout=1)
+    assert not any(thread.is_alive() for thread in server._threads)
@@ -0,0 +1,48 @@
+from app.services.summary_router import SummaryRouter
+
+SHORT = "La photosynthèse est le processus bioénergétique des plantes."
+MEDIUM = (
+    "Le moteur électrique convertit l'énergie électrique en énergie mécanique. "
+    "Il repose sur l'interaction entre un champ magnétique et un courant électrique. "
+    "Les moteurs à courant continu sont simples à piloter. "
+    "Les moteurs asynchrones dominent l'industrie grâce à leur robustesse. "
+    "Le rendement d'un moteur électrique dépasse souvent 90 %. "
+    "Les voitures électriques utilisent des moteurs synchrones à aimants permanents."
+)
+
+
+def _router(**settings):
+    SummaryRouter._settings = {**SummaryRouter.DEFAULT_SETTINGS, **settings}
+    SummaryRouter.reset()
+
+
+def test_only_long_texts_reach_the_abstractive_model():
+    _router()
+    calls = []
+
+    def abstractive(texts):
+        calls.append(texts)
+        return ['résumé abstractif'] * len(texts)
+
+    summaries = SummaryRouter.summarize([SHORT, MEDIUM, MEDIUM * 4], abstractive)
+
+    assert summaries[0] == SHORT
+    assert summaries[2] == 'résumé abstractif' and calls == [[MEDIUM * 4]]
+    # Extrait : phrases du texte d'origine, dans l'ordre, sous le seuil de passage direct
+    assert summaries[1] != MEDIUM and all(sentence in MEDIUM for sentence in summaries[1].split('. '))
+    assert SummaryRouter.count_tokens([summaries[1]])[0] <= SummaryRouter._settings['passthrough_tokens']
+
+    stats = SummaryRouter.get_stats()
+    assert (stats['passthrough'], stats['extractive'], stats['abstractive']) == (1, 1, 1)
+    assert stats['tokenizer'] is True
+
+
+def test_thresholds_are_counted_in_tokens():
+    _router()
+    # Un seul mot, plusieurs tokens WordPiece : c'est ce que voit le modèle
+    assert SummaryRouter.count_tokens(['anticonstitutionnellement', 'a b c']) == [7, 3]
+
+
+def test_disabled_router_sends_everything_to_the_model():
+    _router(enabled=False)
+    assert SummaryRouter.summarize([SHORT], lambda texts: ['modèle'] * len(texts)) == ['modèle']